@@ -0,0 +1,49 @@
+import asyncio
+from typing import Dict, Optional
+from .database import db
+
+
+class ChangeFeed:
+    """Parks long-poll requests until the session they watch changes
+
+    All requests watching a session share one future, so a parked request
+    costs little more than its own timeout handle.
+    """
+    
+    def __init__(self):
+        self.futures: Dict[str, asyncio.Future] = {}
+        self.waiting: Dict[str, int] = {}
+    
+    def notify(self, session_id: str, version: Optional[int]) -> None:
+        """Wake every request waiting on a session"""
+        future = self.futures.pop(session_id, None)
+        if future is not None and not future.done():
+            future.set_result(version)
+    
+    async def wait(self, session_id: str, timeout: float) -> bool:
+        """Wait until the session changes; return False on timeout"""
+        future = self.futures.get(session_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.futures[session_id] = future
+        self.waiting[session_id] = self.waiting.get(session_id, 0) + 1
+        try:
+            done, _ = await asyncio.wait((future,), timeout=timeout)
+            return bool(done)
+        finally:
+            remaining = self.waiting[session_id] - 1
+            if remaining:
+                self.waiting[session_id] = remaining
+            else:
+                del self.waiting[session_id]
+                if self.futures.get(session_id) is future:
+                    del self.futures[session_id]
+    
+    def waiter_count(self) -> int:
+        """Number of requests currently parked"""
+        return sum(self.waiting.values())
+
+
+# Global change feed instance
+change_feed = ChangeFeed()
+db.add_listener(change_feed.notify)
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+from .database import InMemoryDatabase
+from .hashring import HashRing, ring
+from .metrics import Counter, Histogram, registry
+from .tracing import current_span
+from .transfer import session_line, user_line
+
+logger = logging.getLogger(__name__)
+
+# Requests under /api/sessions/{session_id} belong to the node owning the session
+_SESSION_PATH = re.compile(r"^/api/sessions/([^/]+)")
+_NOT_SESSION_IDS = {"search", "stats", "batch"}
+
+_HOP_BY_HOP = {
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization",
+    b"te", b"trailer", b"transfer-encoding", b"upgrade", b"host"
+}
+
+# Set on proxied requests; a node always serves them itself, so nodes that
+# briefly disagree about membership cannot bounce a request between them
+HOP_HEADER = b"x-cluster-hop"
+NODE_HEADER = b"x-cluster-node"
+
+
+def _httpx():
+    # httpx is only needed once a request has to go to another node
+    import httpx
+    return httpx
+
+
+class HandoffError(Exception):
+    """A node did not accept the sessions handed to it"""
+
+
+def session_key(path: str) -> Optional[str]:
+    """The session ID a request path is about, if any"""
+    match = _SESSION_PATH.match(path)
+    if match is None or match.group(1) in _NOT_SESSION_IDS:
+        return None
+    return match.group(1)
+
+
+class Peers:
+    """HTTP client for requests to other nodes, created on first use"""
+
+    def __init__(self, timeout: float = 60.0, transport=None):
+        self.timeout = timeout
+        self.transport = transport
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            httpx = _httpx()
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                transport=self.transport
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class ClusterMiddleware:
+    """Serve requests for sessions owned by this node and proxy the rest to their owner
+
+    Requests without a session ID (auth, lists, search, stats) are always
+    served by the node that receives them; batch routes split their IDs
+    by owner with by_owner(). Bodies are streamed both ways,
+    so long polls and NDJSON responses pass through unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, ring: HashRing, node_id: str, peers: "Peers"):
+        self.app = app
+        self.ring = ring
+        self.node_id = node_id
+        self.peers = peers
+        self.node_header = (NODE_HEADER, node_id.encode())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.ring.nodes:
+            await self.app(scope, receive, send)
+            return
+
+        session_id = session_key(scope["path"])
+        owner = self.ring.node_for(session_id) if session_id is not None else None
+        if owner is None or owner == self.node_id or any(key == HOP_HEADER for key, _ in scope["headers"]):
+            await self.app(scope, receive, self._tag(send))
+            return
+        await self.proxy(owner, scope, receive, send)
+
+    def _tag(self, send: Send) -> Send:
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [self.node_header]
+            await send(message)
+        return send_wrapper
+
+    async def proxy(self, owner: str, scope: Scope, receive: Receive, send: Send) -> None:
+        """Forward a request to the owning node and stream its response back"""
+        httpx = _httpx()
+        url = self.ring.nodes[owner] + scope["raw_path"].decode("latin-1")
+        if scope["query_string"]:
+            url += "?" + scope["query_string"].decode("latin-1")
+
+        headers = [(key, value) for key, value in scope["headers"] if key not in _HOP_BY_HOP]
+        span = current_span()
+        if span is not None:
+            headers = [(key, value) for key, value in headers if key != b"traceparent"]
+            headers.append((b"traceparent", span.traceparent().encode()))
+        headers.append((HOP_HEADER, self.node_id.encode()))
+        if scope.get("client"):
+            headers.append((b"x-forwarded-for", scope["client"][0].encode()))
+
+        has_body = any(key in (b"content-length", b"transfer-encoding") for key, _ in scope["headers"])
+
+        async def body():
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    return
+                yield message.get("body", b"")
+                if not message.get("more_body", False):
+                    return
+
+        start = time.perf_counter()
+        request = self.peers.client.build_request(
+            scope["method"], url, headers=headers, content=body() if has_body else None
+        )
+        try:
+            response = await self.peers.client.send(request, stream=True)
+        except httpx.HTTPError:
+            proxy_errors.inc(owner)
+            body_bytes = json.dumps({"detail": "Session node unavailable"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 502,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body_bytes)).encode()),
+                ]
+            })
+            await send({"type": "http.response.body", "body": body_bytes})
+            return
+
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (key.lower(), value) for key, value in response.headers.raw
+                    if key.lower() not in _HOP_BY_HOP
+                ]
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
+            proxy_duration.observe(time.perf_counter() - start, owner)
+
+
+async def _post_batch(node_id: str, path: str, session_ids: List[str], headers: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Send part of a batch to the node owning its sessions"""
+    response = await peers.client.post(ring.nodes[node_id] + path, json={"ids": session_ids}, headers=headers)
+    response.raise_for_status()
+    return response.json()["results"]
+
+
+async def by_owner(
+    path: str,
+    session_ids: List[str],
+    headers: Mapping[str, str],
+    local: Callable[[List[str]], List[Any]]
+) -> List[Any]:
+    """Serve a batch of session IDs, each on the node that owns it
+
+    IDs are grouped by owner; the local group goes to `local`, the others
+    to the same endpoint on their owners in parallel. Results come back in
+    the order of `session_ids`. A batch that was itself sent by another
+    node, or that arrives while running as a single node, is served
+    locally.
+    """
+    if not ring.nodes or HOP_HEADER.decode() in headers:
+        return local(session_ids)
+    groups: Dict[str, List[int]] = {}
+    for position, session_id in enumerate(session_ids):
+        groups.setdefault(ring.node_for(session_id), []).append(position)
+
+    forwarded = {"Authorization": headers.get("authorization", ""), HOP_HEADER.decode(): settings.NODE_ID}
+    span = current_span()
+    if span is not None:
+        forwarded["traceparent"] = span.traceparent()
+
+    async def serve(owner: str, ids: List[str]) -> List[Any]:
+        if owner == settings.NODE_ID:
+            return local(ids)
+        try:
+            return await _post_batch(owner, path, ids, forwarded)
+        except _httpx().HTTPError:
+            proxy_errors.inc(owner)
+            return [{"id": session_id, "status": 502, "detail": "Session node unavailable"} for session_id in ids]
+
+    owners = list(groups)
+    served = await asyncio.gather(*(
+        serve(owner, [session_ids[position] for position in groups[owner]]) for owner in owners
+    ))
+    results: List[Any] = [None] * len(session_ids)
+    for owner, group in zip(owners, served):
+        for position, result in zip(groups[owner], group):
+            results[position] = result
+    return results
+
+
+async def _post_import(node_id: str, body: str) -> None:
+    """Send NDJSON records to another node's import endpoint"""
+    response = await peers.client.post(
+        ring.nodes[node_id] + "/api/admin/import",
+        content=body.encode(),
+        headers={
+            "Content-Type": "application/x-ndjson",
+            "X-Admin-Token": settings.ADMIN_TOKEN,
+            HOP_HEADER.decode(): settings.NODE_ID
+        }
+    )
+    response.raise_for_status()
+
+
+async def _post_revocation(node_id: str, revocation: Dict[str, Any]) -> None:
+    """Send a token revocation to another node"""
+    response = await peers.client.post(
+        ring.nodes[node_id] + "/api/admin/revocations",
+        json=revocation,
+        headers={"X-Admin-Token": settings.ADMIN_TOKEN, HOP_HEADER.decode(): settings.NODE_ID}
+    )
+    response.raise_for_status()
+
+
+async def _replicate(post: Callable[[str], Awaitable[None]]) -> None:
+    for node_id in ring.nodes:
+        if node_id == settings.NODE_ID:
+            continue
+        try:
+            await post(node_id)
+        except _httpx().HTTPError as exc:
+            replication_errors.inc(node_id)
+            logger.warning("Could not replicate to %s: %s", node_id, exc)
+
+
+_background: Set[asyncio.Task] = set()
+
+
+def _in_background(post: Callable[[str], Awaitable[None]]) -> None:
+    if len(ring.nodes) < 2:
+        return
+    task = asyncio.create_task(_replicate(post))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def replicate_user(user: Dict[str, Any]) -> None:
+    """Copy a new user, password hash included, to the other nodes in the background
+
+    Accounts are small and rarely created, so every node keeps all of them
+    and users can log in through any node.
+    """
+    line = user_line(user)
+    _in_background(lambda node_id: _post_import(node_id, line))
+
+
+def replicate_revocation(revocation: Dict[str, Any]) -> None:
+    """Copy a token revocation to the other nodes in the background
+
+    Any node may serve a request carrying the token, so all of them must
+    reject it after a logout.
+    """
+    _in_background(lambda node_id: _post_revocation(node_id, revocation))
+
+
+async def hand_off(database: InMemoryDatabase, chunk_size: int = 1000) -> Dict[str, int]:
+    """Move sessions this node no longer owns to their owners
+
+    Run after a membership change: consistent hashing moves only the
+    sessions between the changed node's ring points and their
+    predecessors. Sessions go out with the users they reference, in chunks
+    through the import endpoint, and are deleted here once accepted.
+    Execution and edit history stay behind.
+    """
+    moved: Dict[str, List[str]] = {}
+    for session_id in list(database.sessions):
+        owner = ring.node_for(session_id)
+        if owner is not None and owner != settings.NODE_ID:
+            moved.setdefault(owner, []).append(session_id)
+
+    counts = {}
+    for owner, session_ids in moved.items():
+        for start in range(0, len(session_ids), chunk_size):
+            chunk = [
+                session_id for session_id in session_ids[start:start + chunk_size]
+                if session_id in database.sessions
+            ]
+            user_ids = {database.sessions[session_id]["created_by"] for session_id in chunk}
+            for session_id in chunk:
+                user_ids.update(database.get_participant_join_times(session_id))
+            body = "".join(
+                user_line(database.users[user_id]) for user_id in user_ids if user_id in database.users
+            ) + "".join(
+                session_line(database.sessions[session_id], database.get_participant_join_times(session_id))
+                for session_id in chunk
+            )
+            try:
+                await _post_import(owner, body)
+            except _httpx().HTTPError as exc:
+                raise HandoffError(f"{owner}: {exc}") from exc
+            for session_id in chunk:
+                database.delete_session(session_id)
+        counts[owner] = len(session_ids)
+    return counts
+
+
+# Global client for requests to other nodes and the cluster metrics
+peers = Peers(settings.CLUSTER_PROXY_TIMEOUT_SECONDS)
+
+proxy_duration = registry.register(Histogram(
+    "cluster_proxy_duration_seconds",
+    "Requests proxied to the node owning their session",
+    ("node",)
+))
+proxy_errors = registry.register(Counter(
+    "cluster_proxy_errors_total",
+    "Proxied requests that could not reach the owning node",
+    ("node",)
+))
+replication_errors = registry.register(Counter(
+    "cluster_replication_errors_total",
+    "New users and token revocations that could not be copied to a node",
+    ("node",)
+))
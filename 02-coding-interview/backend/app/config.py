@@ -8,7 +8,46 @@ class Settings(BaseSettings):
     SECRET_KEY: str = Field(default="your-secret-key-change-in-production", alias="SECRET_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     ALGORITHM: str = Field(default="HS256", alias="ALGORITHM")
+    PASSWORD_BCRYPT_ROUNDS: int = Field(default=12, alias="PASSWORD_BCRYPT_ROUNDS")
+    PASSWORD_HASH_WORKERS: int = Field(default=4, alias="PASSWORD_HASH_WORKERS")
+    TOKEN_CACHE_SIZE: int = Field(default=4096, alias="TOKEN_CACHE_SIZE")
+    REVOCATION_FILTER_CAPACITY: int = Field(default=100000, alias="REVOCATION_FILTER_CAPACITY")
+    REVOCATION_PRUNE_INTERVAL_SECONDS: float = Field(default=60.0, alias="REVOCATION_PRUNE_INTERVAL_SECONDS")
     DATABASE_URL: str = Field(default="sqlite:///./interview.db", alias="DATABASE_URL")
+    DOCUMENT_HISTORY_LIMIT: int = Field(default=500, alias="DOCUMENT_HISTORY_LIMIT")
+    DOCUMENT_COMPACT_INTERVAL_SECONDS: float = Field(default=30.0, alias="DOCUMENT_COMPACT_INTERVAL_SECONDS")
+    EXECUTION_HISTORY_SIZE: int = Field(default=20, alias="EXECUTION_HISTORY_SIZE")
+    EXECUTION_OUTPUT_LIMIT: int = Field(default=65536, alias="EXECUTION_OUTPUT_LIMIT")
+    EXECUTION_COMPRESS_THRESHOLD: int = Field(default=1024, alias="EXECUTION_COMPRESS_THRESHOLD")
+    RESPONSE_CACHE_SIZE: int = Field(default=10000, alias="RESPONSE_CACHE_SIZE")
+    LONG_POLL_TIMEOUT_SECONDS: float = Field(default=25.0, alias="LONG_POLL_TIMEOUT_SECONDS")
+    API_GZIP_MIN_SIZE: int = Field(default=1024, alias="API_GZIP_MIN_SIZE")
+    STATIC_MEMORY_CACHE_MAX_FILE: int = Field(default=65536, alias="STATIC_MEMORY_CACHE_MAX_FILE")
+    ADMIN_TOKEN: str = Field(default="", alias="ADMIN_TOKEN")
+    PROFILE_SAMPLE_RATE: float = Field(default=0.0, alias="PROFILE_SAMPLE_RATE")
+    PROFILE_INTERVAL_SECONDS: float = Field(default=0.005, alias="PROFILE_INTERVAL_SECONDS")
+    PROFILE_MAX_PROFILES: int = Field(default=20, alias="PROFILE_MAX_PROFILES")
+    LOOP_LAG_INTERVAL_SECONDS: float = Field(default=0.1, alias="LOOP_LAG_INTERVAL_SECONDS")
+    LOOP_SLOW_CALLBACK_SECONDS: float = Field(default=0.1, alias="LOOP_SLOW_CALLBACK_SECONDS")
+    LOAD_SHED_LAG_SECONDS: float = Field(default=0.25, alias="LOAD_SHED_LAG_SECONDS")
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = Field(default=2, alias="LOAD_SHED_RETRY_AFTER_SECONDS")
+    EXECUTION_WORKSPACE_ROOT: str = Field(default="", alias="EXECUTION_WORKSPACE_ROOT")
+    EXECUTION_WORKSPACE_POOL_SIZE: int = Field(default=8, alias="EXECUTION_WORKSPACE_POOL_SIZE")
+    EXPORT_CHUNK_SIZE: int = Field(default=1000, alias="EXPORT_CHUNK_SIZE")
+    IMPORT_BATCH_SIZE: int = Field(default=5000, alias="IMPORT_BATCH_SIZE")
+    PREFLIGHT_CACHE_SIZE: int = Field(default=1024, alias="PREFLIGHT_CACHE_SIZE")
+    REPLAY_KEYFRAME_INTERVAL: int = Field(default=1000, alias="REPLAY_KEYFRAME_INTERVAL")
+    REPLAY_MAX_EVENTS: int = Field(default=500000, alias="REPLAY_MAX_EVENTS")
+    CLUSTER_NODES: str = Field(default="", alias="CLUSTER_NODES")
+    NODE_ID: str = Field(default="", alias="NODE_ID")
+    CLUSTER_VIRTUAL_NODES: int = Field(default=128, alias="CLUSTER_VIRTUAL_NODES")
+    CLUSTER_PROXY_TIMEOUT_SECONDS: float = Field(default=60.0, alias="CLUSTER_PROXY_TIMEOUT_SECONDS")
+    TRACE_SAMPLE_RATE: float = Field(default=0.0, alias="TRACE_SAMPLE_RATE")
+    TRACE_EXPORTER: str = Field(default="memory", alias="TRACE_EXPORTER")
+    TRACE_FILE: str = Field(default="traces.jsonl", alias="TRACE_FILE")
+    TRACE_MAX_TRACES: int = Field(default=200, alias="TRACE_MAX_TRACES")
+    TRACE_MAX_SPANS: int = Field(default=1000, alias="TRACE_MAX_SPANS")
+    TRACE_FOLLOW_PARENT: bool = Field(default=False, alias="TRACE_FOLLOW_PARENT")
     
     model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -1,6 +1,15 @@
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Iterable, Set, Tuple
 import uuid
+from .config import settings
+from .documents import DocumentStore, TextOperation
+from .hashring import new_session_id
+from .history import ExecutionHistoryStore
+from .replay import ReplayStore
+from .search import SessionIndex
+from .stats import SessionStats
+from .schemas import ExecutionResult
+from .tracing import trace_methods
 
 
 class InMemoryDatabase:
@@ -9,7 +18,51 @@ class InMemoryDatabase:
     def __init__(self):
         self.users: Dict[str, Dict[str, Any]] = {}
         self.sessions: Dict[str, Dict[str, Any]] = {}
-        self.participants: Dict[str, List[str]] = {}
+        self.participants: Dict[str, Dict[str, datetime]] = {}
+        self.memberships: Dict[str, Set[str]] = {}
+        self.documents = DocumentStore()
+        self.executions = ExecutionHistoryStore(
+            max_entries=settings.EXECUTION_HISTORY_SIZE,
+            output_limit=settings.EXECUTION_OUTPUT_LIMIT,
+            compress_threshold=settings.EXECUTION_COMPRESS_THRESHOLD
+        )
+        self.replays = ReplayStore(settings.REPLAY_KEYFRAME_INTERVAL, settings.REPLAY_MAX_EVENTS)
+        self.versions: Dict[str, int] = {}
+        # Versions restart at 1 when a session moves in through an import, so
+        # validators carry an epoch: one per node, and a new one per import
+        self.epoch = uuid.uuid4().hex[:8]
+        self.epochs: Dict[str, str] = {}
+        self.index = SessionIndex()
+        self.stats = SessionStats()
+        self.listeners: List[Callable[[str, Optional[int]], None]] = []
+        self.participant_listeners: List[Callable[[str], None]] = []
+    
+    def add_listener(self, listener: Callable[[str, Optional[int]], None]) -> None:
+        """Register a callback run with (session_id, version) after every session change"""
+        self.listeners.append(listener)
+    
+    def add_participant_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callback run with session_id when its participants join, leave or are renamed"""
+        self.participant_listeners.append(listener)
+    
+    def _participants_changed(self, session_id: str) -> None:
+        """Tell participant listeners and bump the session version"""
+        for listener in self.participant_listeners:
+            listener(session_id)
+        if session_id in self.sessions:
+            self._bump(session_id)
+    
+    def _notify(self, session_id: str, version: Optional[int]) -> None:
+        """Tell listeners a session changed; version is None once it is deleted"""
+        for listener in self.listeners:
+            listener(session_id, version)
+    
+    def _bump(self, session_id: str) -> int:
+        """Advance the version of a session after a mutation"""
+        version = self.versions.get(session_id, 0) + 1
+        self.versions[session_id] = version
+        self._notify(session_id, version)
+        return version
     
     def create_user(self, username: str, email: str, hashed_password: str) -> Dict[str, Any]:
         """Create a new user"""
@@ -31,6 +84,28 @@ class InMemoryDatabase:
             return {k: v for k, v in user.items() if k != "password"}
         return None
     
+    def get_users(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several users by ID in one pass"""
+        users = self.users
+        found = {}
+        for user_id in user_ids:
+            user = users.get(user_id)
+            if user:
+                found[user_id] = {k: v for k, v in user.items() if k != "password"}
+        return found
+    
+    def update_user(self, user_id: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """Update a user"""
+        user = self.users.get(user_id)
+        if not user:
+            return None
+        renamed = "username" in kwargs and kwargs["username"] != user["username"]
+        user.update(kwargs)
+        if renamed:
+            for session_id in self.memberships.get(user_id, ()):
+                self._participants_changed(session_id)
+        return {k: v for k, v in user.items() if k != "password"}
+    
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         for user in self.users.values():
@@ -47,7 +122,7 @@ class InMemoryDatabase:
         time_limit_minutes: int
     ) -> Dict[str, Any]:
         """Create a new coding session"""
-        session_id = str(uuid.uuid4())
+        session_id = new_session_id()
         session = {
             "id": session_id,
             "title": title,
@@ -60,13 +135,45 @@ class InMemoryDatabase:
             "status": "active"
         }
         self.sessions[session_id] = session
-        self.participants[session_id] = [created_by]
+        self.participants[session_id] = {created_by: session["created_at"]}
+        self.memberships.setdefault(created_by, set()).add(session_id)
+        self.documents.create(session_id)
+        self.replays.create(session_id)
+        self.index.add(session)
+        self.stats.session_added(session)
+        self._bump(session_id)
         return session
     
+    def create_sessions(self, items: Iterable[Dict[str, Any]], created_by: str) -> List[Dict[str, Any]]:
+        """Create several sessions for one creator"""
+        return [self.create_session(created_by=created_by, **item) for item in items]
+    
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session by ID"""
         return self.sessions.get(session_id)
     
+    def get_sessions_by_ids(self, session_ids: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get several sessions by ID, with None for unknown IDs"""
+        sessions = self.sessions
+        return [sessions.get(session_id) for session_id in session_ids]
+    
+    def get_participant_count(self, session_id: str) -> int:
+        """Get the number of participants in a session"""
+        return len(self.participants.get(session_id, ()))
+    
+    def search_sessions(self, **filters) -> Tuple[List[Dict[str, Any]], int]:
+        """Search sessions through the index, newest first"""
+        session_ids, total = self.index.search(**filters)
+        return [self.sessions[session_id] for session_id in session_ids], total
+    
+    def get_session_version(self, session_id: str) -> Optional[int]:
+        """Get the version of a session, bumped on every mutation"""
+        return self.versions.get(session_id)
+    
+    def get_session_epoch(self, session_id: str) -> str:
+        """Get the epoch its version counts from, distinct on every node and import"""
+        return self.epochs.get(session_id, self.epoch)
+    
     def get_sessions(self, created_by: str = None) -> List[Dict[str, Any]]:
         """Get all sessions, optionally filtered by creator"""
         if created_by:
@@ -84,44 +191,162 @@ class InMemoryDatabase:
         """Update a session"""
         session = self.sessions.get(session_id)
         if session:
+            before = {"status": session["status"], "language": session["language"], "created_by": session["created_by"]}
             session.update(kwargs)
+            self.index.add(session)
+            self.stats.session_updated(before, session)
+            self._bump(session_id)
             return session
         return None
     
     def delete_session(self, session_id: str) -> bool:
         """Delete a session"""
         if session_id in self.sessions:
-            del self.sessions[session_id]
-            if session_id in self.participants:
-                del self.participants[session_id]
+            self.stats.session_removed(self.sessions.pop(session_id))
+            for user_id in self.participants.pop(session_id, {}):
+                self.memberships.get(user_id, set()).discard(session_id)
+            self.documents.delete(session_id)
+            self.executions.delete(session_id)
+            self.replays.delete(session_id)
+            self.index.remove(session_id)
+            self.versions.pop(session_id, None)
+            self.epochs.pop(session_id, None)
+            for listener in self.participant_listeners:
+                listener(session_id)
+            self._notify(session_id, None)
             return True
         return False
     
+    def delete_sessions(self, session_ids: Iterable[str], user_id: str) -> List[str]:
+        """Delete several sessions owned by user_id
+
+        Returns "deleted", "not_found" or "forbidden" for each ID.
+        """
+        outcomes = []
+        for session_id in session_ids:
+            session = self.sessions.get(session_id)
+            if session is None:
+                outcomes.append("not_found")
+            elif session["created_by"] != user_id:
+                outcomes.append("forbidden")
+            else:
+                self.delete_session(session_id)
+                outcomes.append("deleted")
+        return outcomes
+    
     def add_participant(self, session_id: str, user_id: str) -> bool:
         """Add a participant to a session"""
-        if session_id in self.participants:
-            if user_id not in self.participants[session_id]:
-                self.participants[session_id].append(user_id)
-            return True
-        return False
+        participants = self.participants.get(session_id)
+        if participants is None:
+            return False
+        if user_id not in participants:
+            participants[user_id] = datetime.utcnow()
+            self.memberships.setdefault(user_id, set()).add(session_id)
+            self._participants_changed(session_id)
+        return True
+    
+    def remove_participant(self, session_id: str, user_id: str) -> bool:
+        """Remove a participant from a session"""
+        participants = self.participants.get(session_id)
+        if participants is None or user_id not in participants:
+            return False
+        del participants[user_id]
+        self.memberships.get(user_id, set()).discard(session_id)
+        self._participants_changed(session_id)
+        return True
     
     def get_participants(self, session_id: str) -> List[str]:
         """Get participants of a session"""
-        return self.participants.get(session_id, [])
+        return list(self.participants.get(session_id, ()))
+    
+    def get_participant_join_times(self, session_id: str) -> Dict[str, datetime]:
+        """Get participants of a session mapped to when they joined"""
+        return self.participants.get(session_id, {})
     
-    def update_session_code(self, session_id: str, code: str) -> bool:
+    def update_session_code(self, session_id: str, code: str, author: Optional[str] = None) -> bool:
         """Update the code in a session"""
         session = self.sessions.get(session_id)
         if session:
-            session["code"] = code
+            document = self.documents.get(session_id)
+            applied = document.replace(code)
+            session["code"] = document.text
+            self._bump(session_id)
+            self.replays.record(session_id, applied, document.text, author)
             return True
         return False
     
     def get_session_code(self, session_id: str) -> Optional[str]:
         """Get the code from a session"""
+        document = self.documents.get(session_id)
+        return document.text if document else None
+    
+    def apply_code_operation(
+        self,
+        session_id: str,
+        revision: int,
+        operation: TextOperation,
+        author: Optional[str] = None
+    ) -> Optional[TextOperation]:
+        """Merge an edit operation into the session code and return it as applied"""
         session = self.sessions.get(session_id)
-        return session["code"] if session else None
+        if not session:
+            return None
+        document = self.documents.get(session_id)
+        applied = document.apply(revision, operation)
+        session["code"] = document.text
+        self._bump(session_id)
+        self.replays.record(session_id, applied, document.text, author)
+        return applied
+
+    
+    def record_execution(self, session_id: str, result: ExecutionResult) -> bool:
+        """Store an execution result in the session history"""
+        session = self.sessions.get(session_id)
+        if not session:
+            return False
+        self.executions.record(session_id, result)
+        self.stats.execution_recorded(session, result.execution_time)
+        self._bump(session_id)
+        return True
+    
+    def get_last_execution(self, session_id: str) -> Optional[ExecutionResult]:
+        """Get the most recent execution result of a session"""
+        return self.executions.last(session_id)
+
+    def import_users(self, users: List[Dict[str, Any]]) -> int:
+        """Add exported users with their password hashes, skipping known IDs"""
+        existing = self.users
+        added = 0
+        for user in users:
+            if user["id"] not in existing:
+                existing[user["id"]] = user
+                added += 1
+        return added
+
+    def import_sessions(self, sessions: List[Tuple[Dict[str, Any], Dict[str, datetime]]]) -> int:
+        """Add exported sessions with their participants, skipping known IDs"""
+        added = 0
+        epoch = uuid.uuid4().hex[:8]
+        # Indexing in creation order keeps the index timeline append-only
+        for session, participants in sorted(sessions, key=lambda item: item[0]["created_at"]):
+            session_id = session["id"]
+            if session_id in self.sessions:
+                continue
+            self.sessions[session_id] = session
+            self.participants[session_id] = participants
+            self.epochs[session_id] = epoch
+            for user_id in participants:
+                self.memberships.setdefault(user_id, set()).add(session_id)
+            self.documents.create(session_id, session["code"])
+            self.replays.create(session_id, session["code"])
+            self.index.add(session)
+            self.stats.session_added(session)
+            self._bump(session_id)
+            added += 1
+        return added
+
 
+trace_methods(InMemoryDatabase, "db", exclude=("add_listener", "add_participant_listener"))
 
 # Global database instance
 db = InMemoryDatabase()
@@ -0,0 +1,277 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple, Union
+
+Component = Union[int, str]
+
+
+class OperationError(ValueError):
+    """Raised when an edit operation is malformed or does not fit the document"""
+
+
+class StaleRevisionError(Exception):
+    """Raised when an operation is based on a revision that is no longer available"""
+
+
+class TextOperation:
+    """Edit operation made of retain (n > 0), delete (n < 0) and insert (str) components"""
+
+    __slots__ = ("ops", "base_length", "target_length")
+
+    def __init__(self):
+        self.ops: List[Component] = []
+        self.base_length = 0
+        self.target_length = 0
+
+    @classmethod
+    def from_list(cls, components: List[Component]) -> "TextOperation":
+        """Build an operation from its JSON representation"""
+        operation = cls()
+        for component in components:
+            if isinstance(component, bool):
+                raise OperationError(f"Invalid component: {component!r}")
+            if isinstance(component, int):
+                if component > 0:
+                    operation.retain(component)
+                elif component < 0:
+                    operation.delete(-component)
+                else:
+                    raise OperationError("Zero-length component")
+            elif isinstance(component, str):
+                try:
+                    component.encode("utf-8")
+                except UnicodeEncodeError:
+                    raise OperationError("Insert is not valid UTF-8 text") from None
+                operation.insert(component)
+            else:
+                raise OperationError(f"Invalid component: {component!r}")
+        return operation
+
+    def to_list(self) -> List[Component]:
+        """Return the JSON representation of the operation"""
+        return list(self.ops)
+
+    def retain(self, n: int) -> "TextOperation":
+        """Skip over n characters"""
+        if n <= 0:
+            return self
+        self.base_length += n
+        self.target_length += n
+        if self.ops and _is_retain(self.ops[-1]):
+            self.ops[-1] += n
+        else:
+            self.ops.append(n)
+        return self
+
+    def insert(self, text: str) -> "TextOperation":
+        """Insert text at the current position"""
+        if not text:
+            return self
+        self.target_length += len(text)
+        ops = self.ops
+        if ops and isinstance(ops[-1], str):
+            ops[-1] += text
+        elif ops and _is_delete(ops[-1]):
+            # Keep inserts ahead of deletes so equal operations have one form
+            if len(ops) > 1 and isinstance(ops[-2], str):
+                ops[-2] += text
+            else:
+                ops.insert(len(ops) - 1, text)
+        else:
+            ops.append(text)
+        return self
+
+    def delete(self, n: int) -> "TextOperation":
+        """Delete n characters at the current position"""
+        if n <= 0:
+            return self
+        self.base_length += n
+        if self.ops and _is_delete(self.ops[-1]):
+            self.ops[-1] -= n
+        else:
+            self.ops.append(-n)
+        return self
+
+    def is_noop(self) -> bool:
+        """Check whether the operation leaves the document unchanged"""
+        return not self.ops or (len(self.ops) == 1 and _is_retain(self.ops[0]))
+
+    def apply(self, text: str) -> str:
+        """Apply the operation to text"""
+        if len(text) != self.base_length:
+            raise OperationError(
+                f"Operation expects a document of length {self.base_length}, got {len(text)}"
+            )
+        parts = []
+        index = 0
+        for component in self.ops:
+            if isinstance(component, str):
+                parts.append(component)
+            elif component > 0:
+                parts.append(text[index:index + component])
+                index += component
+            else:
+                index -= component
+        return "".join(parts)
+
+    @staticmethod
+    def transform(a: "TextOperation", b: "TextOperation") -> Tuple["TextOperation", "TextOperation"]:
+        """Transform concurrent operations a and b into (a', b')
+
+        apply(apply(s, a), b') == apply(apply(s, b), a'). When both insert at the
+        same position, the text from a goes first.
+        """
+        if a.base_length != b.base_length:
+            raise OperationError("Concurrent operations must share a base document")
+
+        a_prime = TextOperation()
+        b_prime = TextOperation()
+        ops_a, ops_b = a.ops, b.ops
+        i = j = 0
+        op_a = ops_a[0] if ops_a else None
+        op_b = ops_b[0] if ops_b else None
+
+        while op_a is not None or op_b is not None:
+            if isinstance(op_a, str):
+                a_prime.insert(op_a)
+                b_prime.retain(len(op_a))
+                i += 1
+                op_a = ops_a[i] if i < len(ops_a) else None
+                continue
+            if isinstance(op_b, str):
+                a_prime.retain(len(op_b))
+                b_prime.insert(op_b)
+                j += 1
+                op_b = ops_b[j] if j < len(ops_b) else None
+                continue
+            if op_a is None or op_b is None:
+                raise OperationError("Operations are not compatible")
+
+            if op_a > 0 and op_b > 0:
+                n = min(op_a, op_b)
+                a_prime.retain(n)
+                b_prime.retain(n)
+            elif op_a < 0 and op_b < 0:
+                n = min(-op_a, -op_b)
+                op_a, op_b = op_a + n, op_b + n
+                i, op_a = _advance(ops_a, i, op_a)
+                j, op_b = _advance(ops_b, j, op_b)
+                continue
+            elif op_a < 0:
+                n = min(-op_a, op_b)
+                a_prime.delete(n)
+                op_a, op_b = op_a + n, op_b - n
+                i, op_a = _advance(ops_a, i, op_a)
+                j, op_b = _advance(ops_b, j, op_b)
+                continue
+            else:
+                n = min(op_a, -op_b)
+                b_prime.delete(n)
+                op_a, op_b = op_a - n, op_b + n
+                i, op_a = _advance(ops_a, i, op_a)
+                j, op_b = _advance(ops_b, j, op_b)
+                continue
+
+            op_a, op_b = op_a - n, op_b - n
+            i, op_a = _advance(ops_a, i, op_a)
+            j, op_b = _advance(ops_b, j, op_b)
+
+        return a_prime, b_prime
+
+
+def _is_retain(component: Component) -> bool:
+    return isinstance(component, int) and component > 0
+
+
+def _is_delete(component: Component) -> bool:
+    return isinstance(component, int) and component < 0
+
+
+def _advance(ops: List[Component], index: int, remaining: Component):
+    """Move to the next component once the current one is used up"""
+    if remaining == 0:
+        index += 1
+        return index, ops[index] if index < len(ops) else None
+    return index, remaining
+
+
+class Document:
+    """Server copy of a session's code with the recent operation history"""
+
+    __slots__ = ("text", "revision", "history", "history_start")
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.revision = 0
+        self.history: List[TextOperation] = []
+        self.history_start = 0
+
+    def apply(self, revision: int, operation: TextOperation) -> TextOperation:
+        """Merge an operation based on `revision` and return it as applied"""
+        if revision > self.revision:
+            raise OperationError(f"Unknown revision {revision}")
+        if revision < self.history_start:
+            raise StaleRevisionError(
+                f"Revision {revision} was compacted, resync from revision {self.revision}"
+            )
+        for concurrent in self.history[revision - self.history_start:]:
+            operation = TextOperation.transform(operation, concurrent)[0]
+        self.text = operation.apply(self.text)
+        self.history.append(operation)
+        self.revision += 1
+        return operation
+
+    def replace(self, text: str) -> TextOperation:
+        """Overwrite the whole document as a single operation"""
+        operation = TextOperation().delete(len(self.text)).insert(text)
+        return self.apply(self.revision, operation)
+
+    def operations_since(self, revision: int) -> List[TextOperation]:
+        """Return the operations applied after `revision`"""
+        if revision > self.revision:
+            raise OperationError(f"Unknown revision {revision}")
+        if revision < self.history_start:
+            raise StaleRevisionError(
+                f"Revision {revision} was compacted, resync from revision {self.revision}"
+            )
+        return self.history[revision - self.history_start:]
+
+    def compact(self, history_limit: int) -> int:
+        """Drop history beyond `history_limit` operations and return how many were dropped"""
+        excess = len(self.history) - history_limit
+        if excess <= 0:
+            return 0
+        del self.history[:excess]
+        self.history_start += excess
+        return excess
+
+
+class DocumentStore:
+    """Documents for all sessions, keyed by session id"""
+
+    def __init__(self):
+        self.documents: Dict[str, Document] = {}
+
+    def create(self, session_id: str, text: str = "") -> Document:
+        """Create the document for a session"""
+        document = Document(text)
+        self.documents[session_id] = document
+        return document
+
+    def get(self, session_id: str) -> Optional[Document]:
+        """Get the document for a session"""
+        return self.documents.get(session_id)
+
+    def delete(self, session_id: str) -> None:
+        """Delete the document for a session"""
+        self.documents.pop(session_id, None)
+
+    def compact(self, history_limit: int) -> int:
+        """Compact the history of every document"""
+        return sum(document.compact(history_limit) for document in list(self.documents.values()))
+
+
+async def run_compaction(store: DocumentStore, history_limit: int, interval: float) -> None:
+    """Periodically compact document history in the background"""
+    while True:
+        await asyncio.sleep(interval)
+        store.compact(history_limit)
@@ -1,7 +1,24 @@
+import os
 import subprocess
 import time
-from typing import Optional
-from .schemas import ExecutionResult, Language
+from typing import Dict, List, Optional
+from .metrics import code_execution_duration, code_executions_in_progress
+from .preflight import syntax_checker
+from .schemas import DEFAULT_ENTRYPOINTS, ExecutionResult, Language
+from .tracing import tracer
+from .workspaces import workspace_pool, write_files
+
+_INTERPRETERS = {
+    Language.PYTHON: "python",
+    Language.JAVASCRIPT: "node",
+}
+
+
+def _relative(text: str, workspace: str) -> str:
+    """Strip the workspace directory from paths in tool output"""
+    for prefix in {workspace, os.path.realpath(workspace)}:
+        text = text.replace(prefix + os.sep, "")
+    return text
 
 
 class CodeExecutor:
@@ -14,15 +31,35 @@ class CodeExecutor:
         self,
         code: str,
         language: Language,
-        stdin: Optional[str] = None
+        stdin: Optional[str] = None,
+        files: Optional[Dict[str, str]] = None,
+        entrypoint: Optional[str] = None
     ) -> ExecutionResult:
         """Execute code and return result"""
         
-        if language == Language.PYTHON:
-            return await self._execute_python(code, stdin)
-        elif language == Language.JAVASCRIPT:
-            return await self._execute_javascript(code, stdin)
-        else:
+        code_executions_in_progress.inc(language.value)
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            with tracer.span("executor.execute", language=language.value, code_bytes=len(code)):
+                result = await self._execute(code, language, stdin, files or {}, entrypoint)
+            outcome = "success" if result.success else "failure"
+            return result
+        finally:
+            code_executions_in_progress.dec(language.value)
+            code_execution_duration.observe(time.perf_counter() - start_time, language.value, outcome)
+    
+    async def _execute(
+        self,
+        code: str,
+        language: Language,
+        stdin: Optional[str],
+        files: Dict[str, str],
+        entrypoint: Optional[str]
+    ) -> ExecutionResult:
+        """Check the submission and run it from a workspace"""
+        interpreter = _INTERPRETERS.get(language)
+        if interpreter is None:
             return ExecutionResult(
                 success=False,
                 output=f"Language {language} not supported",
@@ -31,72 +68,73 @@ class CodeExecutor:
                 return_code=1,
                 execution_time=0
             )
-    
-    async def _execute_python(self, code: str, stdin: Optional[str]) -> ExecutionResult:
-        """Execute Python code"""
+        
+        start_time = time.time()
+        entrypoint = entrypoint or DEFAULT_ENTRYPOINTS[language]
+        sources = {**files, entrypoint: code}
+        with tracer.span("executor.preflight", files=len(sources)):
+            for name, source in sources.items():
+                if language == Language.PYTHON and not name.endswith(".py"):
+                    continue
+                error = syntax_checker.check(source, language, name)
+                if error is not None:
+                    return ExecutionResult(
+                        success=False,
+                        output=error,
+                        stdout="",
+                        stderr=error,
+                        return_code=1,
+                        execution_time=time.time() - start_time
+                    )
+        
+        workspace = workspace_pool.acquire()
         try:
-            start_time = time.time()
-            result = subprocess.run(
-                ["python", "-c", code],
-                input=stdin,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
-            )
-            execution_time = time.time() - start_time
-            
-            output = result.stdout + result.stderr
-            
-            return ExecutionResult(
-                success=result.returncode == 0,
-                output=output,
-                stdout=result.stdout,
-                stderr=result.stderr,
-                return_code=result.returncode,
-                execution_time=execution_time
-            )
-        except subprocess.TimeoutExpired:
-            return ExecutionResult(
-                success=False,
-                output="Execution timeout",
-                stdout="",
-                stderr="Execution timeout",
-                return_code=-1,
-                execution_time=self.timeout
-            )
-        except Exception as e:
-            return ExecutionResult(
-                success=False,
-                output=str(e),
-                stdout="",
-                stderr=str(e),
-                return_code=-1,
-                execution_time=0
-            )
+            with tracer.span("executor.prepare_workspace"):
+                try:
+                    write_files(workspace, sources)
+                except (OSError, ValueError) as e:
+                    error = _relative(f"Could not write submission files: {e}", workspace)
+                    return ExecutionResult(
+                        success=False,
+                        output=error,
+                        stdout="",
+                        stderr=error,
+                        return_code=1,
+                        execution_time=time.time() - start_time
+                    )
+            return await self._run([interpreter, entrypoint], workspace, stdin)
+        finally:
+            workspace_pool.release(workspace)
     
-    async def _execute_javascript(self, code: str, stdin: Optional[str]) -> ExecutionResult:
-        """Execute JavaScript code"""
+    async def _run(self, command: List[str], workspace: str, stdin: Optional[str]) -> ExecutionResult:
+        """Run an interpreter on the entrypoint inside a workspace"""
         try:
             start_time = time.time()
-            result = subprocess.run(
-                ["node", "-e", code],
-                input=stdin,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
-            )
+            with tracer.span("executor.run_process"):
+                result = subprocess.run(
+                    command,
+                    cwd=workspace,
+                    input=stdin,
+                    capture_output=True,
+                    text=True,
+                    timeout=self.timeout
+                )
             execution_time = time.time() - start_time
             
-            output = result.stdout + result.stderr
-            
-            return ExecutionResult(
-                success=result.returncode == 0,
-                output=output,
-                stdout=result.stdout,
-                stderr=result.stderr,
-                return_code=result.returncode,
-                execution_time=execution_time
-            )
+            with tracer.span("executor.build_result"):
+                # Node reports errors by absolute path; show paths relative to
+                # the workspace, as Python tracebacks of the entrypoint do
+                stderr = _relative(result.stderr, workspace)
+                output = result.stdout + stderr
+                
+                return ExecutionResult(
+                    success=result.returncode == 0,
+                    output=output,
+                    stdout=result.stdout,
+                    stderr=stderr,
+                    return_code=result.returncode,
+                    execution_time=execution_time
+                )
         except subprocess.TimeoutExpired:
             return ExecutionResult(
                 success=False,
@@ -0,0 +1,90 @@
+import hashlib
+import uuid
+from bisect import bisect
+from typing import Dict, List, Optional, Tuple
+from .config import settings
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def parse_nodes(spec: str) -> Dict[str, str]:
+    """Parse "node-a=http://10.0.0.1:8000,node-b=http://10.0.0.2:8000" into node ID -> base URL"""
+    nodes = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        node_id, separator, url = item.partition("=")
+        if not separator or not node_id.strip() or not url.strip():
+            raise ValueError(f"Invalid cluster node {item!r}, expected id=url")
+        nodes[node_id.strip()] = url.strip().rstrip("/")
+    return nodes
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to nodes
+
+    Each node is placed on the ring at `vnodes` points; a key belongs to the
+    node of the first point at or after its hash. Adding or removing a node
+    only moves the keys between its points and their predecessors, about
+    1/N of all keys, and spreading many points per node keeps the share of
+    each node even.
+    """
+
+    def __init__(self, nodes: Optional[Dict[str, str]] = None, vnodes: int = 128):
+        self.vnodes = vnodes
+        self.nodes: Dict[str, str] = {}
+        self.points: List[int] = []
+        self.owners: List[str] = []
+        self.set_nodes(nodes or {})
+
+    def set_nodes(self, nodes: Dict[str, str]) -> None:
+        """Replace the ring membership"""
+        ring: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node_id}#{replica}"), node_id)
+            for node_id in nodes
+            for replica in range(self.vnodes)
+        )
+        self.nodes = dict(nodes)
+        self.points = [point for point, _ in ring]
+        self.owners = [node_id for _, node_id in ring]
+
+    def add(self, node_id: str, url: str) -> None:
+        """Add a node, or change the URL of a known node"""
+        self.set_nodes({**self.nodes, node_id: url})
+
+    def remove(self, node_id: str) -> None:
+        """Remove a node; its keys move to the next nodes on the ring"""
+        self.set_nodes({key: url for key, url in self.nodes.items() if key != node_id})
+
+    def node_for(self, key: str) -> Optional[str]:
+        """The node owning a key, or None for an empty ring"""
+        if not self.points:
+            return None
+        index = bisect(self.points, _hash(key))
+        return self.owners[index % len(self.owners)]
+
+    def owns(self, node_id: str, key: str) -> bool:
+        """Whether a key belongs to a node; every key is local without a cluster"""
+        owner = self.node_for(key)
+        return owner is None or owner == node_id
+
+
+def new_session_id() -> str:
+    """A random session ID owned by this node
+
+    Rejection sampling takes N tries on average for N equal nodes. A node
+    that has left the ring, and is draining, mints plain random IDs.
+    """
+    if settings.NODE_ID not in ring.nodes:
+        return str(uuid.uuid4())
+    while True:
+        session_id = str(uuid.uuid4())
+        if ring.node_for(session_id) == settings.NODE_ID:
+            return session_id
+
+
+# Global ring built from CLUSTER_NODES; empty when running as a single node
+ring = HashRing(parse_nodes(settings.CLUSTER_NODES), settings.CLUSTER_VIRTUAL_NODES)
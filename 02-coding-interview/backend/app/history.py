@@ -0,0 +1,110 @@
+import json
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterator, Optional
+from .schemas import ExecutionResult, ExecutionRecord
+
+TRUNCATED_MARKER = "\n... [output truncated]"
+
+
+class _Entry:
+    """One stored execution; outputs above the compression threshold are zlib-compressed"""
+
+    __slots__ = ("executed_at", "success", "return_code", "execution_time", "outputs", "compressed")
+
+    def __init__(self, result: ExecutionResult, executed_at: datetime, compress_threshold: int):
+        self.executed_at = executed_at
+        self.success = result.success
+        self.return_code = result.return_code
+        self.execution_time = result.execution_time
+        outputs = (result.output, result.stdout, result.stderr)
+        if sum(len(text) for text in outputs) > compress_threshold:
+            self.outputs = zlib.compress(json.dumps(outputs).encode())
+            self.compressed = True
+        else:
+            self.outputs = outputs
+            self.compressed = False
+
+    def to_record(self) -> ExecutionRecord:
+        """Rebuild the full execution record"""
+        outputs = json.loads(zlib.decompress(self.outputs)) if self.compressed else self.outputs
+        output, stdout, stderr = outputs
+        return ExecutionRecord(
+            success=self.success,
+            output=output,
+            stdout=stdout,
+            stderr=stderr,
+            return_code=self.return_code,
+            execution_time=self.execution_time,
+            executed_at=self.executed_at
+        )
+
+
+class SessionExecutions:
+    """Ring buffer of the most recent executions of one session"""
+
+    __slots__ = ("entries", "last")
+
+    def __init__(self, max_entries: int):
+        self.entries: Deque[_Entry] = deque(maxlen=max_entries)
+        self.last: Optional[ExecutionResult] = None
+
+
+class ExecutionHistoryStore:
+    """Bounded execution history for all sessions
+
+    Each output field is capped at `output_limit` characters, so a session
+    never holds more than `max_entries` + 1 results of bounded size.
+    """
+
+    def __init__(self, max_entries: int = 20, output_limit: int = 65536, compress_threshold: int = 1024):
+        self.max_entries = max_entries
+        self.output_limit = output_limit
+        self.compress_threshold = compress_threshold
+        self.sessions: Dict[str, SessionExecutions] = {}
+
+    def _cap(self, result: ExecutionResult) -> ExecutionResult:
+        """Truncate oversized outputs, returning the same object when nothing is cut"""
+        limit = self.output_limit
+        if max(len(result.output), len(result.stdout), len(result.stderr)) <= limit:
+            return result
+        return result.model_copy(update={
+            field: text[:limit] + TRUNCATED_MARKER
+            for field in ("output", "stdout", "stderr")
+            if len(text := getattr(result, field)) > limit
+        })
+
+    def record(self, session_id: str, result: ExecutionResult) -> None:
+        """Store an execution result for a session"""
+        executions = self.sessions.get(session_id)
+        if executions is None:
+            executions = self.sessions[session_id] = SessionExecutions(self.max_entries)
+        result = self._cap(result)
+        executions.entries.append(_Entry(result, datetime.utcnow(), self.compress_threshold))
+        executions.last = result
+
+    def last(self, session_id: str) -> Optional[ExecutionResult]:
+        """Get the most recent execution result of a session"""
+        executions = self.sessions.get(session_id)
+        return executions.last if executions else None
+
+    def count(self, session_id: str) -> int:
+        """Number of stored executions of a session"""
+        executions = self.sessions.get(session_id)
+        return len(executions.entries) if executions else 0
+
+    def iter_records(self, session_id: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[ExecutionRecord]:
+        """Yield stored executions newest first, decompressing one at a time"""
+        executions = self.sessions.get(session_id)
+        if not executions:
+            return
+        entries = list(executions.entries)
+        end = len(entries) - offset
+        start = 0 if limit is None else max(end - limit, 0)
+        for entry in reversed(entries[start:max(end, 0)]):
+            yield entry.to_record()
+
+    def delete(self, session_id: str) -> None:
+        """Drop the history of a session"""
+        self.sessions.pop(session_id, None)
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .config import settings
+from .metrics import Counter, Gauge, Histogram, registry
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Requests that can be retried later without hurting a running interview:
+# list and search pages, statistics, replays and the polling endpoints
+_LOW_PRIORITY = (
+    ("list", re.compile(r"^/api/sessions/?$")),
+    ("search", re.compile(r"^/api/sessions/search$")),
+    ("stats", re.compile(r"^/api/sessions/stats$")),
+    ("participants", re.compile(r"^/api/sessions/[^/]+/participants$")),
+    ("changes", re.compile(r"^/api/sessions/[^/]+/changes$")),
+    ("executions", re.compile(r"^/api/sessions/[^/]+/executions$")),
+    ("replay", re.compile(r"^/api/sessions/[^/]+/replay$")),
+)
+_SESSION_DETAIL = re.compile(r"^/api/sessions/[^/]+$")
+POLL_HEADER = b"x-poll"
+
+
+def _format_stack(frame, limit: int = 30) -> List[str]:
+    return [
+        f"{entry.filename}:{entry.lineno} in {entry.name}"
+        for entry in traceback.extract_stack(frame)[-limit:]
+    ]
+
+
+class LoopMonitor:
+    """Measures event loop lag with a heartbeat task
+
+    The heartbeat sleeps for `interval` and records how late it wakes up. A
+    watchdog thread notices when the heartbeat is overdue by more than
+    `slow_threshold` and captures what the loop thread is running, which is
+    the callback blocking the loop.
+    """
+
+    def __init__(self, interval: float = 0.1, slow_threshold: float = 0.1, max_slow_callbacks: int = 20):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        # Rises to a new peak immediately and decays over a few heartbeats
+        self.lag = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.beat = time.monotonic()
+        self.thread_id: Optional[int] = None
+        self.slow_callbacks: Deque[dict] = deque(maxlen=max_slow_callbacks)
+        self.pending: Optional[dict] = None
+        self.stopped = threading.Event()
+
+    def record(self, lag: float) -> None:
+        """Record the lag measured by one heartbeat"""
+        self.last_lag = lag
+        self.lag = lag if lag > self.lag else self.lag * 0.8 + lag * 0.2
+        self.max_lag = max(self.max_lag, lag)
+        loop_lag.observe(lag)
+        pending = self.pending
+        if pending is not None:
+            pending["blocked_seconds"] = max(pending["blocked_seconds"], lag)
+            self.pending = None
+
+    async def run(self) -> None:
+        """Heartbeat until cancelled, with the watchdog thread alongside"""
+        self.thread_id = threading.get_ident()
+        self.beat = time.monotonic()
+        self.stopped.clear()
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        try:
+            while True:
+                start = time.monotonic()
+                await asyncio.sleep(self.interval)
+                self.beat = time.monotonic()
+                self.record(max(self.beat - start - self.interval, 0.0))
+        finally:
+            self.stopped.set()
+
+    def _watch(self) -> None:
+        captured = None
+        while not self.stopped.wait(self.slow_threshold / 2):
+            beat = self.beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.slow_threshold or beat == captured:
+                continue
+            captured = beat
+            frame = sys._current_frames().get(self.thread_id)
+            slow = {
+                "detected_at": datetime.utcnow().isoformat(),
+                "blocked_seconds": blocked,
+                "stack": _format_stack(frame) if frame is not None else []
+            }
+            self.slow_callbacks.append(slow)
+            self.pending = slow
+            slow_callbacks.inc()
+
+    def snapshot(self) -> dict:
+        """Current lag figures and the most recent slow callbacks"""
+        return {
+            "lag_seconds": self.lag,
+            "last_lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag,
+            "slow_callbacks": list(reversed(self.slow_callbacks))
+        }
+
+
+def low_priority_endpoint(scope: Scope) -> Optional[str]:
+    """Name the low-priority endpoint a request is for, or None for core traffic"""
+    if scope["method"] != "GET":
+        return None
+    path = scope["path"]
+    for name, pattern in _LOW_PRIORITY:
+        if pattern.match(path):
+            return name
+    # The frontend marks its periodic refreshes of a session with X-Poll;
+    # browsers add If-None-Match on their own, even when a session is opened
+    if _SESSION_DETAIL.match(path):
+        for key, value in scope["headers"]:
+            if key == POLL_HEADER:
+                return "session_poll" if value == b"1" else None
+    return None
+
+
+class LoadSheddingMiddleware:
+    """Reject low-priority requests with 503 while event loop lag is above a threshold"""
+
+    def __init__(self, app: ASGIApp, monitor: LoopMonitor, threshold: float, retry_after: int = 2):
+        self.app = app
+        self.monitor = monitor
+        self.threshold = threshold
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.threshold > 0 and self.monitor.lag > self.threshold:
+            endpoint = low_priority_endpoint(scope)
+            if endpoint is not None:
+                requests_shed.inc(endpoint)
+                body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(self.retry_after).encode()),
+                    ]
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
+
+
+# Global monitor instance and its metrics
+loop_monitor = LoopMonitor(settings.LOOP_LAG_INTERVAL_SECONDS, settings.LOOP_SLOW_CALLBACK_SECONDS)
+
+loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop heartbeat woke up",
+    buckets=LAG_BUCKETS
+))
+registry.register(Gauge(
+    "event_loop_lag_smoothed_seconds",
+    "Recent event loop lag used for load shedding",
+    function=lambda: loop_monitor.lag
+))
+slow_callbacks = registry.register(Counter(
+    "event_loop_slow_callbacks_total",
+    "Callbacks that blocked the event loop longer than the slow threshold"
+))
+requests_shed = registry.register(Counter(
+    "http_requests_shed_total",
+    "Low-priority requests rejected with 503 while the event loop lagged",
+    ("endpoint",)
+))
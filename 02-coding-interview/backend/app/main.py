@@ -1,49 +1,147 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from .routes import health, auth, sessions
+from .cluster import ClusterMiddleware, peers
+from .config import settings
+from .database import db
+from .hashring import ring
+from .documents import run_compaction
+from .loop_monitor import LoadSheddingMiddleware, loop_monitor
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware, profiler
+from .revocation import run_pruning
+from .security import revocations
+from .static_files import APIGZipMiddleware, PrecompressedStaticFiles
+from .tracing import TracingMiddleware, tracer
+from .workspaces import workspace_pool
+from .routes import health, auth, sessions, metrics, admin
 
-# Create FastAPI app
-app = FastAPI(
-    title="Coding Interview Platform",
-    description="API for online coding interviews",
-    version="1.0.0"
-)
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background maintenance tasks for the lifetime of the app"""
+    compaction = asyncio.create_task(run_compaction(
+        db.documents,
+        settings.DOCUMENT_HISTORY_LIMIT,
+        settings.DOCUMENT_COMPACT_INTERVAL_SECONDS
+    ))
+    pruning = asyncio.create_task(run_pruning(
+        revocations,
+        settings.REVOCATION_PRUNE_INTERVAL_SECONDS
+    ))
+    monitor = asyncio.create_task(loop_monitor.run())
+    yield
+    compaction.cancel()
+    pruning.cancel()
+    monitor.cancel()
+    workspace_pool.close()
+    await peers.close()
 
-# Include routers
-app.include_router(
-    health.router,
-    prefix="/api",
-    tags=["health"]
-)
-app.include_router(
-    auth.router,
-    prefix="/api/auth",
-    tags=["auth"]
-)
-app.include_router(
-    sessions.router,
-    prefix="/api/sessions",
-    tags=["sessions"]
-)
 
+def create_app() -> FastAPI:
+    """Build the FastAPI application
 
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {"message": "Coding Interview Platform API"}
+    Wires middleware, routes and the lifespan around the module-level stores
+    (db, the tracer, the hash ring, the workspace pool, revocations), so apps
+    built in one process share them.
+    """
+    if ring.nodes and settings.NODE_ID not in ring.nodes:
+        raise ValueError(f"NODE_ID {settings.NODE_ID!r} is not one of CLUSTER_NODES")
+    if ring.nodes and not settings.ADMIN_TOKEN:
+        # Replication and handoff go through the admin endpoints of other nodes
+        raise ValueError("ADMIN_TOKEN must be set when CLUSTER_NODES is")
+    
+    app = FastAPI(
+        title="Coding Interview Platform",
+        description="API for online coding interviews",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    
+    # Shed polling and list traffic while the event loop lags; inside CORS
+    # so browsers can read the 503
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        monitor=loop_monitor,
+        threshold=settings.LOAD_SHED_LAG_SECONDS,
+        retry_after=settings.LOAD_SHED_RETRY_AFTER_SECONDS
+    )
+    
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    # Compress API responses; static files carry their own encodings
+    app.add_middleware(APIGZipMiddleware, minimum_size=settings.API_GZIP_MIN_SIZE)
+    
+    # Profile sampled requests and requests carrying X-Profile
+    app.add_middleware(ProfilingMiddleware, profiler=profiler, sample_rate=settings.PROFILE_SAMPLE_RATE)
+    
+    # Record request latency
+    app.add_middleware(MetricsMiddleware)
+    
+    # Send requests for sessions owned by other nodes to them; proxied
+    # requests are measured and profiled on the node that serves them
+    app.add_middleware(ClusterMiddleware, ring=ring, node_id=settings.NODE_ID, peers=peers)
+    
+    # Start a trace for sampled requests; outermost so the root span covers everything
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    
+    # Include routers
+    app.include_router(
+        health.router,
+        prefix="/api",
+        tags=["health"]
+    )
+    app.include_router(
+        metrics.router,
+        prefix="/api",
+        tags=["metrics"]
+    )
+    app.include_router(
+        admin.router,
+        prefix="/api/admin",
+        tags=["admin"]
+    )
+    app.include_router(
+        auth.router,
+        prefix="/api/auth",
+        tags=["auth"]
+    )
+    app.include_router(
+        sessions.router,
+        prefix="/api/sessions",
+        tags=["sessions"]
+    )
+    
+    @app.get("/")
+    async def root():
+        """Root endpoint"""
+        return {"message": "Coding Interview Platform API"}
+    
+    # Serve static files (frontend)
+    static_path = Path(__file__).parent / "static"
+    if static_path.exists():
+        app.mount(
+            "/",
+            PrecompressedStaticFiles(
+                directory=str(static_path),
+                html=True,
+                min_size=settings.API_GZIP_MIN_SIZE,
+                memory_limit=settings.STATIC_MEMORY_CACHE_MAX_FILE
+            ),
+            name="static"
+        )
+    
+    return app
 
-# Serve static files (frontend)
-static_path = Path(__file__).parent / "static"
-if static_path.exists():
-    app.mount("/", StaticFiles(directory=str(static_path), html=True), name="static")
+
+# Application instance served by `uvicorn app.main:app`
+app = create_app()
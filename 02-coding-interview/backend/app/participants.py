@@ -0,0 +1,37 @@
+from typing import Dict, List
+from .database import db
+from .schemas import Participant
+
+
+class ParticipantProjection:
+    """Participant models per session, built once and reused until participants change"""
+    
+    def __init__(self):
+        self.cache: Dict[str, List[Participant]] = {}
+    
+    def get(self, session_id: str) -> List[Participant]:
+        """Get the participants of a session"""
+        participants = self.cache.get(session_id)
+        if participants is None:
+            joined = db.get_participant_join_times(session_id)
+            users = db.get_users(joined)
+            participants = [
+                Participant(
+                    user_id=user_id,
+                    username=users[user_id]["username"],
+                    joined_at=joined_at
+                )
+                for user_id, joined_at in joined.items()
+                if user_id in users
+            ]
+            self.cache[session_id] = participants
+        return participants
+    
+    def invalidate(self, session_id: str) -> None:
+        """Drop the cached participants of a session"""
+        self.cache.pop(session_id, None)
+
+
+# Global participant projection instance
+participant_projection = ParticipantProjection()
+db.add_participant_listener(participant_projection.invalidate)
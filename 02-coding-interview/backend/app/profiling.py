@@ -0,0 +1,211 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+from .routing import route_template
+from .security import is_admin_token
+
+PROFILE_HEADER = "x-profile"
+
+# Marker frame for samples taken while the request was awaiting I/O or
+# another task was running on the event loop
+AWAITING = "[awaiting]"
+
+Frame = str
+Stack = Tuple[Frame, ...]
+
+# Maps each event loop to its running task; read from the sampler thread
+_current_tasks = getattr(asyncio.tasks, "_current_tasks", None)
+
+
+def _frame_label(code) -> Frame:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profile:
+    """Wall-clock samples of one request, folded by stack"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, method: str, path: str, loop: asyncio.AbstractEventLoop, task: Optional[asyncio.Task]):
+        self.id = next(self._ids)
+        self.method = method
+        self.path = path
+        self.route = path
+        self.status_code = 0
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.loop = loop
+        self.task = task
+        self.thread_id = threading.get_ident()
+        self.samples = 0
+        self.stacks: Dict[Stack, int] = {}
+
+    def add(self, stack: Stack) -> None:
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        """Stacks in the folded format read by flamegraph.pl and speedscope"""
+        root = f"{self.method} {self.route}"
+        return "".join(
+            f"{';'.join((root,) + stack)} {count}\n"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration": self.duration,
+            "samples": self.samples
+        }
+
+
+class SamplingProfiler:
+    """Samples the event loop thread of every active profile from a background thread
+
+    The sampler thread only runs while a profile is active. Each tick reads
+    the loop thread's frame with sys._current_frames() and attributes it to
+    the profile whose task is currently running; the other active profiles
+    record an awaiting sample, so profiles show wall time, not just CPU time.
+    """
+
+    def __init__(self, interval: float = 0.005, max_profiles: int = 20):
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self.active: List[Profile] = []
+        self.recent: Deque[Profile] = deque(maxlen=max_profiles)
+        self.slowest: List[Tuple[float, int, Profile]] = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self, method: str, path: str) -> Profile:
+        """Begin sampling the current request"""
+        profile = Profile(method, path, asyncio.get_running_loop(), asyncio.current_task())
+        with self.lock:
+            self.active.append(profile)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self.thread.start()
+            self.wakeup.notify()
+        return profile
+
+    def finish(self, profile: Profile) -> None:
+        """Stop sampling a request and keep its profile"""
+        profile.duration = time.perf_counter() - profile.start
+        with self.lock:
+            self.active.remove(profile)
+            profile.loop = profile.task = None
+            self.recent.append(profile)
+            entry = (profile.duration, profile.id, profile)
+            if len(self.slowest) < self.max_profiles:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        """Find a kept profile by ID"""
+        with self.lock:
+            for profile in itertools.chain(self.recent, (entry[2] for entry in self.slowest)):
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+    def profiles(self) -> Dict[str, List[dict]]:
+        """Summaries of the most recent and the slowest profiles"""
+        with self.lock:
+            return {
+                "recent": [profile.summary() for profile in reversed(self.recent)],
+                "slowest": [entry[2].summary() for entry in sorted(self.slowest, reverse=True)]
+            }
+
+    def _stack(self, frame) -> Stack:
+        labels = []
+        while frame is not None:
+            if frame.f_code is _MIDDLEWARE_CODE:
+                # Frames above the middleware are the server, not the request
+                break
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels)
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        for profile in self.active:
+            frame = frames.get(profile.thread_id)
+            running = _current_tasks is None or _current_tasks.get(profile.loop) is profile.task
+            if running and frame is not None:
+                profile.add(self._stack(frame))
+            else:
+                profile.add((AWAITING,))
+
+    def _run(self) -> None:
+        while True:
+            with self.lock:
+                while not self.active:
+                    self.wakeup.wait()
+                self._sample()
+            time.sleep(self.interval)
+
+
+class ProfilingMiddleware:
+    """Profile a sampled fraction of requests, and any request with a valid X-Profile header
+
+    The header must carry the admin token. Profiles are listed and served as
+    folded stacks from /api/admin/profiles.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: SamplingProfiler, sample_rate: float = 0.0):
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if settings.ADMIN_TOKEN:
+            return is_admin_token(Headers(scope=scope).get(PROFILE_HEADER))
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start(scope["method"], scope["path"])
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", str(profile.id).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.route = route_template(scope)
+            self.profiler.finish(profile)
+
+
+_MIDDLEWARE_CODE = ProfilingMiddleware.__call__.__code__
+
+# Global profiler instance
+profiler = SamplingProfiler(settings.PROFILE_INTERVAL_SECONDS, settings.PROFILE_MAX_PROFILES)
@@ -0,0 +1,252 @@
+import json
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from .documents import Component, TextOperation
+
+_RETAIN, _DELETE, _INSERT = 0, 1, 2
+
+# Largest time an "I" column holds, about 49.7 days after the log started
+_MAX_MS = 2 ** 32 - 1
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, index: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[index]
+        index += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, index
+        shift += 7
+
+
+def encode_operation(operation: TextOperation, out: bytearray) -> None:
+    """Append an operation as tagged varints, without its trailing retain
+
+    Each component is `length << 2 | tag`; an insert is followed by its
+    UTF-8 bytes. The trailing retain is implied by the document length.
+    """
+    ops = operation.ops
+    end = len(ops) - 1 if ops and isinstance(ops[-1], int) and ops[-1] > 0 else len(ops)
+    for component in ops[:end]:
+        if isinstance(component, str):
+            data = component.encode("utf-8")
+            _write_varint(out, len(data) << 2 | _INSERT)
+            out += data
+        elif component > 0:
+            _write_varint(out, component << 2 | _RETAIN)
+        else:
+            _write_varint(out, -component << 2 | _DELETE)
+
+
+def decode_operation(data: bytes, start: int, end: int, length: int) -> Tuple[List[Component], int]:
+    """Decode an operation applied to a document of `length` characters
+
+    Returns the components, trailing retain restored, and the length of the
+    document after the operation.
+    """
+    components: List[Component] = []
+    consumed = 0
+    inserted = 0
+    index = start
+    while index < end:
+        value, index = _read_varint(data, index)
+        tag, n = value & 3, value >> 2
+        if tag == _INSERT:
+            text = data[index:index + n].decode("utf-8")
+            index += n
+            components.append(text)
+            inserted += len(text)
+        elif tag == _RETAIN:
+            components.append(n)
+            consumed += n
+        else:
+            components.append(-n)
+            consumed += n
+            inserted -= n
+    if length > consumed:
+        components.append(length - consumed)
+    return components, length + inserted
+
+
+class ReplayLog:
+    """Timestamped edit operations of one session in columnar arrays
+
+    Event i happened `times[i]` ms after the log started, by author
+    `authors[i]` (an index into `author_ids`). Operations are appended to
+    `data`, each prefixed with its size. Every `keyframe_interval` events
+    the zlib-compressed document and the data offset are kept, so any point
+    of the interview is rebuilt from the nearest keyframe with at most that
+    many operations.
+    """
+
+    __slots__ = (
+        "started_at", "start", "keyframe_interval", "max_events", "truncated",
+        "times", "authors", "data", "author_ids", "author_index",
+        "keyframe_events", "keyframe_offsets", "keyframes"
+    )
+
+    def __init__(self, text: str = "", keyframe_interval: int = 1000, max_events: int = 500000):
+        self.started_at = datetime.utcnow()
+        self.start = time.time()
+        self.keyframe_interval = keyframe_interval
+        self.max_events = max_events
+        self.truncated = False
+        self.times = array("I")
+        self.authors = array("H")
+        self.data = bytearray()
+        self.author_ids: List[str] = []
+        self.author_index: Dict[str, int] = {}
+        # Keyframe k is the document before event keyframe_events[k], whose
+        # operation starts at data[keyframe_offsets[k]]
+        self.keyframe_events = array("I")
+        self.keyframe_offsets = array("I")
+        self.keyframes: List[bytes] = []
+        self._keyframe(text)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _keyframe(self, text: str) -> None:
+        self.keyframe_events.append(len(self.times))
+        self.keyframe_offsets.append(len(self.data))
+        self.keyframes.append(zlib.compress(text.encode("utf-8")))
+
+    def record(self, operation: TextOperation, text: str, author: Optional[str] = None) -> None:
+        """Append an applied operation; `text` is the document after it"""
+        if len(self.times) >= self.max_events:
+            self.truncated = True
+            return
+        # Encode first, so a failure leaves the columns and data untouched
+        encoded = bytearray()
+        encode_operation(operation, encoded)
+        author = author or ""
+        index = self.author_index.get(author)
+        if index is None:
+            index = self.author_index[author] = len(self.author_ids)
+            self.author_ids.append(author)
+        elapsed = min(int((time.time() - self.start) * 1000), _MAX_MS)
+        # Keep times sorted for seeking even if the wall clock steps back
+        if self.times and elapsed < self.times[-1]:
+            elapsed = self.times[-1]
+        self.authors.append(index)
+        self.times.append(elapsed)
+        _write_varint(self.data, len(encoded))
+        self.data += encoded
+        if len(self.times) % self.keyframe_interval == 0:
+            self._keyframe(text)
+
+    def nbytes(self) -> int:
+        """Memory held by the columns, operation data and keyframes"""
+        columns = (self.times, self.authors, self.keyframe_events, self.keyframe_offsets)
+        return (
+            sum(column.itemsize * len(column) for column in columns)
+            + len(self.data)
+            + sum(len(keyframe) for keyframe in self.keyframes)
+        )
+
+    def event_at(self, elapsed_ms: int) -> int:
+        """Number of events that happened up to `elapsed_ms` after the start"""
+        return bisect_right(self.times, elapsed_ms)
+
+    def _operations(self, first: int, last: int, length: int) -> Iterator[Tuple[int, List[Component], int]]:
+        # (event, components, length after) for events [first, last), skipping
+        # from the nearest keyframe by the size prefixes
+        data = self.data
+        k = bisect_right(self.keyframe_events, first) - 1
+        index = self.keyframe_offsets[k]
+        for _ in range(self.keyframe_events[k], first):
+            size, index = _read_varint(data, index)
+            index += size
+        for event in range(first, min(last, len(self.times))):
+            size, index = _read_varint(data, index)
+            components, length = decode_operation(data, index, index + size, length)
+            index += size
+            yield event, components, length
+
+    def text_at(self, event: int) -> str:
+        """The document before event `event`, rebuilt from the nearest keyframe"""
+        k = bisect_right(self.keyframe_events, event) - 1
+        text = zlib.decompress(self.keyframes[k]).decode("utf-8")
+        for _, components, _ in self._operations(self.keyframe_events[k], event, len(text)):
+            text = TextOperation.from_list(components).apply(text)
+        return text
+
+    def events(self, first: int, last: int, length: int) -> Iterator[Tuple[int, str, List[Component]]]:
+        """Yield (elapsed ms, author, components) for events [first, last)
+
+        `length` is the document length before event `first`.
+        """
+        times, authors, author_ids = self.times, self.authors, self.author_ids
+        for event, components, _ in self._operations(first, last, length):
+            yield times[event], author_ids[authors[event]], components
+
+
+async def replay_ndjson(
+    log: ReplayLog,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    chunk_size: int = 500
+) -> AsyncIterator[bytes]:
+    """Stream a replay as NDJSON: the document at `start_ms`, then each edit up to `end_ms`"""
+    first = 0 if start_ms is None else log.event_at(start_ms)
+    last = len(log) if end_ms is None else max(log.event_at(end_ms), first)
+    text = log.text_at(first)
+    yield (json.dumps({
+        "type": "snapshot",
+        "started_at": log.started_at.isoformat(),
+        "t": log.times[first - 1] if first else 0,
+        "event": first,
+        "events": len(log),
+        "truncated": log.truncated,
+        "code": text
+    }) + "\n").encode()
+
+    lines = []
+    for elapsed, author, components in log.events(first, last, len(text)):
+        lines.append(json.dumps({"type": "edit", "t": elapsed, "author": author, "ops": components}))
+        if len(lines) >= chunk_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+class ReplayStore:
+    """Replay logs for all sessions, keyed by session id"""
+
+    def __init__(self, keyframe_interval: int = 1000, max_events: int = 500000):
+        self.keyframe_interval = keyframe_interval
+        self.max_events = max_events
+        self.logs: Dict[str, ReplayLog] = {}
+
+    def create(self, session_id: str, text: str = "") -> ReplayLog:
+        """Start the log of a session from its current code"""
+        log = ReplayLog(text, self.keyframe_interval, self.max_events)
+        self.logs[session_id] = log
+        return log
+
+    def record(self, session_id: str, operation: TextOperation, text: str, author: Optional[str] = None) -> None:
+        """Append an applied operation to the log of a session"""
+        log = self.logs.get(session_id)
+        if log is not None:
+            log.record(operation, text, author)
+
+    def get(self, session_id: str) -> Optional[ReplayLog]:
+        """Get the log of a session"""
+        return self.logs.get(session_id)
+
+    def delete(self, session_id: str) -> None:
+        """Drop the log of a session"""
+        self.logs.pop(session_id, None)
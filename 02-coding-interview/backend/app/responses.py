@@ -0,0 +1,45 @@
+from typing import Dict, Optional, Tuple
+from fastapi.responses import Response
+from .config import settings
+from .database import db
+
+
+class RenderedJSONResponse(Response):
+    """JSON response for a body that is already serialized to bytes"""
+    
+    media_type = "application/json"
+
+
+class ResponseCache:
+    """Serialized response bodies per session, valid for a single session version"""
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries: Dict[str, Tuple[int, bytes]] = {}
+    
+    def get(self, session_id: str, version: int) -> Optional[bytes]:
+        """Get the cached body for a session version"""
+        entry = self.entries.get(session_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+    
+    def put(self, session_id: str, version: int, body: bytes) -> None:
+        """Cache the body for a session version"""
+        if self.max_entries <= 0:
+            return
+        if session_id not in self.entries and len(self.entries) >= self.max_entries:
+            # Dicts keep insertion order, so this evicts the oldest entry
+            del self.entries[next(iter(self.entries))]
+        self.entries[session_id] = (version, body)
+    
+    def invalidate(self, session_id: str, version: Optional[int] = None) -> None:
+        """Drop the cached body of a session"""
+        self.entries.pop(session_id, None)
+
+
+# Global response caches for session reads
+session_responses = ResponseCache(settings.RESPONSE_CACHE_SIZE)
+participant_responses = ResponseCache(settings.RESPONSE_CACHE_SIZE)
+db.add_listener(session_responses.invalidate)
+db.add_listener(participant_responses.invalidate)
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    __slots__ = ("bits", "size", "hashes")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, key: str) -> None:
+        """Add a key to the filter"""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """Revoked token IDs, checked through a Bloom filter before the exact set
+
+    Almost every token is not revoked, and the filter answers that with one
+    hash. Entries are pruned once the token they revoke has expired anyway.
+    """
+
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self.revoked: Dict[str, float] = {}
+        self.users: Dict[str, Tuple[float, float]] = {}
+        self.filter = BloomFilter(capacity)
+
+    def revoke(self, jti: str, exp: float) -> None:
+        """Revoke a token until it expires"""
+        self.revoked[jti] = exp
+        self.filter.add(jti)
+        if len(self.revoked) > self.capacity:
+            self.prune()
+
+    def revoke_user(self, user_id: str, max_age: float, issued_before: Optional[float] = None) -> float:
+        """Revoke every token issued to a user before a time, by default now
+
+        Tokens live at most max_age seconds. Returns the cutoff time.
+        """
+        cutoff = time.time() if issued_before is None else issued_before
+        previous = self.users.get(user_id)
+        if previous is None or previous[0] < cutoff:
+            self.users[user_id] = (cutoff, cutoff + max_age)
+        return cutoff
+
+    def is_revoked(self, jti: Optional[str], user_id: str, issued_at: float) -> bool:
+        """Check whether a token was revoked
+
+        Tokens issued before token IDs existed have no `jti`; only per-user
+        revocation applies to them.
+        """
+        if self.users:
+            cutoff = self.users.get(user_id)
+            if cutoff is not None and issued_at < cutoff[0]:
+                return True
+        if jti is None or not self.revoked or jti not in self.filter:
+            return False
+        return jti in self.revoked
+
+    def prune(self) -> int:
+        """Forget revocations of expired tokens and rebuild the filter"""
+        now = time.time()
+        expired = [jti for jti, exp in self.revoked.items() if exp <= now]
+        for jti in expired:
+            del self.revoked[jti]
+        for user_id in [user_id for user_id, (_, until) in self.users.items() if until <= now]:
+            del self.users[user_id]
+        while len(self.revoked) > self.capacity:
+            self.capacity *= 2
+        self.filter = BloomFilter(self.capacity)
+        for jti in self.revoked:
+            self.filter.add(jti)
+        return len(expired)
+
+
+async def run_pruning(revocations: RevocationList, interval: float) -> None:
+    """Periodically prune expired revocations in the background"""
+    while True:
+        await asyncio.sleep(interval)
+        revocations.prune()
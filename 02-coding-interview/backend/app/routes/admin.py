@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from ..cluster import HandoffError, hand_off
+from ..config import settings
+from ..database import db
+from ..hashring import ring
+from ..loop_monitor import loop_monitor
+from ..profiling import profiler
+from ..schemas import ClusterMembership, ImportSummary, TokenRevocation
+from ..security import require_admin, revocations, revoke_user_tokens
+from ..tracing import InMemoryExporter, TracedRoute, tracer
+from ..transfer import Importer, export_ndjson
+
+router = APIRouter(route_class=TracedRoute, dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+async def list_profiles():
+    """List the most recent and the slowest request profiles"""
+    return profiler.profiles()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: int):
+    """Get a request profile as folded stacks for flamegraph tools"""
+    profile = profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return PlainTextResponse(profile.folded())
+
+
+@router.get("/loop")
+async def get_loop_status():
+    """Get event loop lag and the most recent slow callbacks"""
+    return loop_monitor.snapshot()
+
+
+def _trace_store() -> InMemoryExporter:
+    if not isinstance(tracer.exporter, InMemoryExporter):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Traces are not kept in memory"
+        )
+    return tracer.exporter
+
+
+@router.get("/traces")
+async def list_traces():
+    """List the most recent traces, newest first"""
+    traces = []
+    for trace_id, spans in reversed(_trace_store().traces.items()):
+        root = next((span for span in spans if span.parent_id is None), spans[-1])
+        traces.append({
+            "trace_id": trace_id,
+            "name": root.name,
+            "duration": root.duration,
+            "spans": len(spans)
+        })
+    return traces
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Get the spans of a trace in start order"""
+    spans = _trace_store().get(trace_id)
+    if spans is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace not found"
+        )
+    return [span.to_dict() for span in sorted(spans, key=lambda span: span.start_ns)]
+
+
+@router.get("/export")
+async def export_data(sessions: bool = Query(True)):
+    """Stream all users and sessions as NDJSON"""
+    return StreamingResponse(
+        export_ndjson(db, settings.EXPORT_CHUNK_SIZE, include_sessions=sessions),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/import", response_model=ImportSummary)
+async def import_data(request: Request):
+    """Import users and sessions from an NDJSON export streamed in the request body"""
+    importer = Importer(db, settings.IMPORT_BATCH_SIZE)
+    async for chunk in request.stream():
+        importer.feed(chunk)
+    return importer.finish()
+
+
+def _cluster_status() -> dict:
+    owned = sum(1 for session_id in db.sessions if ring.owns(settings.NODE_ID, session_id))
+    return {
+        "node_id": settings.NODE_ID,
+        "nodes": ring.nodes,
+        "owned_sessions": owned,
+        "foreign_sessions": len(db.sessions) - owned
+    }
+
+
+@router.get("/cluster")
+async def get_cluster():
+    """Get the cluster membership and how many stored sessions this node owns"""
+    return _cluster_status()
+
+
+@router.put("/cluster")
+async def set_cluster(membership: ClusterMembership):
+    """Replace the cluster membership of this node"""
+    ring.set_nodes(membership.nodes)
+    return _cluster_status()
+
+
+@router.post("/cluster/handoff")
+async def handoff_sessions():
+    """Move stored sessions owned by other nodes to them"""
+    try:
+        moved = await hand_off(db, settings.EXPORT_CHUNK_SIZE)
+    except HandoffError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Handoff failed: {exc}"
+        )
+    return {"moved": moved, **_cluster_status()}
+
+
+@router.post("/revocations", status_code=status.HTTP_204_NO_CONTENT)
+async def add_revocation(revocation: TokenRevocation):
+    """Revoke a token, or a user's tokens, logged out through another node"""
+    if revocation.jti is not None:
+        revocations.revoke(revocation.jti, revocation.expires_at)
+    else:
+        revoke_user_tokens(revocation.user_id, revocation.issued_before)
+    return None
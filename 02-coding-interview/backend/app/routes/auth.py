@@ -1,11 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from datetime import timedelta
 from ..schemas import UserSignup, UserLogin, User, AuthResponse
+from ..cluster import replicate_revocation, replicate_user
 from ..database import db
-from ..security import hash_password, verify_password, create_access_token, verify_token
+from ..security import (
+    hash_password_async, verify_password_async, password_needs_rehash, dummy_password_hash,
+    create_access_token, verify_token, get_token_claims, TokenClaims,
+    revoke_token, revoke_user_tokens
+)
 from ..config import settings
+from ..tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserSignup):
@@ -18,10 +24,17 @@ async def signup(user_data: UserSignup):
             detail="Email already registered"
         )
     
-    # Create user
-    hashed_password = hash_password(user_data.password)
+    # Create user; check again after hashing, as a concurrent signup may have
+    # registered the email while this one was waiting
+    hashed_password = await hash_password_async(user_data.password)
+    if db.get_user_by_email(user_data.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     user_dict = db.create_user(user_data.username, user_data.email, hashed_password)
     user = User(**user_dict)
+    replicate_user(db.users[user.id])
     
     # Create token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -40,12 +53,18 @@ async def signup(user_data: UserSignup):
 async def login(credentials: UserLogin):
     """Login user"""
     user_data = db.get_user_by_email(credentials.email)
-    if not user_data or not verify_password(credentials.password, user_data.get("password", "")):
+    hashed_password = user_data.get("password", "") if user_data else await dummy_password_hash()
+    valid = await verify_password_async(credentials.password, hashed_password)
+    if not user_data or not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Upgrade hashes made with an old scheme or cost now that we know the password
+    if password_needs_rehash(hashed_password):
+        db.update_user(user_data["id"], password=await hash_password_async(credentials.password))
+    
     user = User(**{k: v for k, v in user_data.items() if k != "password"})
     
     # Create token
@@ -71,3 +90,18 @@ async def get_current_user(user_id: str = Depends(verify_token)):
             detail="User not found"
         )
     return User(**user_dict)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(claims: TokenClaims = Depends(get_token_claims)):
+    """Revoke the current access token"""
+    revoke_token(claims)
+    if claims.jti:
+        replicate_revocation({"jti": claims.jti, "expires_at": claims.exp})
+    return None
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(user_id: str = Depends(verify_token)):
+    """Revoke every access token issued to the current user"""
+    issued_before = revoke_user_tokens(user_id)
+    replicate_revocation({"user_id": user_id, "issued_before": issued_before})
+    return None
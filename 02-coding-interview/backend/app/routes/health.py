@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 from datetime import datetime
 from ..schemas import HealthResponse
+from ..tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
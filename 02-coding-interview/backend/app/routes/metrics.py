@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..metrics import CONTENT_TYPE, registry
+from ..tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -1,15 +1,64 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+from pydantic import TypeAdapter
 from ..schemas import (
     SessionCreate, SessionUpdate, Session, SessionDetail, 
-    ExecutionRequest, ExecutionResult, Participant, SessionList, Language
+    ExecutionRequest, ExecutionResult, Participant, SessionList, Language,
+    CodeOperation, CodeOperationResult, CodeDocument, CodeOperationLog, SessionChanges,
+    SessionBatchCreate, SessionIds, BatchItemResult, BatchResult,
+    SessionStatistics, StatsSummary, StatusCounts
 )
 from ..database import db
+from ..changes import change_feed
+from ..cluster import by_owner
+from ..participants import participant_projection
+from ..stats import StatsGroup
+from ..responses import RenderedJSONResponse, session_responses, participant_responses
+from ..config import settings
+from ..documents import TextOperation, OperationError, StaleRevisionError
 from ..security import verify_token
 from ..executor import CodeExecutor
+from ..replay import replay_ndjson
+from ..tracing import TracedRoute, tracer
+
+router = APIRouter(route_class=TracedRoute)
+
+_participant_list = TypeAdapter(List[Participant])
+
+_BATCH_DELETE_OUTCOMES = {
+    "deleted": {"status": status.HTTP_204_NO_CONTENT},
+    "not_found": {"status": status.HTTP_404_NOT_FOUND, "detail": "Session not found"},
+    "forbidden": {"status": status.HTTP_403_FORBIDDEN, "detail": "Only session creator can delete"},
+}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an entity tag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _stats_summary(group: StatsGroup) -> StatsSummary:
+    """Convert storage counters to the response model"""
+    statuses = group.statuses
+    return StatsSummary(
+        sessions=StatusCounts(
+            active=statuses.get("active", 0),
+            completed=statuses.get("completed", 0),
+            expired=statuses.get("expired", 0),
+            total=sum(statuses.values())
+        ),
+        executions=group.executions,
+        total_execution_time=group.execution_time
+    )
 
-router = APIRouter()
 
 @router.post("", response_model=Session, status_code=status.HTTP_201_CREATED)
 async def create_session(session_data: SessionCreate, user_id: str = Depends(verify_token)):
@@ -21,8 +70,7 @@ async def create_session(session_data: SessionCreate, user_id: str = Depends(ver
         description=session_data.description,
         time_limit_minutes=session_data.time_limit_minutes
     )
-    session["participant_count"] = 1
-    return session
+    return Session(**session, participant_count=1)
 
 @router.get("", response_model=SessionList)
 async def get_sessions(
@@ -34,8 +82,106 @@ async def get_sessions(
     sessions, total = db.get_user_sessions(user_id, limit, offset)
     return SessionList(sessions=sessions, total=total)
 
+@router.get("/search", response_model=SessionList)
+async def search_sessions(
+    q: Optional[str] = Query(None, max_length=200),
+    language: Optional[Language] = None,
+    session_status: Optional[str] = Query(None, alias="status"),
+    created_by: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    user_id: str = Depends(verify_token)
+):
+    """Search sessions by title keywords, language, status and creation date"""
+    sessions, total = db.search_sessions(
+        query=q,
+        language=language.value if language else None,
+        status=session_status,
+        created_by=created_by,
+        created_after=created_after,
+        created_before=created_before,
+        limit=limit,
+        offset=offset
+    )
+    return SessionList(sessions=sessions, total=total)
+
+@router.get("/stats", response_model=SessionStatistics)
+async def get_session_stats(
+    created_by: Optional[str] = None,
+    user_id: str = Depends(verify_token)
+):
+    """Get session and execution counters overall, per language and for one creator"""
+    stats = db.stats
+    return SessionStatistics(
+        overall=_stats_summary(stats.overall),
+        creator=_stats_summary(stats.creator(created_by or user_id)),
+        by_language={
+            language: _stats_summary(group)
+            for language, group in stats.languages.items()
+        }
+    )
+
+@router.post("/batch", response_model=BatchResult, status_code=status.HTTP_201_CREATED)
+async def create_sessions(batch: SessionBatchCreate, user_id: str = Depends(verify_token)):
+    """Create many interview sessions at once"""
+    sessions = db.create_sessions(
+        (
+            {
+                "title": item.title,
+                "language": item.language.value,
+                "description": item.description,
+                "time_limit_minutes": item.time_limit_minutes
+            }
+            for item in batch.sessions
+        ),
+        created_by=user_id
+    )
+    return BatchResult(results=[
+        BatchItemResult(
+            id=session["id"],
+            status=status.HTTP_201_CREATED,
+            session=Session(**session, participant_count=1)
+        )
+        for session in sessions
+    ])
+
+@router.post("/batch/get", response_model=BatchResult)
+async def get_sessions_by_ids(batch: SessionIds, request: Request, user_id: str = Depends(verify_token)):
+    """Get many sessions by ID, from whichever nodes own them"""
+    def get_local(session_ids: List[str]) -> List[BatchItemResult]:
+        sessions = db.get_sessions_by_ids(session_ids)
+        return [
+            BatchItemResult(
+                id=session_id,
+                status=status.HTTP_200_OK,
+                session=Session(**session, participant_count=db.get_participant_count(session_id))
+            )
+            if session is not None else
+            BatchItemResult(id=session_id, status=status.HTTP_404_NOT_FOUND, detail="Session not found")
+            for session_id, session in zip(session_ids, sessions)
+        ]
+
+    return BatchResult(results=await by_owner(request.url.path, batch.ids, request.headers, get_local))
+
+@router.post("/batch/delete", response_model=BatchResult)
+async def delete_sessions(batch: SessionIds, request: Request, user_id: str = Depends(verify_token)):
+    """Delete many sessions (creator only), on whichever nodes own them"""
+    def delete_local(session_ids: List[str]) -> List[BatchItemResult]:
+        outcomes = db.delete_sessions(session_ids, user_id)
+        return [
+            BatchItemResult(id=session_id, **_BATCH_DELETE_OUTCOMES[outcome])
+            for session_id, outcome in zip(session_ids, outcomes)
+        ]
+
+    return BatchResult(results=await by_owner(request.url.path, batch.ids, request.headers, delete_local))
+
 @router.get("/{session_id}", response_model=SessionDetail)
-async def get_session(session_id: str):
+async def get_session(
+    session_id: str,
+    if_none_match: Optional[str] = Header(None)
+):
     """Get session details"""
     session_data = db.get_session(session_id)
     if not session_data:
@@ -44,27 +190,55 @@ async def get_session(session_id: str):
             detail="Session not found"
         )
     
-    participant_ids = db.get_participants(session_id)
-    participants = [
-        Participant(
-            user_id=user_id,
-            username=db.get_user(user_id)["username"],
-            joined_at=datetime.utcnow()
+    version = db.get_session_version(session_id)
+    etag = f'"{db.get_session_epoch(session_id)}-{version}"'
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    body = session_responses.get(session_id, version)
+    if body is None:
+        participants = participant_projection.get(session_id)
+        with tracer.span("serialize.session_detail"):
+            body = SessionDetail(
+                id=session_data["id"],
+                title=session_data["title"],
+                language=Language(session_data["language"]),
+                code=session_data.get("code", ""),
+                description=session_data.get("description", ""),
+                created_by=session_data["created_by"],
+                created_at=session_data["created_at"],
+                time_limit_minutes=session_data["time_limit_minutes"],
+                participants=participants,
+                last_execution=db.get_last_execution(session_id)
+            ).model_dump_json().encode()
+        session_responses.put(session_id, version, body)
+    
+    return RenderedJSONResponse(body, headers={"ETag": etag})
+
+@router.get("/{session_id}/changes", response_model=SessionChanges)
+async def get_session_changes(
+    session_id: str,
+    since: int = Query(..., ge=0),
+    timeout: Optional[float] = Query(None, gt=0, le=60)
+):
+    """Long-poll until the session version moves past `since`"""
+    version = db.get_session_version(session_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
         )
-        for user_id in participant_ids
-    ]
     
-    return SessionDetail(
-        id=session_data["id"],
-        title=session_data["title"],
-        language=Language(session_data["language"]),
-        code=session_data.get("code", ""),
-        description=session_data.get("description", ""),
-        created_by=session_data["created_by"],
-        created_at=session_data["created_at"],
-        time_limit_minutes=session_data["time_limit_minutes"],
-        participants=participants
-    )
+    if version == since:
+        await change_feed.wait(session_id, timeout or settings.LONG_POLL_TIMEOUT_SECONDS)
+        version = db.get_session_version(session_id)
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+    
+    return SessionChanges(session_id=session_id, version=version, changed=version != since)
 
 @router.put("/{session_id}", response_model=SessionDetail)
 async def update_session(
@@ -92,15 +266,7 @@ async def update_session(
     
     updated_session = db.update_session(session_id, **update_dict)
     
-    participant_ids = db.get_participants(session_id)
-    participants = [
-        Participant(
-            user_id=pid,
-            username=db.get_user(pid)["username"],
-            joined_at=datetime.utcnow()
-        )
-        for pid in participant_ids
-    ]
+    participants = participant_projection.get(session_id)
     
     return SessionDetail(
         id=updated_session["id"],
@@ -111,7 +277,8 @@ async def update_session(
         created_by=updated_session["created_by"],
         created_at=updated_session["created_at"],
         time_limit_minutes=updated_session["time_limit_minutes"],
-        participants=participants
+        participants=participants,
+        last_execution=db.get_last_execution(session_id)
     )
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -144,11 +311,62 @@ async def execute_code(session_id: str, execution: ExecutionRequest):
         )
     
     executor = CodeExecutor()
-    result = await executor.execute(execution.code, execution.language, execution.stdin)
+    result = await executor.execute(
+        execution.code,
+        execution.language,
+        execution.stdin,
+        execution.files,
+        execution.entrypoint
+    )
+    db.record_execution(session_id, result)
     return result
 
+@router.get("/{session_id}/executions")
+async def get_executions(
+    session_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Stream recent executions newest first as NDJSON"""
+    session_data = db.get_session(session_id)
+    if not session_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    records = db.executions.iter_records(session_id, offset, limit)
+    return StreamingResponse(
+        (record.model_dump_json() + "\n" for record in records),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Count": str(db.executions.count(session_id))}
+    )
+
+@router.get("/{session_id}/replay")
+async def get_replay(
+    session_id: str,
+    start_ms: Optional[int] = Query(None, ge=0),
+    end_ms: Optional[int] = Query(None, ge=0)
+):
+    """Stream the edit history of the session code as NDJSON for replay"""
+    log = db.replays.get(session_id)
+    if log is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    return StreamingResponse(
+        replay_ndjson(log, start_ms, end_ms),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Count": str(len(log))}
+    )
+
 @router.get("/{session_id}/participants", response_model=List[Participant])
-async def get_participants(session_id: str):
+async def get_participants(
+    session_id: str,
+    if_none_match: Optional[str] = Header(None)
+):
     """Get session participants"""
     session_data = db.get_session(session_id)
     if not session_data:
@@ -157,13 +375,77 @@ async def get_participants(session_id: str):
             detail="Session not found"
         )
     
-    participant_ids = db.get_participants(session_id)
-    participants = [
-        Participant(
-            user_id=user_id,
-            username=db.get_user(user_id)["username"],
-            joined_at=datetime.utcnow()
+    version = db.get_session_version(session_id)
+    etag = f'"participants-{db.get_session_epoch(session_id)}-{version}"'
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    body = participant_responses.get(session_id, version)
+    if body is None:
+        body = _participant_list.dump_json(participant_projection.get(session_id))
+        participant_responses.put(session_id, version, body)
+    
+    return RenderedJSONResponse(body, headers={"ETag": etag})
+
+@router.get("/{session_id}/code", response_model=CodeDocument)
+async def get_code(session_id: str):
+    """Get the current code and its revision"""
+    document = db.documents.get(session_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    return CodeDocument(revision=document.revision, code=document.text)
+
+@router.get("/{session_id}/code/ops", response_model=CodeOperationLog)
+async def get_code_operations(
+    session_id: str,
+    since: int = Query(..., ge=0),
+):
+    """Get the edit operations applied after a revision"""
+    document = db.documents.get(session_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    try:
+        operations = document.operations_since(since)
+    except StaleRevisionError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except OperationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return CodeOperationLog(
+        revision=document.revision,
+        operations=[operation.to_list() for operation in operations]
+    )
+
+@router.post("/{session_id}/code/ops", response_model=CodeOperationResult)
+async def apply_code_operation(
+    session_id: str,
+    code_operation: CodeOperation,
+    user_id: str = Depends(verify_token)
+):
+    """Merge an edit operation into the session code"""
+    try:
+        operation = TextOperation.from_list(code_operation.ops)
+        applied = db.apply_code_operation(session_id, code_operation.revision, operation, user_id)
+    except StaleRevisionError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except OperationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if applied is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
         )
-        for user_id in participant_ids
-    ]
-    return participants
+    
+    db.add_participant(session_id, user_id)
+    return CodeOperationResult(
+        revision=db.documents.get(session_id).revision,
+        ops=applied.to_list()
+    )
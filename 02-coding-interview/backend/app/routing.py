@@ -0,0 +1,20 @@
+from starlette.types import Scope
+
+
+def route_template(scope: Scope) -> str:
+    """Rebuild the matched route template (e.g. /api/sessions/{session_id}) of a request
+
+    Substituting the matched path parameters back into the request path
+    works the same for routes of included routers and for mounts.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        value = str(value)
+        if "/" in value or name == "path":
+            if path.endswith(value):
+                path = path[:len(path) - len(value)] + "{" + name + "}"
+            continue
+        path = "/".join("{" + name + "}" if segment == value else segment for segment in path.split("/"))
+    return path
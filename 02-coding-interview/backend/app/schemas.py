@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import Optional, List, Dict, Any, Literal, Union
 from datetime import datetime
 from enum import Enum
 
@@ -11,6 +11,13 @@ class Language(str, Enum):
     CPP = "cpp"
 
 
+# File the submitted code is written to when a request names no entrypoint
+DEFAULT_ENTRYPOINTS = {
+    Language.PYTHON: "main.py",
+    Language.JAVASCRIPT: "main.js",
+}
+
+
 class User(BaseModel):
     id: str
     username: str
@@ -49,6 +56,14 @@ class SessionCreate(BaseModel):
     time_limit_minutes: int = Field(default=60, ge=1, le=480)
 
 
+class SessionBatchCreate(BaseModel):
+    sessions: List[SessionCreate] = Field(..., min_length=1, max_length=5000)
+
+
+class SessionIds(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=5000)
+
+
 class SessionUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -61,10 +76,80 @@ class Participant(BaseModel):
     joined_at: datetime
 
 
+class CodeOperation(BaseModel):
+    revision: int = Field(..., ge=0)
+    ops: List[Union[int, str]]
+
+
+class CodeOperationResult(BaseModel):
+    revision: int
+    ops: List[Union[int, str]]
+
+
+class CodeDocument(BaseModel):
+    revision: int
+    code: str
+
+
+class CodeOperationLog(BaseModel):
+    revision: int
+    operations: List[List[Union[int, str]]]
+
+
+def _workspace_path(name: str) -> str:
+    """Validate a relative file path inside an execution workspace"""
+    parts = name.split("/")
+    if (
+        not name
+        or len(name) > 255
+        or "\\" in name
+        or "\x00" in name
+        or any(part in ("", ".", "..") for part in parts)
+    ):
+        raise ValueError(f"Invalid file path: {name!r}")
+    return name
+
+
 class ExecutionRequest(BaseModel):
     code: str
     language: Language = Language.PYTHON
     stdin: Optional[str] = None
+    # Extra source files by relative path; `code` is written to `entrypoint`
+    files: Dict[str, str] = Field(default_factory=dict, max_length=50)
+    entrypoint: Optional[str] = None
+    
+    @field_validator("files")
+    @classmethod
+    def check_file_paths(cls, files: Dict[str, str]) -> Dict[str, str]:
+        for name in files:
+            _workspace_path(name)
+        return files
+    
+    @field_validator("entrypoint")
+    @classmethod
+    def check_entrypoint(cls, entrypoint: Optional[str]) -> Optional[str]:
+        return _workspace_path(entrypoint) if entrypoint is not None else None
+    
+    @model_validator(mode="after")
+    def check_entrypoint_not_in_files(self) -> "ExecutionRequest":
+        entrypoint = self.entrypoint or DEFAULT_ENTRYPOINTS.get(self.language)
+        if entrypoint is not None and entrypoint in self.files:
+            raise ValueError(f"{entrypoint} holds the submitted code and must not also be listed in files")
+        return self
+    
+    @model_validator(mode="after")
+    def check_no_file_directory_collisions(self) -> "ExecutionRequest":
+        names = set(self.files)
+        entrypoint = self.entrypoint or DEFAULT_ENTRYPOINTS.get(self.language)
+        if entrypoint is not None:
+            names.add(entrypoint)
+        for name in names:
+            parts = name.split("/")
+            for depth in range(1, len(parts)):
+                directory = "/".join(parts[:depth])
+                if directory in names:
+                    raise ValueError(f"{directory} is a file and cannot also be a directory of {name}")
+        return self
 
 
 class ExecutionResult(BaseModel):
@@ -76,6 +161,10 @@ class ExecutionResult(BaseModel):
     execution_time: float = 0
 
 
+class ExecutionRecord(ExecutionResult):
+    executed_at: datetime
+
+
 class Session(BaseModel):
     id: str
     title: str
@@ -95,6 +184,91 @@ class SessionDetail(Session):
     last_execution: Optional[ExecutionResult] = None
 
 
+class SessionChanges(BaseModel):
+    session_id: str
+    version: int
+    changed: bool
+
+
 class SessionList(BaseModel):
     sessions: List[Session]
     total: int
+
+
+class StatusCounts(BaseModel):
+    active: int = 0
+    completed: int = 0
+    expired: int = 0
+    total: int = 0
+
+
+class StatsSummary(BaseModel):
+    sessions: StatusCounts
+    executions: int = 0
+    total_execution_time: float = 0
+
+
+class SessionStatistics(BaseModel):
+    overall: StatsSummary
+    creator: StatsSummary
+    by_language: Dict[str, StatsSummary]
+
+
+class BatchItemResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    detail: Optional[str] = None
+    session: Optional[Session] = None
+
+
+class BatchResult(BaseModel):
+    results: List[BatchItemResult]
+
+
+class UserRecord(BaseModel):
+    type: Literal["user"]
+    id: str
+    username: str
+    email: str
+    password: str
+    created_at: datetime
+
+
+class SessionRecord(BaseModel):
+    type: Literal["session"]
+    id: str
+    title: str
+    description: Optional[str] = None
+    created_by: str
+    language: Language
+    created_at: datetime
+    time_limit_minutes: int = 60
+    code: str = ""
+    status: str = "active"
+    participants: Dict[str, datetime] = Field(default_factory=dict)
+
+
+class ImportSummary(BaseModel):
+    users: int
+    sessions: int
+    skipped: int
+    errors: List[Dict[str, Any]]
+
+
+class TokenRevocation(BaseModel):
+    jti: Optional[str] = None
+    expires_at: Optional[float] = None
+    user_id: Optional[str] = None
+    issued_before: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_one_kind(self) -> "TokenRevocation":
+        token = self.jti is not None and self.expires_at is not None
+        user = self.user_id is not None and self.issued_before is not None
+        if token == user:
+            raise ValueError("Give either jti and expires_at, or user_id and issued_before")
+        return self
+
+
+class ClusterMembership(BaseModel):
+    nodes: Dict[str, str]
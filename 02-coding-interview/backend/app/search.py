@@ -0,0 +1,211 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+# Postings with more entries than this are intersected as bitmaps
+_DENSE = 1024
+
+_EMPTY: Set[int] = frozenset()
+
+
+def _timestamp(value: datetime) -> float:
+    """Convert a datetime to a POSIX timestamp, treating naive values as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _created(entry: Tuple[float, int]) -> float:
+    return entry[0]
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    """Split text into lowercase search tokens"""
+    return set(_TOKEN.findall(text.lower())) if text else set()
+
+
+class SessionIndex:
+    """Inverted index over session text plus attribute indexes, newest first
+
+    Every indexed session gets an integer slot in creation order. Postings
+    are sets of slots; large postings also keep a bitmap (a Python int) so
+    broad filters intersect with a single `&` and count with `bit_count()`.
+    """
+
+    def __init__(self):
+        self.postings: Dict[Tuple[str, str], Set[int]] = {}
+        self.bitmaps: Dict[Tuple[str, str], int] = {}
+        self.timeline: List[Tuple[float, int]] = []
+        self.slots: Dict[str, int] = {}
+        self.slot_ids: List[Optional[str]] = []
+        self.slot_created: List[float] = []
+        self.slot_keys: List[Tuple[Tuple[str, str], ...]] = []
+        # Slots follow created_at order unless a session is indexed out of
+        # order (e.g. on import or handoff); bitmap paging relies on that
+        # order, so the next bitmap search renumbers the slots.
+        self.ordered = True
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def add(self, session: Dict[str, Any]) -> None:
+        """Index a session, replacing any previous entry"""
+        session_id = session["id"]
+        tokens = tokenize(session.get("title")) | tokenize(session.get("description"))
+        keys = tuple(("token", token) for token in tokens) + (
+            ("language", session["language"]),
+            ("status", session["status"]),
+            ("created_by", session["created_by"]),
+        )
+        slot = self.slots.get(session_id)
+        if slot is None:
+            created = _timestamp(session["created_at"])
+            slot = len(self.slot_ids)
+            self.slots[session_id] = slot
+            self.slot_ids.append(session_id)
+            self.slot_created.append(created)
+            self.slot_keys.append(())
+            if not self.timeline or self.timeline[-1][0] <= created:
+                self.timeline.append((created, slot))
+            else:
+                self.ordered = False
+                insort(self.timeline, (created, slot))
+        else:
+            self._unpost(slot)
+        for key in keys:
+            self.postings.setdefault(key, set()).add(slot)
+            if key in self.bitmaps:
+                self.bitmaps[key] |= 1 << slot
+        self.slot_keys[slot] = keys
+
+    def remove(self, session_id: str) -> None:
+        """Remove a session from the index"""
+        slot = self.slots.pop(session_id, None)
+        if slot is None:
+            return
+        self._unpost(slot)
+        self.slot_ids[slot] = None
+        position = bisect_left(self.timeline, (self.slot_created[slot], slot))
+        if position < len(self.timeline) and self.timeline[position][1] == slot:
+            del self.timeline[position]
+
+    def _unpost(self, slot: int) -> None:
+        """Remove a slot from every posting it appears in"""
+        for key in self.slot_keys[slot]:
+            posting = self.postings.get(key)
+            if posting is None:
+                continue
+            posting.discard(slot)
+            if not posting:
+                del self.postings[key]
+                self.bitmaps.pop(key, None)
+            elif key in self.bitmaps:
+                self.bitmaps[key] &= ~(1 << slot)
+        self.slot_keys[slot] = ()
+
+    def _reorder(self) -> None:
+        """Renumber live slots in created_at order and drop removed ones"""
+        order = [slot for _, slot in self.timeline]
+        mapping = {old: new for new, old in enumerate(order)}
+        self.slot_ids = [self.slot_ids[slot] for slot in order]
+        self.slot_created = [self.slot_created[slot] for slot in order]
+        self.slot_keys = [self.slot_keys[slot] for slot in order]
+        self.slots = {session_id: new for new, session_id in enumerate(self.slot_ids)}
+        self.timeline = [(created, new) for new, created in enumerate(self.slot_created)]
+        self.postings = {key: {mapping[slot] for slot in posting} for key, posting in self.postings.items()}
+        self.bitmaps = {}
+        self.ordered = True
+
+    def _bitmap(self, key: Tuple[str, str]) -> int:
+        """Get the bitmap of a posting, building it on first use"""
+        bitmap = self.bitmaps.get(key)
+        if bitmap is None:
+            bits = bytearray((len(self.slot_ids) + 7) // 8)
+            for slot in self.postings[key]:
+                bits[slot >> 3] |= 1 << (slot & 7)
+            bitmap = self.bitmaps[key] = int.from_bytes(bits, "little")
+        return bitmap
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        language: Optional[str] = None,
+        status: Optional[str] = None,
+        created_by: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Tuple[List[str], int]:
+        """Return one page of matching session IDs, newest first, and the total match count"""
+        keys = [("token", token) for token in tokenize(query)]
+        if language is not None:
+            keys.append(("language", language))
+        if status is not None:
+            keys.append(("status", status))
+        if created_by is not None:
+            keys.append(("created_by", created_by))
+
+        timeline = self.timeline
+        low = bisect_left(timeline, _timestamp(created_after), key=_created) if created_after else 0
+        high = bisect_right(timeline, _timestamp(created_before), key=_created) if created_before else len(timeline)
+        slot_ids = self.slot_ids
+
+        if not keys:
+            end = max(high - offset, low)
+            start = max(end - limit, low)
+            page = [slot_ids[slot] for _, slot in reversed(timeline[start:end])]
+            return page, max(high - low, 0)
+        if low >= high:
+            return [], 0
+
+        postings = sorted((self.postings.get(key, _EMPTY) for key in keys), key=len)
+        if len(postings[0]) > _DENSE and not self.ordered:
+            # Slot numbers change, so the time range is looked up again
+            self._reorder()
+            return self.search(query, language, status, created_by, created_after, created_before, limit, offset)
+        if len(postings[0]) <= _DENSE:
+            low_ts, high_ts = timeline[low][0], timeline[high - 1][0]
+            slot_created = self.slot_created
+            rest = postings[1:]
+            matches = sorted(
+                (
+                    (slot_created[slot], slot)
+                    for slot in postings[0]
+                    if low_ts <= slot_created[slot] <= high_ts
+                    and all(slot in posting for posting in rest)
+                ),
+                reverse=True
+            )
+            return [slot_ids[slot] for _, slot in matches[offset:offset + limit]], len(matches)
+
+        bitmap = self._bitmap(keys[0])
+        for key in keys[1:]:
+            bitmap &= self._bitmap(key)
+        if low > 0 or high < len(timeline):
+            first, last = timeline[low][1], timeline[high - 1][1]
+            bitmap &= ((1 << (last + 1)) - 1) ^ ((1 << first) - 1)
+        total = bitmap.bit_count()
+        if offset >= total:
+            return [], total
+
+        if offset:
+            # Find the lowest bit position with exactly `offset` matches above it
+            lo, hi = 0, bitmap.bit_length()
+            while lo < hi:
+                middle = (lo + hi) // 2
+                if (bitmap >> middle).bit_count() <= offset:
+                    hi = middle
+                else:
+                    lo = middle + 1
+            bitmap &= (1 << lo) - 1
+
+        page = []
+        while bitmap and len(page) < limit:
+            top = bitmap.bit_length() - 1
+            bitmap ^= 1 << top
+            page.append(slot_ids[top])
+        return page, total
@@ -1,22 +1,97 @@
-from passlib.context import CryptContext
+import asyncio
+import bcrypt
+import hmac
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Dict, NamedTuple, Optional
+import time
+import uuid
 from fastapi import Depends, HTTPException, status, Header
 from .config import settings
+from .revocation import RevocationList
+from .tracing import traced
 
-# Password hashing - using plaintext for development, should be replaced with proper hashing
-pwd_context = CryptContext(schemes=["plaintext"], deprecated="auto")
+# Password hashing runs bcrypt in its own thread pool; bcrypt releases the
+# GIL, so hashes run in parallel without stalling the event loop.
+_hash_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _password_bytes(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes; newer releases refuse longer input
+    return password.encode("utf-8")[:72]
 
 
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode("ascii")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith("$2"):
+        try:
+            return bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode("ascii"))
+        except ValueError:
+            return False
+    # Accounts created before bcrypt was enabled store the password as is
+    return hmac.compare_digest(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash uses an old scheme or cost"""
+    if not hashed_password.startswith("$2"):
+        return True
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.PASSWORD_BCRYPT_ROUNDS
+
+
+def _get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _hash_pool
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_pool(), hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_pool(), verify_password, plain_password, hashed_password)
+
+
+_dummy_hashes: Dict[int, str] = {}
+
+
+async def dummy_password_hash() -> str:
+    """A hash at the current cost of a password nobody knows
+
+    Logins for unknown emails verify against it, so they take as long as a
+    wrong password and response times do not reveal which emails exist.
+    """
+    rounds = settings.PASSWORD_BCRYPT_ROUNDS
+    if rounds not in _dummy_hashes:
+        _dummy_hashes[rounds] = await hash_password_async(uuid.uuid4().hex)
+    return _dummy_hashes[rounds]
+
+
+def _jose():
+    # python-jose pulls in its crypto backends on import, a noticeable part of
+    # cold start, so it is imported when the first token is made or checked
+    from jose import JWTError, jwt
+    return jwt, JWTError
 
 
 def create_access_token(
@@ -31,7 +106,8 @@ def create_access_token(
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
+    jwt, _ = _jose()
     encoded_jwt = jwt.encode(
         to_encode,
         settings.SECRET_KEY,
@@ -40,8 +116,60 @@ def create_access_token(
     return encoded_jwt
 
 
-async def verify_token(authorization: Optional[str] = Header(None)) -> str:
-    """Verify JWT token and return user_id"""
+class TokenClaims(NamedTuple):
+    """Claims of a verified access token"""
+    user_id: str
+    exp: float
+    jti: Optional[str]
+    iat: float
+
+
+class TokenCache:
+    """Bounded LRU cache of verified tokens mapped to their claims"""
+    
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, TokenClaims]" = OrderedDict()
+    
+    def get(self, token: str) -> Optional[TokenClaims]:
+        """Get the claims of a cached, unexpired token"""
+        claims = self.entries.get(token)
+        if claims is None:
+            return None
+        if claims.exp <= time.time():
+            del self.entries[token]
+            return None
+        self.entries.move_to_end(token)
+        return claims
+    
+    def put(self, token: str, claims: TokenClaims) -> None:
+        """Cache a verified token until it expires"""
+        if self.max_size <= 0:
+            return
+        self.entries[token] = claims
+        self.entries.move_to_end(token)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Forget all cached tokens"""
+        self.entries.clear()
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+revocations = RevocationList(settings.REVOCATION_FILTER_CAPACITY)
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid token"
+    )
+
+
+@traced("auth.verify_token")
+async def get_token_claims(authorization: Optional[str] = Header(None)) -> TokenClaims:
+    """Verify JWT token and return its claims"""
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,21 +186,63 @@ async def verify_token(authorization: Optional[str] = Header(None)) -> str:
             detail="Invalid authorization header"
         )
     
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
+    claims = token_cache.get(token)
+    if claims is None:
+        jwt, JWTError = _jose()
+        try:
+            payload = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
             )
-    except JWTError:
+        except JWTError:
+            raise _invalid_token()
+        
+        user_id: str = payload.get("sub")
+        exp = payload.get("exp")
+        if user_id is None or not isinstance(exp, (int, float)):
+            raise _invalid_token()
+        claims = TokenClaims(user_id, exp, payload.get("jti"), payload.get("iat") or 0)
+        token_cache.put(token, claims)
+    
+    if revocations.is_revoked(claims.jti, claims.user_id, claims.iat):
+        raise _invalid_token()
+    return claims
+
+
+async def verify_token(authorization: Optional[str] = Header(None)) -> str:
+    """Verify JWT token and return user_id"""
+    claims = await get_token_claims(authorization)
+    return claims.user_id
+
+
+def revoke_token(claims: TokenClaims) -> None:
+    """Revoke a single token until it expires"""
+    if claims.jti:
+        revocations.revoke(claims.jti, claims.exp)
+
+
+def revoke_user_tokens(user_id: str, issued_before: Optional[float] = None) -> float:
+    """Revoke every token issued to a user so far, or before `issued_before`; returns the cutoff"""
+    return revocations.revoke_user(user_id, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, issued_before)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check a token against the configured admin token"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8"))
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Allow only requests carrying the admin token"""
+    if not settings.ADMIN_TOKEN:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Admin endpoints are disabled"
+        )
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
         )
-    return user_id
@@ -0,0 +1,213 @@
+import gzip
+import os
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Vite emits hashed names such as assets/index-4f3a2b1c.js only under assets/;
+# files copied from public/ (apple-touch-icon.png, ...) keep their names
+_HASHED_NAME = re.compile(r"^assets/(?:.*/)?[^/]+-[0-9A-Za-z_-]{8}\.[0-9A-Za-z]+$")
+
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    # brotli is optional and only needed once a static file is served or
+    # precompressed, so it stays out of the API's import time
+    try:
+        import brotli
+    except ImportError:  # pragma: no cover - brotli is optional
+        return None
+    return brotli
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _is_compressible(content_type: str, size: int, min_size: int) -> bool:
+    return size >= min_size and content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+def _accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding listed in an Accept-Encoding header to its q-value"""
+    qualities = {}
+    for item in header.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def _sidecar(path: str, encoding: str) -> str:
+    return path + (".br" if encoding == "br" else ".gz")
+
+
+def precompress(directory: str, min_size: int = 1024) -> int:
+    """Write .gz (and .br when brotli is installed) next to every compressible file"""
+    from mimetypes import guess_type
+
+    encodings = ["gzip"] + (["br"] if _brotli() else [])
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(root, name)
+            content_type = guess_type(name)[0] or ""
+            if not _is_compressible(content_type, os.path.getsize(path), min_size):
+                continue
+            data = Path(path).read_bytes()
+            for encoding in encodings:
+                Path(_sidecar(path, encoding)).write_bytes(_compress(data, encoding))
+                written += 1
+    return written
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves gzip/brotli variants and long-lived cache headers
+
+    Compressed variants come from .gz/.br files written at build time, or
+    are created on the first request. Files up to `memory_limit` bytes are
+    kept in memory, per encoding.
+    """
+
+    def __init__(self, *args, min_size: int = 1024, memory_limit: int = 65536, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+        self.memory_limit = memory_limit
+        self.memory: Dict[Tuple[str, str], Tuple[float, bytes]] = {}
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+
+        full_path = str(response.path)
+        stat_result = response.stat_result
+        content_type = response.media_type or "application/octet-stream"
+        headers = {
+            "cache-control": (
+                IMMUTABLE_CACHE_CONTROL if _HASHED_NAME.match(path.replace(os.sep, "/"))
+                else REVALIDATE_CACHE_CONTROL
+            ),
+            "vary": "Accept-Encoding",
+        }
+        response.headers.update(headers)
+
+        encoding = self._encoding(scope)
+        compressible = _is_compressible(content_type, stat_result.st_size, self.min_size)
+        if encoding is None or not compressible:
+            if stat_result.st_size > self.memory_limit:
+                return response
+            encoding = "identity"
+
+        headers["etag"] = response.headers["etag"] if encoding == "identity" else f'W/{response.headers["etag"]}'
+        headers["last-modified"] = response.headers["last-modified"]
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+
+        key = (full_path, encoding)
+        cached = self.memory.get(key)
+        if cached is not None and cached[0] == stat_result.st_mtime:
+            return Response(cached[1], media_type=content_type, headers=headers)
+
+        if stat_result.st_size <= self.memory_limit:
+            body = await anyio.to_thread.run_sync(self._load, full_path, encoding)
+            self.memory[key] = (stat_result.st_mtime, body)
+            return Response(body, media_type=content_type, headers=headers)
+
+        sidecar = await anyio.to_thread.run_sync(self._ensure_sidecar, full_path, encoding, stat_result.st_mtime)
+        if sidecar is None:
+            return response
+        return FileResponse(sidecar, media_type=content_type, headers=headers)
+
+    def _encoding(self, scope: Scope) -> Optional[str]:
+        """The acceptable encoding with the highest q-value, preferring br on ties"""
+        qualities = _accept_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        wildcard = qualities.get("*", 0.0)
+        best, best_quality = None, 0.0
+        for encoding in ("br", "gzip") if _brotli() is not None else ("gzip",):
+            quality = qualities.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def _load(self, path: str, encoding: str) -> bytes:
+        if encoding == "identity":
+            return Path(path).read_bytes()
+        sidecar = _sidecar(path, encoding)
+        if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+            return Path(sidecar).read_bytes()
+        return _compress(Path(path).read_bytes(), encoding)
+
+    def _ensure_sidecar(self, path: str, encoding: str, mtime: float) -> Optional[str]:
+        sidecar = _sidecar(path, encoding)
+        try:
+            if os.path.getmtime(sidecar) >= mtime:
+                return sidecar
+        except OSError:
+            pass
+        try:
+            temporary = f"{sidecar}.{os.getpid()}.tmp"
+            Path(temporary).write_bytes(_compress(Path(path).read_bytes(), encoding))
+            os.replace(temporary, sidecar)
+        except OSError:
+            # Read-only deployment without build-time files: serve uncompressed
+            return None
+        return sidecar
+
+
+class APIGZipMiddleware:
+    """Gzip responses under /api above a size threshold
+
+    Static files are left alone because they are already served compressed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, prefix: str = "/api"):
+        self.app = app
+        self.prefix = prefix
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.prefix):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else str(Path(__file__).parent / "static")
+    print(f"Wrote {precompress(target)} compressed files under {target}")
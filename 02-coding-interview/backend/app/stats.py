@@ -0,0 +1,64 @@
+from typing import Any, Dict
+
+
+class StatsGroup:
+    """Session counts by status plus execution totals"""
+    
+    __slots__ = ("statuses", "executions", "execution_time")
+    
+    def __init__(self):
+        self.statuses: Dict[str, int] = {}
+        self.executions = 0
+        self.execution_time = 0.0
+    
+    def count(self, status: str, delta: int) -> None:
+        """Adjust the number of sessions with a status"""
+        remaining = self.statuses.get(status, 0) + delta
+        if remaining:
+            self.statuses[status] = remaining
+        else:
+            self.statuses.pop(status, None)
+
+
+class SessionStats:
+    """Counters kept up to date as sessions and executions happen"""
+    
+    def __init__(self):
+        self.overall = StatsGroup()
+        self.creators: Dict[str, StatsGroup] = {}
+        self.languages: Dict[str, StatsGroup] = {}
+    
+    def _groups(self, session: Dict[str, Any]):
+        creator = self.creators.get(session["created_by"])
+        if creator is None:
+            creator = self.creators[session["created_by"]] = StatsGroup()
+        language = self.languages.get(session["language"])
+        if language is None:
+            language = self.languages[session["language"]] = StatsGroup()
+        return self.overall, creator, language
+    
+    def session_added(self, session: Dict[str, Any]) -> None:
+        """Count a new session"""
+        for group in self._groups(session):
+            group.count(session["status"], 1)
+    
+    def session_removed(self, session: Dict[str, Any]) -> None:
+        """Stop counting a deleted session; its executions stay counted"""
+        for group in self._groups(session):
+            group.count(session["status"], -1)
+    
+    def session_updated(self, before: Dict[str, Any], after: Dict[str, Any]) -> None:
+        """Move a session between counters when its status, language or creator changes"""
+        if any(before[key] != after[key] for key in ("status", "language", "created_by")):
+            self.session_removed(before)
+            self.session_added(after)
+    
+    def execution_recorded(self, session: Dict[str, Any], execution_time: float) -> None:
+        """Count an execution in a session"""
+        for group in self._groups(session):
+            group.executions += 1
+            group.execution_time += execution_time
+    
+    def creator(self, created_by: str) -> StatsGroup:
+        """Get the counters of one creator"""
+        return self.creators.get(created_by) or StatsGroup()
@@ -0,0 +1,290 @@
+import asyncio
+import functools
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+from .routing import route_template
+
+# W3C trace context: version-trace_id-parent_id-flags
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = "ok"
+
+    @property
+    def duration(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration": self.duration,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class InMemoryExporter:
+    """Keeps the spans of the most recent traces, up to `max_spans` per trace"""
+
+    def __init__(self, max_traces: int = 200, max_spans: int = 1000):
+        self.max_traces = max_traces
+        self.max_spans = max_spans
+        self.traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+
+    def export(self, span: Span) -> None:
+        spans = self.traces.get(span.trace_id)
+        if spans is None:
+            if len(self.traces) >= self.max_traces:
+                self.traces.popitem(last=False)
+            spans = self.traces[span.trace_id] = []
+        if len(spans) < self.max_spans:
+            spans.append(span)
+
+    def get(self, trace_id: str) -> Optional[List[Span]]:
+        return self.traces.get(trace_id)
+
+
+class FileExporter:
+    """Appends spans to a file as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "a", buffering=1)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict()) + "\n"
+        with self.lock:
+            self.file.write(line)
+
+
+class _NoopSpan:
+    """Stands in for a span when the current request is not sampled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        span = self.span
+        span.end_ns = time.time_ns()
+        if exc is not None:
+            span.status = "error"
+            span.attributes["error"] = repr(exc)
+        _current_span.reset(self.token)
+        self.tracer.exporter.export(span)
+        return False
+
+
+class Tracer:
+    """Creates spans for sampled requests and hands finished spans to an exporter
+
+    The sampling decision is made once per request. A sampled parent in an
+    incoming traceparent header is followed when `follow_parent` is set or
+    the caller is trusted; otherwise `sample_rate` decides, and a sampled
+    request joins the incoming trace. Spans are only created inside a
+    sampled request, so code that is not being traced pays for a single
+    context variable lookup.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, exporter=None, follow_parent: bool = False):
+        self.sample_rate = sample_rate
+        self.exporter = exporter if exporter is not None else InMemoryExporter()
+        self.follow_parent = follow_parent
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, trusted: bool = False, **attributes):
+        """Start the root span of a request, or a no-op if it is not sampled"""
+        match = _TRACEPARENT.match(traceparent) if traceparent else None
+        if match is not None:
+            trace_id, parent_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return _NOOP
+            # Any client can send a sampled flag; only trusted ones force a trace
+            if not (trusted or self.follow_parent) and not self._sampled():
+                return _NOOP
+        elif self._sampled():
+            trace_id, parent_id = os.urandom(16).hex(), None
+        else:
+            return _NOOP
+        return _ActiveSpan(self, Span(name, trace_id, parent_id, attributes))
+
+    def _sampled(self) -> bool:
+        return bool(self.sample_rate) and random.random() < self.sample_rate
+
+    def span(self, name: str, **attributes):
+        """Start a child of the current span"""
+        parent = _current_span.get()
+        if parent is None:
+            return _NOOP
+        return _ActiveSpan(self, Span(name, parent.trace_id, parent.span_id, attributes))
+
+
+def current_span() -> Optional[Span]:
+    """The span of the running code, if it is being traced"""
+    return _current_span.get()
+
+
+def traced(name: str) -> Callable:
+    """Decorate a function so each call runs in a child span"""
+    def decorate(function: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await function(*args, **kwargs)
+                with tracer.span(name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return function(*args, **kwargs)
+            with tracer.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def trace_methods(cls: type, prefix: str, exclude: tuple = ()) -> type:
+    """Wrap every public method of a class in a span named prefix.method"""
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or name in exclude or not callable(attribute):
+            continue
+        setattr(cls, name, traced(f"{prefix}.{name}")(attribute))
+    return cls
+
+
+class TracedRoute(APIRoute):
+    """Route that runs dependency resolution, the endpoint and serialization in a span"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        name = f"route {self.name}"
+
+        async def traced_handler(request):
+            if _current_span.get() is None:
+                return await handler(request)
+            with tracer.span(name):
+                return await handler(request)
+        return traced_handler
+
+
+class TracingMiddleware:
+    """Start a root span per sampled request and return its traceparent
+
+    A sampled traceparent is always followed on requests that carry the
+    admin token in X-Admin-Token.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        # security traces token checks, so it is imported once both are loaded
+        from .security import is_admin_token
+        self.app = app
+        self.tracer = tracer
+        self.is_admin_token = is_admin_token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = admin_token = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+            elif key == b"x-admin-token":
+                admin_token = value.decode("latin-1")
+        root = self.tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            traceparent,
+            trusted=traceparent is not None and self.is_admin_token(admin_token),
+            **{"http.method": scope["method"], "http.target": scope["path"]}
+        )
+        if root is _NOOP:
+            await self.app(scope, receive, send)
+            return
+
+        span = root.span
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceparent", span.traceparent().encode())
+                ]
+            await send(message)
+
+        with root:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                span.attributes["http.route"] = route
+                span.name = f"{scope['method']} {route}"
+
+
+def create_exporter(kind: str, path: str):
+    """Build the exporter named by the TRACE_EXPORTER setting"""
+    if kind == "file":
+        return FileExporter(path)
+    return InMemoryExporter(settings.TRACE_MAX_TRACES, settings.TRACE_MAX_SPANS)
+
+
+# Global tracer instance
+tracer = Tracer(
+    settings.TRACE_SAMPLE_RATE,
+    create_exporter(settings.TRACE_EXPORTER, settings.TRACE_FILE),
+    settings.TRACE_FOLLOW_PARENT
+)
@@ -0,0 +1,214 @@
+import json
+from datetime import datetime, timezone
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+from pydantic import Field, TypeAdapter, ValidationError
+from .database import InMemoryDatabase
+from .schemas import ImportSummary, SessionRecord, UserRecord
+
+_RECORD = TypeAdapter(Annotated[Union[UserRecord, SessionRecord], Field(discriminator="type")])
+
+# Longest line the import buffers before giving up on it
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC, as written by datetime.utcnow()"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def user_line(user: Dict[str, Any]) -> str:
+    """One user as an NDJSON line, password hash included"""
+    return json.dumps({
+        "type": "user",
+        "id": user["id"],
+        "username": user["username"],
+        "email": user["email"],
+        "password": user["password"],
+        "created_at": user["created_at"].isoformat()
+    }, separators=(",", ":")) + "\n"
+
+
+def session_line(session: Dict[str, Any], participants: Dict[str, datetime]) -> str:
+    """One session and its participants as an NDJSON line"""
+    return json.dumps({
+        "type": "session",
+        "id": session["id"],
+        "title": session["title"],
+        "description": session["description"],
+        "created_by": session["created_by"],
+        "language": session["language"],
+        "created_at": session["created_at"].isoformat(),
+        "time_limit_minutes": session["time_limit_minutes"],
+        "code": session["code"],
+        "status": session["status"],
+        "participants": {user_id: joined_at.isoformat() for user_id, joined_at in participants.items()}
+    }, separators=(",", ":")) + "\n"
+
+
+async def export_ndjson(
+    database: InMemoryDatabase,
+    chunk_size: int = 1000,
+    include_sessions: bool = True
+) -> AsyncIterator[bytes]:
+    """Stream all users, then all sessions, as NDJSON
+
+    The IDs are snapshotted up front and records are read a chunk at a
+    time, so the server yields to other requests between chunks and only
+    one chunk is ever serialized in memory. The snapshot is O(n), one
+    pointer per record, but dicts cannot be iterated across awaits while
+    other requests add and delete records. Records deleted during the
+    export are left out; records created during it are not included.
+    """
+    users = database.users
+    user_ids = list(users)
+    for start in range(0, len(user_ids), chunk_size):
+        lines = []
+        for user_id in user_ids[start:start + chunk_size]:
+            user = users.get(user_id)
+            if user is not None:
+                lines.append(user_line(user))
+        yield "".join(lines).encode()
+    if not include_sessions:
+        return
+
+    sessions = database.sessions
+    session_ids = list(sessions)
+    for start in range(0, len(session_ids), chunk_size):
+        lines = []
+        for session_id in session_ids[start:start + chunk_size]:
+            session = sessions.get(session_id)
+            if session is not None:
+                lines.append(session_line(session, database.get_participant_join_times(session_id)))
+        yield "".join(lines).encode()
+
+
+class Importer:
+    """Parses an NDJSON stream fed in arbitrary chunks and writes records in batches
+
+    Users whose ID or email already exists and sessions whose ID already
+    exists are skipped. Invalid lines are reported and skipped; everything
+    else is kept.
+    """
+
+    def __init__(self, database: InMemoryDatabase, batch_size: int = 5000, max_errors: int = 100):
+        self.database = database
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.buffer = bytearray()
+        self.discarding = False
+        self.line_number = 0
+        self.users: List[Dict[str, Any]] = []
+        self.sessions: List[Tuple[Dict[str, Any], Dict[str, datetime]]] = []
+        self.emails: Optional[Set[str]] = None
+        self.imported_users = 0
+        self.imported_sessions = 0
+        self.skipped = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def _error(self, detail: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": self.line_number, "detail": detail})
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the complete lines in a chunk; keep a trailing partial line"""
+        buffer = self.buffer
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line = bytes(buffer[start:end])
+            start = end + 1
+            if self.discarding:
+                self.discarding = False
+                continue
+            self._line(line)
+        del buffer[:start]
+        if len(buffer) > MAX_LINE_BYTES and not self.discarding:
+            self.line_number += 1
+            self._error("Line too long")
+            self.discarding = True
+        if self.discarding:
+            buffer.clear()
+
+    def _line(self, line: bytes) -> None:
+        self.line_number += 1
+        if not line.strip():
+            return
+        try:
+            record = _RECORD.validate_json(line)
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            self._error(f"{location}: {error['msg']}" if location else error["msg"])
+            return
+        if isinstance(record, UserRecord):
+            self._add_user(record)
+        else:
+            self._add_session(record)
+
+    def _add_user(self, record: UserRecord) -> None:
+        if self.emails is None:
+            self.emails = {user["email"] for user in self.database.users.values()}
+        if record.id in self.database.users or record.email in self.emails:
+            self.skipped += 1
+            return
+        self.emails.add(record.email)
+        self.users.append({
+            "id": record.id,
+            "username": record.username,
+            "email": record.email,
+            "password": record.password,
+            "created_at": _naive_utc(record.created_at)
+        })
+        if len(self.users) >= self.batch_size:
+            self._flush_users()
+
+    def _add_session(self, record: SessionRecord) -> None:
+        created_at = _naive_utc(record.created_at)
+        participants = {user_id: _naive_utc(joined_at) for user_id, joined_at in record.participants.items()}
+        # The creator is always a participant, as for sessions created through the API
+        participants.setdefault(record.created_by, created_at)
+        self.sessions.append(({
+            "id": record.id,
+            "title": record.title,
+            "description": record.description,
+            "created_by": record.created_by,
+            "language": record.language.value,
+            "created_at": created_at,
+            "time_limit_minutes": record.time_limit_minutes,
+            "code": record.code,
+            "status": record.status
+        }, participants))
+        if len(self.sessions) >= self.batch_size:
+            self._flush_sessions()
+
+    def _flush_users(self) -> None:
+        added = self.database.import_users(self.users)
+        self.imported_users += added
+        self.skipped += len(self.users) - added
+        self.users = []
+
+    def _flush_sessions(self) -> None:
+        added = self.database.import_sessions(self.sessions)
+        self.imported_sessions += added
+        self.skipped += len(self.sessions) - added
+        self.sessions = []
+
+    def finish(self) -> ImportSummary:
+        """Parse a final line without a newline, write what is left and summarize"""
+        if self.buffer and not self.discarding:
+            self._line(bytes(self.buffer))
+        self.buffer.clear()
+        self._flush_users()
+        self._flush_sessions()
+        return ImportSummary(
+            users=self.imported_users,
+            sessions=self.imported_sessions,
+            skipped=self.skipped,
+            errors=self.errors
+        )
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+from .config import settings
+
+
+def default_root() -> str:
+    """Prefer tmpfs so submissions never touch disk"""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK | os.X_OK):
+        return shm
+    return tempfile.gettempdir()
+
+
+def _clear(path: str) -> None:
+    """Remove everything inside a directory without following symlinks"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+
+def write_files(workspace: str, files: Dict[str, str]) -> None:
+    """Write submission files into a workspace"""
+    root = os.path.realpath(workspace)
+    for name, content in files.items():
+        path = os.path.realpath(os.path.join(root, name))
+        # Names are validated by ExecutionRequest; this guards the filesystem too
+        if os.path.commonpath([root, path]) != root or path == root:
+            raise ValueError(f"Invalid file path: {name}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+class WorkspacePool:
+    """Per-run working directories, emptied and reused between runs
+
+    All workspaces live under one directory per process, created lazily
+    under `root` (tmpfs when available) and removed by close().
+    """
+
+    def __init__(self, root: Optional[str] = None, max_idle: int = 8):
+        self.root = root
+        self.max_idle = max_idle
+        self.base: Optional[str] = None
+        self.idle: List[str] = []
+
+    def acquire(self) -> str:
+        """Get an empty workspace directory"""
+        if self.idle:
+            return self.idle.pop()
+        if self.base is None:
+            self.base = tempfile.mkdtemp(prefix="interview-runs-", dir=self.root or default_root())
+        return tempfile.mkdtemp(prefix="run-", dir=self.base)
+
+    def release(self, workspace: str) -> None:
+        """Empty a workspace and keep it for the next run"""
+        if len(self.idle) >= self.max_idle:
+            shutil.rmtree(workspace, ignore_errors=True)
+            return
+        try:
+            _clear(workspace)
+        except OSError:
+            # A run left something it cannot be cleaned from; drop the workspace
+            shutil.rmtree(workspace, ignore_errors=True)
+            return
+        self.idle.append(workspace)
+
+    def close(self) -> None:
+        """Remove every workspace"""
+        if self.base is not None:
+            shutil.rmtree(self.base, ignore_errors=True)
+        self.base = None
+        self.idle.clear()
+
+
+# Global workspace pool
+workspace_pool = WorkspacePool(settings.EXECUTION_WORKSPACE_ROOT or None, settings.EXECUTION_WORKSPACE_POOL_SIZE)
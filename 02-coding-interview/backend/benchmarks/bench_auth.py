@@ -0,0 +1,43 @@
+"""Benchmark the verify_token dependency with and without the token cache
+
+Usage: python -m benchmarks.bench_auth [--calls 20000]
+"""
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+from app.security import create_access_token, revocations, token_cache, verify_token
+
+
+async def measure(header: str, calls: int, cached: bool) -> float:
+    """Return seconds per verify_token call"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        if not cached:
+            token_cache.clear()
+        await verify_token(header)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--revoked", type=int, default=10_000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "bench-user"}, timedelta(minutes=30))
+    header = f"Bearer {token}"
+    uncached = asyncio.run(measure(header, args.calls, cached=False))
+    cached = asyncio.run(measure(header, args.calls, cached=True))
+    print(f"verify_token without cache: {uncached * 1e6:8.1f} µs/request")
+    print(f"verify_token with cache:    {cached * 1e6:8.1f} µs/request")
+
+    for i in range(args.revoked):
+        revocations.revoke(f"revoked-{i}", time.time() + 3600)
+    revoked = asyncio.run(measure(header, args.calls, cached=True))
+    print(f"with {args.revoked:,} revoked tokens:  {revoked * 1e6:8.1f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
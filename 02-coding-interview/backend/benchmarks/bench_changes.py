@@ -0,0 +1,55 @@
+"""Benchmark memory and wake-up time of parked long-poll waiters
+
+Usage: python -m benchmarks.bench_changes [--waiters 10000] [--sessions 100]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.changes import ChangeFeed
+
+
+async def run(waiters: int, sessions: int) -> dict:
+    feed = ChangeFeed()
+    session_ids = [f"session-{i}" for i in range(sessions)]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = [
+        asyncio.create_task(feed.wait(session_ids[i % sessions], timeout=60))
+        for i in range(waiters)
+    ]
+    await asyncio.sleep(0)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    start = time.perf_counter()
+    for version, session_id in enumerate(session_ids, start=1):
+        feed.notify(session_id, version)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "waiters": waiters,
+        "sessions": sessions,
+        "bytes_per_waiter": allocated / waiters,
+        "wake_all_seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--waiters", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=100)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.waiters, args.sessions))
+    print(f"parked waiters:     {result['waiters']} on {result['sessions']} sessions")
+    print(f"memory/waiter:      {result['bytes_per_waiter']:,.0f} bytes (including the task)")
+    print(f"wake all:           {result['wake_all_seconds'] * 1000:,.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
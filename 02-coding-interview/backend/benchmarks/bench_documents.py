@@ -0,0 +1,82 @@
+"""Benchmark merging concurrent edits into a session document
+
+Usage: python -m benchmarks.bench_documents [--size 10000] [--editors 4] [--ops 20000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.documents import Document, TextOperation
+
+
+def random_edit(length: int, rng: random.Random) -> TextOperation:
+    """Build a small keystroke-sized edit against a document of `length` characters"""
+    position = rng.randint(0, length)
+    operation = TextOperation().retain(position)
+    if position < length and rng.random() < 0.3:
+        operation.delete(min(rng.randint(1, 3), length - position))
+    else:
+        operation.insert(rng.choice("abcdefghij \n()"))
+    return operation.retain(length - operation.base_length)
+
+
+def run(size: int, editors: int, ops: int, history_limit: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    document = Document("x" * size)
+    # Each editor keeps the revision and text it last synced, so its edits
+    # arrive concurrent with everything the other editors sent meanwhile.
+    views = [(document.revision, document.text) for _ in range(editors)]
+
+    start = time.perf_counter()
+    for i in range(ops):
+        editor = i % editors
+        revision, text = views[editor]
+        document.apply(revision, random_edit(len(text), rng))
+        if rng.random() < 0.5:
+            views[editor] = (document.revision, document.text)
+        if i % 1000 == 999:
+            document.compact(history_limit)
+            views = [
+                view if view[0] >= document.history_start else (document.revision, document.text)
+                for view in views
+            ]
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    documents = [Document("x" * size) for _ in range(10)]
+    for doc in documents:
+        for _ in range(history_limit):
+            doc.apply(doc.revision, random_edit(len(doc.text), rng))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    return {
+        "size": size,
+        "editors": editors,
+        "merges": ops,
+        "merges_per_second": ops / elapsed,
+        "bytes_per_document": allocated / len(documents),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--editors", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--history-limit", type=int, default=500)
+    args = parser.parse_args()
+
+    result = run(args.size, args.editors, args.ops, args.history_limit)
+    print(f"document size:      {result['size']} chars")
+    print(f"editors:            {result['editors']}")
+    print(f"merges/second:      {result['merges_per_second']:,.0f}")
+    print(f"memory/document:    {result['bytes_per_document'] / 1024:,.1f} KiB "
+          f"(with {args.history_limit} ops of history)")
+
+
+if __name__ == "__main__":
+    main()
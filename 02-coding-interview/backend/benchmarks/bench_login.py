@@ -0,0 +1,90 @@
+"""Benchmark login throughput and its effect on other endpoints' latency
+
+Compares bcrypt verification run inline on the event loop with the
+password hashing pool, while a probe keeps calling GET /api/health.
+
+Usage: python -m benchmarks.bench_login [--logins 40] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.database import db
+from app.security import hash_password, verify_password, verify_password_async
+
+
+async def probe(client: AsyncClient, stop: asyncio.Event, latencies: list) -> None:
+    """Call the health endpoint every 5 ms until stopped, recording latencies
+
+    Latency is counted from when the request was due, so time spent waiting
+    for a blocked event loop is included.
+    """
+    due = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(due - time.perf_counter(), 0))
+        await client.get("/api/health")
+        now = time.perf_counter()
+        latencies.append(now - due)
+        due = max(due + 0.005, now)
+
+
+async def storm(logins: int, concurrency: int, hashed: str, offload: bool) -> float:
+    """Run `logins` password checks, `concurrency` at a time; return logins/second"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            if offload:
+                assert await verify_password_async("password123", hashed)
+            else:
+                assert verify_password("password123", hashed)
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return logins / (time.perf_counter() - start)
+
+
+async def run(logins: int, concurrency: int) -> dict:
+    hashed = hash_password("password123")
+    db.create_user("bench-login", "bench-login@example.com", hashed)
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for offload in (False, True):
+            latencies = []
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe(client, stop, latencies))
+            throughput = await storm(logins, concurrency, hashed, offload)
+            stop.set()
+            await prober
+            latencies.sort()
+            results["pool" if offload else "inline"] = {
+                "logins_per_second": throughput,
+                "health_p50_ms": statistics.median(latencies) * 1000,
+                "health_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+                "health_max_ms": latencies[-1] * 1000,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.logins, args.concurrency))
+    for mode, result in results.items():
+        print(
+            f"{mode:<7} {result['logins_per_second']:7.1f} logins/s   "
+            f"health p50 {result['health_p50_ms']:7.1f} ms   p99 {result['health_p99_ms']:7.1f} ms   "
+            f"max {result['health_max_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Benchmark replay log size and seek time on interview-sized edit streams
+
+Simulates a candidate writing a solution of about 150 lines: typing one
+character at a time with typos fixed by backspace, moving the cursor back
+to edit earlier lines and pasting snippets. Reports the bytes per event of
+the replay log against a list of Python tuples, bare JSON operations and a
+full code snapshot per event, then times seeking and a full replay.
+
+Usage: python -m benchmarks.bench_replay [--lines 150] [--keyframe-interval 1000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+from typing import Iterator, Tuple
+from unittest import mock
+
+from app.documents import TextOperation
+from app.replay import ReplayLog, replay_ndjson
+
+IDENTIFIERS = ["nums", "left", "right", "result", "seen", "count", "node", "queue", "i", "j", "target"]
+STATEMENTS = [
+    "for {a} in range(len({b})):",
+    "if {a} in {b}:",
+    "{a} = {b} + 1",
+    "{a}.append({b})",
+    "while {a} < {b}:",
+    "return {a}",
+    "{a} = max({a}, {b})",
+    "{a}[{b}] = {a}.get({b}, 0) + 1",
+]
+PASTE = "def helper(nums):\n    return sorted(nums)\n"
+
+
+class Clock:
+    """Simulated wall clock: interviews take an hour, benchmarks should not"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def interview(lines: int, seed: int = 0) -> Iterator[Tuple[float, TextOperation]]:
+    """(seconds since the previous edit, operation) pairs of one simulated interview"""
+    rng = random.Random(seed)
+    length = 0
+    cursor = 0
+    line_starts = [0]
+
+    def insert(text: str) -> TextOperation:
+        nonlocal length, cursor
+        operation = TextOperation().retain(cursor).insert(text).retain(length - cursor)
+        length += len(text)
+        cursor += len(text)
+        return operation
+
+    def backspace() -> TextOperation:
+        nonlocal length, cursor
+        operation = TextOperation().retain(cursor - 1).delete(1).retain(length - cursor)
+        length -= 1
+        cursor -= 1
+        return operation
+
+    for number in range(lines):
+        indent = "    " * rng.randint(1, 3)
+        statement = rng.choice(STATEMENTS).format(a=rng.choice(IDENTIFIERS), b=rng.choice(IDENTIFIERS))
+        # Thinking before each line, longer now and then
+        pause = rng.uniform(20, 90) if rng.random() < 0.2 else rng.uniform(1, 5)
+        if number % 40 == 39:
+            yield pause, insert(PASTE)
+            pause = rng.uniform(1, 5)
+        for character in indent + statement + "\n":
+            if rng.random() < 0.04:
+                yield pause, insert(rng.choice("abcdefghijklmnopqrstuvwxyz"))
+                yield rng.uniform(0.2, 0.8), backspace()
+                pause = rng.uniform(0.05, 0.3)
+            yield pause, insert(character)
+            pause = rng.uniform(0.05, 0.4)
+        line_starts.append(cursor)
+        if rng.random() < 0.1:
+            # Go back to rename something on an earlier line
+            cursor = rng.choice(line_starts[:-1]) + 4
+            for character in rng.choice(IDENTIFIERS):
+                yield rng.uniform(0.1, 0.4), insert(character)
+            cursor = length
+
+
+def naive(lines: int) -> int:
+    """Memory of the same events as a list of (time, author, components) tuples"""
+    tracemalloc.start()
+    events = []
+    for pause, operation in interview(lines):
+        events.append((pause, "candidate", operation.to_list()))
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return traced
+
+
+def build(lines: int, keyframe_interval: int) -> Tuple[ReplayLog, int, int, str]:
+    clock = Clock()
+    with mock.patch("app.replay.time", clock):
+        log = ReplayLog("", keyframe_interval, max_events=10_000_000)
+        text = ""
+        json_bytes = snapshot_bytes = 0
+        for pause, operation in interview(lines):
+            clock.now += pause
+            text = operation.apply(text)
+            log.record(operation, text, "candidate")
+            json_bytes += len(json.dumps(operation.to_list()))
+            snapshot_bytes += len(text.encode())
+    return log, json_bytes, snapshot_bytes, text
+
+
+async def replay(log: ReplayLog) -> Tuple[int, int]:
+    lines = size = 0
+    async for chunk in replay_ndjson(log):
+        lines += chunk.count(b"\n")
+        size += len(chunk)
+    return lines, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=150)
+    parser.add_argument("--keyframe-interval", type=int, default=1000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    log, json_bytes, snapshot_bytes, text = build(args.lines, args.keyframe_interval)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    events = len(log)
+    minutes = log.times[-1] / 60000
+    print(
+        f"{events:,} events over {minutes:.0f} min, final code {len(text):,} chars "
+        f"in {text.count(chr(10))} lines, {len(log.keyframes)} keyframes"
+    )
+    print(f"replay log       {log.nbytes():>12,} bytes  {log.nbytes() / events:8.1f} bytes/event")
+    print(f"  (tracemalloc)  {traced:>12,} bytes  {traced / events:8.1f} bytes/event")
+    tuples = naive(args.lines)
+    print(f"Python tuples    {tuples:>12,} bytes  {tuples / events:8.1f} bytes/event")
+    print(f"JSON ops only    {json_bytes:>12,} bytes  {json_bytes / events:8.1f} bytes/event (no time or author)")
+    print(f"code snapshots   {snapshot_bytes:>12,} bytes  {snapshot_bytes / events:8.1f} bytes/event")
+
+    rng = random.Random(1)
+    points = [rng.randrange(log.times[-1]) for _ in range(200)]
+    start = time.perf_counter()
+    for elapsed_ms in points:
+        log.text_at(log.event_at(elapsed_ms))
+    seek = (time.perf_counter() - start) / len(points)
+    print(f"seek             {seek * 1e3:8.3f} ms (mean of {len(points)} random points)")
+
+    start = time.perf_counter()
+    lines, size = asyncio.run(replay(log))
+    elapsed = time.perf_counter() - start
+    print(f"full replay      {elapsed * 1e3:8.1f} ms  {lines:,} NDJSON lines  {size:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark indexed session search
+
+Usage: python -m benchmarks.bench_search [--sessions 100000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.search import SessionIndex
+
+WORDS = [
+    "array", "binary", "cache", "design", "graph", "hash", "heap", "interval",
+    "linked", "list", "matrix", "queue", "recursion", "search", "sort", "stack",
+    "string", "tree", "trie", "window", "backend", "frontend", "senior", "junior",
+]
+LANGUAGES = ["python", "javascript", "java", "cpp"]
+STATUSES = ["active"] * 2 + ["completed"] * 7 + ["expired"]
+
+
+def build(count: int, seed: int = 0) -> SessionIndex:
+    rng = random.Random(seed)
+    index = SessionIndex()
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        index.add({
+            "id": f"session-{i}",
+            "title": " ".join(rng.sample(WORDS, 3)),
+            "description": " ".join(rng.sample(WORDS, 5)),
+            "language": rng.choice(LANGUAGES),
+            "status": rng.choice(STATUSES),
+            "created_by": f"user-{rng.randrange(count // 50 + 1)}",
+            "created_at": start + timedelta(minutes=i),
+        })
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build(args.sessions)
+    print(f"indexed {args.sessions:,} sessions in {time.perf_counter() - start:.2f}s")
+
+    middle = datetime(2025, 1, 1) + timedelta(minutes=args.sessions // 2)
+    queries = {
+        "keyword": {"query": "graph"},
+        "two keywords": {"query": "graph heap"},
+        "language": {"language": "python"},
+        "language + status": {"language": "cpp", "status": "active"},
+        "keywords + language + status": {"query": "tree senior", "language": "java", "status": "completed"},
+        "date range": {"created_after": middle, "created_before": middle + timedelta(days=3)},
+        "keyword + date range": {"query": "trie", "created_after": middle},
+        "creator": {"created_by": "user-7"},
+    }
+    for name, filters in queries.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            page, total = index.search(**filters)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{name:<30} {elapsed * 1e6:>9,.0f} µs  ({total:,} matches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark GET /api/sessions/{id} with and without the response cache
+
+Usage: python -m benchmarks.bench_session_read [--requests 5000] [--participants 5]
+"""
+import argparse
+import asyncio
+import time
+
+from app.main import app
+from app.database import db
+from app.responses import session_responses
+
+
+async def call(path: str) -> int:
+    """Send one GET request straight to the ASGI app and return the status"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(path: str, requests: int) -> float:
+    """Return requests per second for `requests` sequential reads"""
+    for _ in range(100):
+        await call(path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        assert await call(path) == 200
+    return requests / (time.perf_counter() - start)
+
+
+async def run(requests: int, participants: int) -> dict:
+    owner = db.create_user("bench-owner", "bench-owner@example.com", "x")
+    session = db.create_session("Benchmark", "Read benchmark", owner["id"], "python", 60)
+    db.update_session_code(session["id"], "def solve(n):\n    return n * 2\n" * 200)
+    for i in range(participants - 1):
+        user = db.create_user(f"bench-{i}", f"bench-{i}@example.com", "x")
+        db.add_participant(session["id"], user["id"])
+    path = f"/api/sessions/{session['id']}"
+
+    max_entries = session_responses.max_entries
+    session_responses.max_entries = 0
+    session_responses.invalidate(session["id"])
+    uncached = await measure(path, requests)
+    session_responses.max_entries = max_entries
+    cached = await measure(path, requests)
+
+    return {
+        "requests": requests,
+        "participants": participants,
+        "uncached_rps": uncached,
+        "cached_rps": cached,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--participants", type=int, default=5)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.requests, args.participants))
+    print(f"participants:       {result['participants']}")
+    print(f"without cache:      {result['uncached_rps']:,.0f} req/s")
+    print(f"with cache:         {result['cached_rps']:,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Report API cold start time with an import-time breakdown
+
+Each run starts a fresh interpreter, imports app.main and times
+create_app(). One extra run with -X importtime attributes import time to
+the packages and app modules that spent it. Finally, the packages the app
+imports on first use are timed after app.main, which is what deferring
+them saves at cold start; a whole cold start varies more run to run.
+
+Usage: python -m benchmarks.bench_startup [--runs 10] [--top 15]
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+PROBE = """
+import time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app.main.create_app()
+print(imported - start, time.perf_counter() - imported)
+"""
+
+DEFERRED_PROBE = """
+import time
+import app.main
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+# Imported on first use: tokens, static file compression, calls to other nodes
+DEFERRED = ("jose.jwt", "brotli", "httpx")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def cold_starts(runs: int) -> List[Tuple[float, float]]:
+    """(import seconds, create_app seconds) for each fresh interpreter"""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append((float(output[0]), float(output[1])))
+    return timings
+
+
+def deferred_cost(module: str, runs: int) -> float:
+    """Median seconds to import a module once app.main is loaded"""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", DEFERRED_PROBE.format(module=module)],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            return float("nan")
+        timings.append(float(output.stdout))
+    return statistics.median(timings)
+
+
+def group(module: str) -> str:
+    """App modules are reported one by one, everything else by top-level package"""
+    parts = module.split(".")
+    if parts[0] == "app":
+        return ".".join(parts[:3] if parts[1:2] == ["routes"] else parts[:2])
+    return parts[0]
+
+
+def import_breakdown() -> Dict[str, float]:
+    """Self import time in seconds per group, for modules loaded by app.main"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    ).stderr
+    lines = [match for match in map(_LINE.match, stderr.splitlines()) if match]
+    # Modules imported while starting the interpreter come before app.main's tree
+    first = next(i for i, match in enumerate(lines) if match.group(4) == "app.main")
+    depth_of_main = len(lines[first].group(3))
+    start = first
+    while start > 0 and len(lines[start - 1].group(3)) > depth_of_main:
+        start -= 1
+
+    totals: Dict[str, float] = defaultdict(float)
+    for match in lines[start:first + 1]:
+        totals[group(match.group(4))] += int(match.group(1)) / 1e6
+    return dict(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = cold_starts(args.runs)
+    imports = [imported for imported, _ in timings]
+    factory = [created for _, created in timings]
+    print(f"import app.main   median {statistics.median(imports) * 1000:7.1f} ms   min {min(imports) * 1000:7.1f} ms")
+    print(f"create_app()      median {statistics.median(factory) * 1000:7.1f} ms   min {min(factory) * 1000:7.1f} ms")
+
+    breakdown = import_breakdown()
+    total = sum(breakdown.values())
+    print(f"\nimport time by package ({total * 1000:.1f} ms total)")
+    for name, seconds in sorted(breakdown.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28} {seconds * 1000:7.1f} ms  {seconds / total:6.1%}")
+
+    print("\nimported on first use, cost after app.main (median)")
+    for module in DEFERRED:
+        print(f"  {module:<28} {deferred_cost(module, args.runs) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark NDJSON import and export throughput
+
+Imports synthetic users and sessions through the streaming importer in
+64 KiB chunks, as the import endpoint receives them, then exports them
+again. --memory also reports the peak memory allocated by an export.
+
+Usage: python -m benchmarks.bench_transfer [--sessions 1000000] [--memory]
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from app.database import InMemoryDatabase
+from app.transfer import Importer, export_ndjson
+
+WORDS = ["array", "graph", "heap", "tree", "trie", "window", "cache", "queue", "sort", "string"]
+LANGUAGES = ["python", "javascript", "java", "cpp"]
+CHUNK = 64 * 1024
+
+
+USER = (
+    '{{"type":"user","id":"user-{i}","username":"user{i}","email":"user{i}@example.com",'
+    '"password":"$2b$12${hash}","created_at":"2025-01-01T00:00:00"}}\n'
+)
+SESSION = (
+    '{{"type":"session","id":"session-{i}","title":"{title}","description":"{description}",'
+    '"created_by":"user-{creator}","language":"{language}","created_at":"{created_at}",'
+    '"time_limit_minutes":60,"code":"def solve(nums):\\n    return sorted(nums)\\n",'
+    '"status":"completed","participants":{{"user-{creator}":"{created_at}"}}}}\n'
+)
+
+
+def synthetic_export(sessions: int, seed: int = 0) -> Iterator[bytes]:
+    """NDJSON as written by an export, in request-sized chunks"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    users = sessions // 50 + 1
+    password = "x" * 53
+
+    def lines():
+        for i in range(users):
+            yield USER.format(i=i, hash=password)
+        for i in range(sessions):
+            yield SESSION.format(
+                i=i,
+                title=" ".join(rng.sample(WORDS, 3)),
+                description=" ".join(rng.sample(WORDS, 5)),
+                creator=rng.randrange(users),
+                language=rng.choice(LANGUAGES),
+                created_at=(start + timedelta(minutes=i)).isoformat()
+            )
+
+    buffer = []
+    size = 0
+    for line in lines():
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+async def export(database: InMemoryDatabase, chunk_size: int) -> int:
+    total = 0
+    async for chunk in export_ndjson(database, chunk_size):
+        total += len(chunk)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    database = InMemoryDatabase()
+    importer = Importer(database, args.batch_size)
+    received = 0
+    start = time.perf_counter()
+    for chunk in synthetic_export(args.sessions):
+        received += len(chunk)
+        importer.feed(chunk)
+    summary = importer.finish()
+    elapsed = time.perf_counter() - start
+    records = summary.users + summary.sessions
+    print(
+        f"import  {records:>10,} records  {elapsed:7.2f}s  {records / elapsed:>10,.0f} records/s  "
+        f"{received / elapsed / 1e6:6.1f} MB/s  (skipped {summary.skipped})"
+    )
+
+    start = time.perf_counter()
+    sent = asyncio.run(export(database, args.chunk_size))
+    elapsed = time.perf_counter() - start
+    print(
+        f"export  {records:>10,} records  {elapsed:7.2f}s  {records / elapsed:>10,.0f} records/s  "
+        f"{sent / elapsed / 1e6:6.1f} MB/s"
+    )
+
+    if args.memory:
+        # A separate run: tracing allocations slows the export several times over
+        tracemalloc.start()
+        asyncio.run(export(database, args.chunk_size))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"export peak memory {peak / 1e6:.1f} MB (ID snapshot + one chunk)")
+
+
+if __name__ == "__main__":
+    main()
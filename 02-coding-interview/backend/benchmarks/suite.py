@@ -0,0 +1,235 @@
+"""Microbenchmark suite for storage, auth and schema hot paths
+
+Seeds an InMemoryDatabase with each dataset size and times the hot paths
+behind the API. Results are written as JSON so runs from different commits
+can be compared.
+
+Usage: python -m benchmarks.suite [--sizes 1000,100000,1000000] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from app.database import InMemoryDatabase
+from app.schemas import ExecutionResult, Participant, SessionDetail, SessionList
+from app.security import create_access_token, revocations, token_cache, verify_token
+
+WORDS = [
+    "array", "binary", "cache", "design", "graph", "hash", "heap", "interval",
+    "linked", "list", "matrix", "queue", "recursion", "search", "sort", "stack",
+]
+LANGUAGES = ["python", "javascript", "java", "cpp"]
+SESSIONS_PER_USER = 100
+
+
+def run_sync(coroutine):
+    """Drive a coroutine that never suspends, without an event loop"""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """Best time per call in nanoseconds"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def seed(size: int, rng: random.Random) -> InMemoryDatabase:
+    """Build a database with `size` sessions spread over size / 100 users"""
+    database = InMemoryDatabase()
+    users = [
+        database.create_user(f"user{i}", f"user{i}@example.com", "hashed")["id"]
+        for i in range(max(size // SESSIONS_PER_USER, 1))
+    ]
+    for i in range(size):
+        session = database.create_session(
+            title=" ".join(rng.sample(WORDS, 3)),
+            description=" ".join(rng.sample(WORDS, 4)),
+            created_by=users[i % len(users)],
+            language=rng.choice(LANGUAGES),
+            time_limit_minutes=60
+        )
+        database.add_participant(session["id"], users[(i + 1) % len(users)])
+    return database
+
+
+def storage_cases(database: InMemoryDatabase, rng: random.Random) -> Dict[str, Callable[[], object]]:
+    session_ids = list(database.sessions)
+    user_ids = list(database.users)
+    session_id = session_ids[len(session_ids) // 2]
+    user_id = user_ids[len(user_ids) // 2]
+    email = database.users[user_ids[-1]]["email"]
+    outsider = database.create_user("outsider", "outsider@example.com", "hashed")["id"]
+    lookups = [rng.choice(session_ids) for _ in range(1024)]
+    position = iter(range(1 << 62))
+
+    def join_and_leave():
+        database.add_participant(session_id, outsider)
+        database.remove_participant(session_id, outsider)
+
+    return {
+        "get_session": lambda: database.get_session(lookups[next(position) & 1023]),
+        "get_user": lambda: database.get_user(user_id),
+        "get_user_by_email": lambda: database.get_user_by_email(email),
+        "get_user_sessions": lambda: database.get_user_sessions(user_id, 50, 0),
+        "update_session": lambda: database.update_session(session_id, title="Renamed"),
+        "join_and_leave": join_and_leave,
+        "get_participants": lambda: database.get_participants(session_id),
+        "search_keyword": lambda: database.search_sessions(query="graph", limit=50),
+        "search_language_status": lambda: database.search_sessions(language="python", status="active", limit=50),
+        "create_session": lambda: database.create_session("Bench", None, user_id, "python", 60),
+    }
+
+
+def auth_cases(size: int) -> Dict[str, Callable[[], object]]:
+    revocations.revoked.clear()
+    revocations.users.clear()
+    now = time.time()
+    for i in range(size):
+        revocations.revoke(f"revoked-{i}", now + 3600)
+    token = create_access_token({"sub": "bench-user"}, timedelta(minutes=30))
+    header = f"Bearer {token}"
+
+    def verify_uncached():
+        token_cache.clear()
+        return run_sync(verify_token(header))
+
+    return {
+        "verify_token_cached": lambda: run_sync(verify_token(header)),
+        "verify_token_uncached": verify_uncached,
+    }
+
+
+def fixed_cases() -> Dict[str, Dict[str, Callable[[], object]]]:
+    """Cases whose cost does not depend on the dataset size"""
+    now = datetime.utcnow()
+    session = {
+        "id": "session-id",
+        "title": "Two Sum",
+        "description": "Find two numbers adding up to a target",
+        "created_by": "user-id",
+        "language": "python",
+        "created_at": now,
+        "time_limit_minutes": 60,
+        "participant_count": 2,
+    }
+    detail = SessionDetail(
+        **session,
+        participants=[Participant(user_id=f"user-{i}", username=f"user{i}", joined_at=now) for i in range(2)],
+        code="def two_sum(nums, target):\n    pass\n" * 20,
+        last_execution=ExecutionResult(
+            success=True, output="ok\n", stdout="ok\n", stderr="", return_code=0, execution_time=0.05
+        )
+    )
+    sessions = [dict(session, id=f"session-{i}") for i in range(50)]
+    return {
+        "auth": {
+            "create_access_token": lambda: create_access_token({"sub": "bench-user"}, timedelta(minutes=30)),
+        },
+        "schemas": {
+            "session_detail_dump_json": detail.model_dump_json,
+            "session_list_validate_50": lambda: SessionList(sessions=sessions, total=50),
+            "session_list_dump_json_50": SessionList(sessions=sessions, total=50).model_dump_json,
+        },
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: List[int], seed_value: int = 0) -> dict:
+    """Run every case and return the results document"""
+    results = []
+
+    def record(group: str, name: str, size: Optional[int], function: Callable[[], object]):
+        ns = measure(function)
+        results.append({"group": group, "name": name, "size": size, "ns_per_op": round(ns, 1)})
+        label = f"{group}.{name}" + (f"[{size:,}]" if size else "")
+        print(f"{label:<48} {ns / 1000:>12,.2f} µs", file=sys.stderr)
+
+    for group, cases in fixed_cases().items():
+        for name, function in cases.items():
+            record(group, name, None, function)
+
+    for size in sizes:
+        rng = random.Random(seed_value)
+        start = time.perf_counter()
+        database = seed(size, rng)
+        seeded = time.perf_counter() - start
+        results.append({"group": "storage", "name": "seed_per_session", "size": size, "ns_per_op": round(seeded / size * 1e9, 1)})
+        print(f"seeded {size:,} sessions in {seeded:.2f}s", file=sys.stderr)
+        for name, function in storage_cases(database, rng).items():
+            record("storage", name, size, function)
+        for name, function in auth_cases(size).items():
+            record("auth", name, size, function)
+        del database
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "sizes": sizes,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """List cases that got slower than the baseline by more than `threshold`"""
+    previous = {(r["group"], r["name"], r["size"]): r["ns_per_op"] for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["group"], result["name"], result["size"]))
+        if before and result["ns_per_op"] > before * (1 + threshold):
+            regressions.append(
+                f"{result['group']}.{result['name']}[{result['size']}]: "
+                f"{before / 1000:,.2f} µs -> {result['ns_per_op'] / 1000:,.2f} µs"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma-separated dataset sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    document = run([int(size) for size in args.sizes.split(",")], args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(document, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
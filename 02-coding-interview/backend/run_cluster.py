@@ -0,0 +1,165 @@
+"""Run several local API nodes as one session-affinity cluster
+
+Each node is a uvicorn process on its own port, started with the same
+CLUSTER_NODES and its own NODE_ID. --check signs up through one node,
+logs in through another, creates sessions through every node and reads
+each session back through every node, verifying it is always served by
+its owner, and fetches them all in one batch; then it adds a node, hands
+sessions off to it and logs out through one node.
+
+Usage: python run_cluster.py [--nodes 3] [--port 8001] [--check]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+ADMIN_TOKEN = "cluster-admin"
+
+
+def node_env(nodes: Dict[str, str], node_id: str) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "CLUSTER_NODES": ",".join(f"{key}={url}" for key, url in nodes.items()),
+        "NODE_ID": node_id,
+        "ADMIN_TOKEN": os.environ.get("ADMIN_TOKEN", ADMIN_TOKEN),
+    }
+
+
+def start(nodes: Dict[str, str], node_id: str) -> subprocess.Popen:
+    port = nodes[node_id].rsplit(":", 1)[1]
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", port, "--log-level", "warning"],
+        env=node_env(nodes, node_id)
+    )
+
+
+def wait_healthy(urls: List[str], timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    for url in urls:
+        while True:
+            try:
+                if httpx.get(url + "/api/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f"{url} did not become healthy")
+            time.sleep(0.1)
+
+
+async def wait_until(request, accepted, what: str, timeout: float = 10.0) -> httpx.Response:
+    """Repeat a request until its response is accepted, for changes copied in the background"""
+    deadline = time.monotonic() + timeout
+    while True:
+        response = await request()
+        if accepted(response):
+            return response
+        if time.monotonic() > deadline:
+            raise SystemExit(f"timed out waiting for {what} (last status {response.status_code})")
+        await asyncio.sleep(0.1)
+
+
+async def check(nodes: Dict[str, str], extra: Dict[str, str]) -> None:
+    """Verify session affinity across the nodes, then a join with handoff"""
+    admin = {"X-Admin-Token": os.environ.get("ADMIN_TOKEN", ADMIN_TOKEN)}
+    urls = list(nodes.values())
+    async with httpx.AsyncClient(timeout=30) as client:
+        credentials = {"email": f"cluster-{time.time_ns()}@example.com", "password": "password123"}
+        response = await client.post(urls[0] + "/api/auth/signup", json={"username": "cluster", **credentials})
+        response.raise_for_status()
+        # Accounts are copied to every node in the background
+        for url in urls[1:]:
+            response = await wait_until(
+                lambda: client.post(url + "/api/auth/login", json=credentials),
+                lambda response: response.status_code == 200,
+                f"the account to reach {url}"
+            )
+        auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        owners = {}
+        for node_id, url in nodes.items():
+            for i in range(5):
+                response = await client.post(url + "/api/sessions", headers=auth, json={"title": f"{node_id}-{i}"})
+                response.raise_for_status()
+                assert response.headers["x-cluster-node"] == node_id, "new session not owned by creating node"
+                owners[response.json()["id"]] = node_id
+
+        for session_id, owner in owners.items():
+            for url in urls:
+                response = await client.get(f"{url}/api/sessions/{session_id}", headers=auth)
+                response.raise_for_status()
+                assert response.headers["x-cluster-node"] == owner, f"{session_id} served by wrong node"
+        print(f"ok: {len(owners)} sessions served by their owner through all {len(urls)} nodes")
+
+        response = await client.post(urls[0] + "/api/sessions/batch/get", headers=auth, json={"ids": list(owners)})
+        response.raise_for_status()
+        assert all(result["status"] == 200 for result in response.json()["results"]), "batch/get missed sessions"
+        print(f"ok: batch/get through {urls[0]} found all {len(owners)} sessions")
+
+        # A node joins: update membership everywhere, then hand sessions off
+        joined = {**nodes, **extra}
+        for url in joined.values():
+            (await client.put(url + "/api/admin/cluster", headers=admin, json={"nodes": joined})).raise_for_status()
+        moved = 0
+        for url in urls:
+            response = await client.post(url + "/api/admin/cluster/handoff", headers=admin)
+            response.raise_for_status()
+            moved += sum(response.json()["moved"].values())
+        for session_id in owners:
+            response = await client.get(f"{urls[0]}/api/sessions/{session_id}", headers=auth)
+            response.raise_for_status()
+            owners[session_id] = response.headers["x-cluster-node"]
+        new_node = next(iter(extra))
+        assert moved == sum(1 for owner in owners.values() if owner == new_node)
+        print(f"ok: {new_node} joined, {moved} of {len(owners)} sessions moved to it and still readable")
+
+        # A logout on one node is copied to the others in the background
+        (await client.post(urls[0] + "/api/auth/logout", headers=auth)).raise_for_status()
+        for url in joined.values():
+            await wait_until(
+                lambda: client.get(url + "/api/auth/me", headers=auth),
+                lambda response: response.status_code == 401,
+                f"the logout to reach {url}"
+            )
+        print(f"ok: token logged out on {urls[0]} rejected by all {len(joined)} nodes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--check", action="store_true", help="run the affinity and handoff check, then stop")
+    args = parser.parse_args()
+
+    nodes = {f"node-{i}": f"http://127.0.0.1:{args.port + i}" for i in range(args.nodes)}
+    extra = {f"node-{args.nodes}": f"http://127.0.0.1:{args.port + args.nodes}"}
+    processes = [start(nodes, node_id) for node_id in nodes]
+    try:
+        wait_healthy(list(nodes.values()))
+        if args.check:
+            # The joining node starts with the final membership
+            processes.append(start({**nodes, **extra}, next(iter(extra))))
+            wait_healthy(list(extra.values()))
+            asyncio.run(check(nodes, extra))
+            return
+        for node_id, url in nodes.items():
+            print(f"{node_id}: {url}")
+        stop = {signal.SIGINT, signal.SIGTERM}
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop)
+        signal.sigwait(stop)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# Hash at bcrypt's minimum cost: the suite signs up many users and the
+# cost does not change what is being tested
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from httpx import AsyncClient, ASGITransport
 from app.main import app
@@ -51,6 +52,23 @@ async def test_signup_duplicate_email():
         assert response.status_code == 400
         assert "already registered" in response.json()["detail"]
 
+@pytest.mark.asyncio
+async def test_concurrent_signups_create_one_user():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post(
+                "/api/auth/signup",
+                json={
+                    "username": f"racer{i}",
+                    "email": "race@example.com",
+                    "password": "password123"
+                }
+            )
+            for i in range(5)
+        ))
+        assert sorted(response.status_code for response in responses) == [201, 400, 400, 400, 400]
+        assert sum(user["email"] == "race@example.com" for user in db.users.values()) == 1
+
 @pytest.mark.asyncio
 async def test_login():
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
@@ -0,0 +1,78 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+
+
+async def _signup(client, username):
+    response = await client.post(
+        "/api/auth/signup",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "password123"
+        }
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_batch_create_get_and_delete():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        headers = await _signup(client, "batchowner")
+        other_headers = await _signup(client, "batchother")
+
+        create_response = await client.post(
+            "/api/sessions/batch",
+            headers=headers,
+            json={"sessions": [
+                {"title": f"Batch {i}", "language": "python"} for i in range(3)
+            ]}
+        )
+        assert create_response.status_code == 201
+        results = create_response.json()["results"]
+        assert [r["status"] for r in results] == [201, 201, 201]
+        ids = [r["id"] for r in results]
+
+        single_response = await client.post(
+            "/api/sessions",
+            headers=headers,
+            json={"title": "Single", "language": "python"}
+        )
+        assert single_response.json()["participant_count"] == 1
+        single_id = single_response.json()["id"]
+
+        get_response = await client.post(
+            "/api/sessions/batch/get",
+            headers=headers,
+            json={"ids": [ids[0], "missing", ids[2], single_id]}
+        )
+        results = get_response.json()["results"]
+        assert [r["status"] for r in results] == [200, 404, 200, 200]
+        assert results[0]["session"]["title"] == "Batch 0"
+        assert results[0]["session"]["participant_count"] == 1
+        assert results[3]["session"]["title"] == "Single"
+        assert results[3]["session"]["participant_count"] == 1
+
+        forbidden = await client.post(
+            "/api/sessions/batch/delete",
+            headers=other_headers,
+            json={"ids": [ids[0]]}
+        )
+        assert forbidden.json()["results"][0]["status"] == 403
+
+        delete_response = await client.post(
+            "/api/sessions/batch/delete",
+            headers=headers,
+            json={"ids": ids + ["missing"]}
+        )
+        assert [r["status"] for r in delete_response.json()["results"]] == [204, 204, 204, 404]
+
+        get_response = await client.get(f"/api/sessions/{ids[1]}")
+        assert get_response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_batch_requires_auth():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/sessions/batch/get", json={"ids": ["x"]})
+        assert response.status_code == 401
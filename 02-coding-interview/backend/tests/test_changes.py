@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_long_poll_wakes_on_change():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "polluser",
+                "email": "poll@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        create_response = await client.post(
+            "/api/sessions",
+            headers=headers,
+            json={"title": "Poll Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        # Nothing changes: the poll times out with the same version
+        idle = await client.get(
+            f"/api/sessions/{session_id}/changes",
+            params={"since": 1, "timeout": 0.05}
+        )
+        assert idle.status_code == 200
+        assert idle.json() == {"session_id": session_id, "version": 1, "changed": False}
+
+        polls = [
+            asyncio.create_task(client.get(
+                f"/api/sessions/{session_id}/changes",
+                params={"since": 1, "timeout": 5}
+            ))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        await client.put(
+            f"/api/sessions/{session_id}",
+            headers=headers,
+            json={"title": "Changed"}
+        )
+        for response in await asyncio.gather(*polls):
+            assert response.json()["changed"] is True
+            assert response.json()["version"] == 2
+
+        # A client that is behind returns immediately
+        behind = await client.get(f"/api/sessions/{session_id}/changes", params={"since": 0})
+        assert behind.json()["changed"] is True
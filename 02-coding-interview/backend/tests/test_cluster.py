@@ -0,0 +1,266 @@
+import asyncio
+import json
+import httpx
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from app.cluster import ClusterMiddleware, Peers, _background, hand_off, peers, replicate_revocation, session_key
+from app.config import settings
+from app.database import InMemoryDatabase, db
+from app.hashring import HashRing, new_session_id, ring
+from app.main import app, create_app
+from app.security import revocations
+
+NODES = {"a": "http://a", "b": "http://b"}
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    monkeypatch.setattr(settings, "NODE_ID", "a")
+    ring.set_nodes(NODES)
+    yield ring
+    ring.set_nodes({})
+
+
+def owned_by(test_ring, node_id):
+    return next(f"session-{i}" for i in range(1000) if test_ring.node_for(f"session-{i}") == node_id)
+
+
+def test_ring_moves_few_keys_on_membership_change():
+    keys = [f"session-{i}" for i in range(20000)]
+    test_ring = HashRing({"a": "", "b": "", "c": ""})
+    before = {key: test_ring.node_for(key) for key in keys}
+    shares = [list(before.values()).count(node) / len(keys) for node in "abc"]
+    assert all(0.25 < share < 0.42 for share in shares)
+
+    test_ring.add("d", "")
+    after = {key: test_ring.node_for(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert all(after[key] == "d" for key in moved)
+    assert 0.18 < len(moved) / len(keys) < 0.32
+
+    test_ring.remove("d")
+    assert {key: test_ring.node_for(key) for key in keys} == before
+
+
+def test_session_key():
+    assert session_key("/api/sessions/abc/code/ops") == "abc"
+    assert session_key("/api/sessions/abc") == "abc"
+    assert session_key("/api/sessions/search") is None
+    assert session_key("/api/sessions") is None
+    assert session_key("/api/auth/login") is None
+
+
+def test_new_session_ids_hash_to_local_node(cluster):
+    assert all(cluster.node_for(new_session_id()) == "a" for _ in range(50))
+    assert cluster.node_for(db.create_session("T", "", "user", "python", 60)["id"]) == "a"
+
+
+def echo_app(node_id):
+    async def echo(request: Request):
+        return JSONResponse({
+            "node": node_id,
+            "path": request.url.path,
+            "query": request.url.query,
+            "body": (await request.body()).decode(),
+            "hop": request.headers.get("x-cluster-hop")
+        })
+    return Starlette(routes=[Route("/{path:path}", echo, methods=["GET", "POST"])])
+
+
+@pytest.mark.asyncio
+async def test_middleware_routes_by_session_owner():
+    test_ring = HashRing(NODES)
+    remote = Peers(transport=ASGITransport(app=echo_app("b")))
+    middleware = ClusterMiddleware(echo_app("a"), test_ring, "a", remote)
+    local_id, remote_id = owned_by(test_ring, "a"), owned_by(test_ring, "b")
+
+    async with AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test") as client:
+        response = await client.post(f"/api/sessions/{remote_id}/execute?x=1", json={"code": "print(1)"})
+        data = response.json()
+        assert (data["node"], data["hop"], data["query"]) == ("b", "a", "x=1")
+        assert data["body"] == '{"code":"print(1)"}'
+
+        response = await client.get(f"/api/sessions/{local_id}")
+        assert response.json()["node"] == "a"
+        assert response.headers["x-cluster-node"] == "a"
+
+        response = await client.get("/api/sessions/search")
+        assert response.json()["node"] == "a"
+
+        # A proxied request is never proxied again
+        response = await client.get(f"/api/sessions/{remote_id}", headers={"X-Cluster-Hop": "c"})
+        assert response.json()["node"] == "a"
+    await remote.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_owner_returns_502():
+    def refuse(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    test_ring = HashRing(NODES)
+    middleware = ClusterMiddleware(echo_app("a"), test_ring, "a", Peers(transport=httpx.MockTransport(refuse)))
+    async with AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test") as client:
+        response = await client.get(f"/api/sessions/{owned_by(test_ring, 'b')}")
+        assert response.status_code == 502
+        assert response.json()["detail"] == "Session node unavailable"
+
+
+@pytest.mark.asyncio
+async def test_hand_off_moves_sessions_to_new_owner(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    monkeypatch.setattr(settings, "NODE_ID", "a")
+    source = InMemoryDatabase()
+    user = source.create_user("handoff", "handoff@example.com", "hash")
+    session_ids = [source.create_session(f"S{i}", "", user["id"], "python", 60)["id"] for i in range(40)]
+
+    # Node b joins and is served by the app under test
+    ring.set_nodes({"a": "http://a", "b": "http://test"})
+    monkeypatch.setattr(peers, "transport", ASGITransport(app=app))
+    try:
+        moved = await hand_off(source, chunk_size=7)
+        expected = [session_id for session_id in session_ids if ring.node_for(session_id) == "b"]
+        assert 0 < len(expected) < len(session_ids)
+        assert moved == {"b": len(expected)}
+        assert all(source.get_session(session_id) is None for session_id in expected)
+        assert all(db.get_session(session_id)["created_by"] == user["id"] for session_id in expected)
+        assert db.get_user_by_email("handoff@example.com")["id"] == user["id"]
+        assert len(source.sessions) == len(session_ids) - len(expected)
+    finally:
+        await peers.close()
+        ring.set_nodes({})
+
+
+def test_imported_sessions_get_a_new_etag_epoch():
+    database = InMemoryDatabase()
+    created = database.create_session("T", "", "user", "python", 60)
+    assert database.get_session_epoch(created["id"]) == database.epoch
+
+    exported = database.sessions[created["id"]]
+    other = InMemoryDatabase()
+    other.epoch = database.epoch
+    other.import_sessions([({**exported, "id": "moved"}, {"user": exported["created_at"]})])
+    assert other.get_session_version("moved") == database.get_session_version(created["id"])
+    assert other.get_session_epoch("moved") != database.epoch
+
+
+@pytest.mark.asyncio
+async def test_logout_is_replicated_to_other_nodes(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    monkeypatch.setattr(settings, "NODE_ID", "a")
+    received = []
+
+    def record(request):
+        received.append((request.url.path, request.headers["x-admin-token"], json.loads(request.content)))
+        return httpx.Response(204)
+
+    ring.set_nodes({"a": "http://a", "b": "http://b"})
+    monkeypatch.setattr(peers, "transport", httpx.MockTransport(record))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            signup_response = await client.post(
+                "/api/auth/signup",
+                json={"username": "revoked", "email": "cluster-revoke@example.com", "password": "password123"}
+            )
+            user_id = signup_response.json()["user"]["id"]
+            headers = {"Authorization": f"Bearer {signup_response.json()['access_token']}"}
+            assert (await client.post("/api/auth/logout-all", headers=headers)).status_code == 204
+            await asyncio.gather(*_background)
+    finally:
+        await peers.close()
+        ring.set_nodes({})
+
+    path, token, body = received[-1]
+    assert (path, token) == ("/api/admin/revocations", "admin-secret")
+    assert body["user_id"] == user_id
+
+    # As node b: the replicated revocation rejects the token there too
+    revocations.users.pop(user_id)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+        response = await client.post(
+            "/api/admin/revocations", headers={"X-Admin-Token": "admin-secret"}, json=body
+        )
+        assert response.status_code == 204
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+        response = await client.post(
+            "/api/admin/revocations", headers={"X-Admin-Token": "admin-secret"}, json={"user_id": user_id}
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_routes_split_ids_by_owner(monkeypatch):
+    monkeypatch.setattr(settings, "NODE_ID", "a")
+    received = []
+
+    def node_b(request):
+        body = json.loads(request.content)
+        received.append((request.url.path, request.headers["authorization"], request.headers["x-cluster-hop"], body))
+        if request.url.path.endswith("/delete"):
+            raise httpx.ConnectError("node b is down")
+        return httpx.Response(200, json={"results": [
+            {"id": session_id, "status": 404, "detail": "Session not found"} for session_id in body["ids"]
+        ]})
+
+    ring.set_nodes(NODES)
+    monkeypatch.setattr(peers, "transport", httpx.MockTransport(node_b))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            signup_response = await client.post(
+                "/api/auth/signup",
+                json={"username": "batchcluster", "email": "batch-cluster@example.com", "password": "password123"}
+            )
+            headers = {"Authorization": f"Bearer {signup_response.json()['access_token']}"}
+            create_response = await client.post(
+                "/api/sessions", headers=headers, json={"title": "Local", "language": "python"}
+            )
+            local_id = create_response.json()["id"]
+            remote_id = owned_by(ring, "b")
+
+            response = await client.post(
+                "/api/sessions/batch/get", headers=headers, json={"ids": [remote_id, local_id, remote_id]}
+            )
+            results = response.json()["results"]
+            assert [(r["id"], r["status"]) for r in results] == [(remote_id, 404), (local_id, 200), (remote_id, 404)]
+            assert results[1]["session"]["title"] == "Local"
+            assert received == [("/api/sessions/batch/get", headers["Authorization"], "a", {"ids": [remote_id, remote_id]})]
+
+            response = await client.post(
+                "/api/sessions/batch/delete", headers=headers, json={"ids": [local_id, remote_id]}
+            )
+            assert [r["status"] for r in response.json()["results"]] == [204, 502]
+            assert db.get_session(local_id) is None
+
+            # Batches sent by another node are served locally
+            response = await client.post(
+                "/api/sessions/batch/get", headers={**headers, "X-Cluster-Hop": "b"}, json={"ids": [remote_id]}
+            )
+            assert response.json()["results"][0]["status"] == 404
+            assert len(received) == 2
+    finally:
+        await peers.close()
+        ring.set_nodes({})
+
+
+def test_cluster_requires_admin_token(cluster, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    with pytest.raises(ValueError, match="ADMIN_TOKEN"):
+        create_app()
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    create_app()
+
+
+@pytest.mark.asyncio
+async def test_replication_failures_are_logged(cluster, monkeypatch, caplog):
+    monkeypatch.setattr(peers, "transport", httpx.MockTransport(lambda request: httpx.Response(401)))
+    try:
+        replicate_revocation({"jti": "token", "expires_at": 0})
+        await asyncio.gather(*_background)
+    finally:
+        await peers.close()
+    assert "Could not replicate to b" in caplog.text
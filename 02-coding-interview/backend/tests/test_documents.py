@@ -0,0 +1,105 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.documents import Document, TextOperation, StaleRevisionError
+
+
+def test_transform_converges():
+    base = "hello world"
+    a = TextOperation.from_list([5, " there", 6])
+    b = TextOperation.from_list([6, -5, "python"])
+
+    a_prime, b_prime = TextOperation.transform(a, b)
+
+    assert b_prime.apply(a.apply(base)) == a_prime.apply(b.apply(base))
+    assert a_prime.apply(b.apply(base)) == "hello there python"
+
+
+def test_document_merges_concurrent_edits():
+    document = Document("abc")
+    document.apply(0, TextOperation.from_list(["x", 3]))
+    applied = document.apply(0, TextOperation.from_list([3, "y"]))
+
+    assert document.text == "xabcy"
+    assert document.revision == 2
+    assert applied.to_list() == [4, "y"]
+
+
+def test_document_compaction():
+    document = Document()
+    for i in range(10):
+        document.apply(document.revision, TextOperation.from_list([i, "a"] if i else ["a"]))
+
+    assert document.compact(3) == 7
+    assert len(document.operations_since(7)) == 3
+    with pytest.raises(StaleRevisionError):
+        document.apply(5, TextOperation.from_list([5, "b"]))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_code_operations():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "otuser",
+                "email": "ot@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        create_response = await client.post(
+            "/api/sessions",
+            headers=headers,
+            json={"title": "OT Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        first = await client.post(
+            f"/api/sessions/{session_id}/code/ops",
+            headers=headers,
+            json={"revision": 0, "ops": ["print(1)"]}
+        )
+        assert first.status_code == 200
+        assert first.json()["revision"] == 1
+
+        # Two editors both based on revision 1
+        await client.post(
+            f"/api/sessions/{session_id}/code/ops",
+            headers=headers,
+            json={"revision": 1, "ops": ["# a\n", 8]}
+        )
+        second = await client.post(
+            f"/api/sessions/{session_id}/code/ops",
+            headers=headers,
+            json={"revision": 1, "ops": [8, "\n# b"]}
+        )
+        assert second.json() == {"revision": 3, "ops": [12, "\n# b"]}
+
+        code = await client.get(f"/api/sessions/{session_id}/code")
+        assert code.json() == {"revision": 3, "code": "# a\nprint(1)\n# b"}
+
+        detail = await client.get(f"/api/sessions/{session_id}")
+        assert detail.json()["code"] == "# a\nprint(1)\n# b"
+
+        ops = await client.get(f"/api/sessions/{session_id}/code/ops", params={"since": 1})
+        assert len(ops.json()["operations"]) == 2
+
+        bad = await client.post(
+            f"/api/sessions/{session_id}/code/ops",
+            headers=headers,
+            json={"revision": 3, "ops": [100, "x"]}
+        )
+        assert bad.status_code == 400
+
+        # Lone surrogates cannot be stored or serialized and leave the document unchanged
+        surrogate = await client.post(
+            f"/api/sessions/{session_id}/code/ops",
+            headers={**headers, "Content-Type": "application/json"},
+            content=r'{"revision": 3, "ops": ["a\ud800", 16]}'
+        )
+        assert surrogate.status_code == 400
+        code = await client.get(f"/api/sessions/{session_id}/code")
+        assert code.json() == {"revision": 3, "code": "# a\nprint(1)\n# b"}
@@ -0,0 +1,80 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_session_conditional_get():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "etaguser",
+                "email": "etag@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        create_response = await client.post(
+            "/api/sessions",
+            headers=headers,
+            json={"title": "ETag Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        first = await client.get(f"/api/sessions/{session_id}")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        unchanged = await client.get(
+            f"/api/sessions/{session_id}",
+            headers={"If-None-Match": etag}
+        )
+        assert unchanged.status_code == 304
+        assert unchanged.headers["etag"] == etag
+        assert unchanged.content == b""
+
+        await client.put(
+            f"/api/sessions/{session_id}",
+            headers=headers,
+            json={"title": "Renamed"}
+        )
+        changed = await client.get(
+            f"/api/sessions/{session_id}",
+            headers={"If-None-Match": etag}
+        )
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()["title"] == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_participants_conditional_get():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "etagpart",
+                "email": "etagpart@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "ETag Participants", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        first = await client.get(f"/api/sessions/{session_id}/participants")
+        etag = first.headers["etag"]
+
+        unchanged = await client.get(
+            f"/api/sessions/{session_id}/participants",
+            headers={"If-None-Match": f"W/{etag}"}
+        )
+        assert unchanged.status_code == 304
@@ -0,0 +1,62 @@
+import json
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.history import ExecutionHistoryStore, TRUNCATED_MARKER
+from app.schemas import ExecutionResult
+
+
+def test_history_is_bounded_and_compressed():
+    store = ExecutionHistoryStore(max_entries=3, output_limit=5000, compress_threshold=100)
+    for i in range(5):
+        store.record("s", ExecutionResult(output=str(i) * 200, stdout=str(i) * 200))
+
+    assert store.count("s") == 3
+    assert store.sessions["s"].entries[-1].compressed
+    assert [r.output[0] for r in store.iter_records("s")] == ["4", "3", "2"]
+    assert [r.output[0] for r in store.iter_records("s", offset=1, limit=1)] == ["3"]
+
+    big = ExecutionResult(output="x" * 6000)
+    store.record("s", big)
+    assert store.last("s").output == "x" * 5000 + TRUNCATED_MARKER
+
+    small = ExecutionResult(output="ok")
+    store.record("s", small)
+    assert store.last("s") is small
+
+
+@pytest.mark.asyncio
+async def test_last_execution_and_history_endpoint():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "historyuser",
+                "email": "history@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "History Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        for i in range(2):
+            await client.post(
+                f"/api/sessions/{session_id}/execute",
+                json={"code": f"print({i})", "language": "python"}
+            )
+
+        detail = await client.get(f"/api/sessions/{session_id}")
+        assert detail.json()["last_execution"]["output"] == "1\n"
+
+        history = await client.get(f"/api/sessions/{session_id}/executions")
+        assert history.status_code == 200
+        assert history.headers["x-total-count"] == "2"
+        records = [json.loads(line) for line in history.text.splitlines()]
+        assert [r["output"] for r in records] == ["1\n", "0\n"]
+        assert "executed_at" in records[0]
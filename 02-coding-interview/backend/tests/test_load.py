@@ -0,0 +1,60 @@
+import argparse
+import pytest
+from httpx import ASGITransport
+from app.config import settings
+from app.main import app
+from verify_api import APIVerifier, LoadTester, compare_to_baseline, parse_mix, percentile
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_compare_to_baseline():
+    baseline = {"get_session": {"p95": 0.010, "p99": 0.020, "error_rate": 0.0}}
+    steady = {"get_session": {"p95": 0.011, "p99": 0.021, "error_rate": 0.0}}
+    slower = {"get_session": {"p95": 0.050, "p99": 0.021, "error_rate": 0.05}}
+
+    assert compare_to_baseline(steady, baseline) == []
+    regressions = compare_to_baseline(slower, baseline)
+    assert len(regressions) == 2
+    assert compare_to_baseline({}, baseline) == ["get_session: no requests recorded"]
+
+
+@pytest.mark.asyncio
+async def test_load_tester_against_app(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 4)
+    tester = LoadTester(
+        base_url="http://test",
+        users=3,
+        duration=0.5,
+        ramp_up=0.1,
+        poll_interval=0.05,
+        mix={"poll": 1.0},
+        transport=ASGITransport(app=app)
+    )
+    results = await tester.run()
+
+    assert results["signup"]["requests"] == 3
+    assert results["create_session"]["error_rate"] == 0.0
+    assert results["get_session"]["requests"] >= 3
+    assert results["get_session"]["errors"] == 0
+    assert results["get_session"]["p50"] <= results["get_session"]["p99"]
+
+
+def test_parse_mix_rejects_weights_that_pick_nothing():
+    assert parse_mix("poll=1,execute=0") == {"poll": 1.0, "execute": 0.0}
+    for value in ("poll=0,execute=0", "poll=-1,execute=2", "typing=1"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix(value)
+
+
+@pytest.mark.asyncio
+async def test_verifier_passes_against_app():
+    verifier = APIVerifier("http://test", transport=ASGITransport(app=app))
+    await verifier.verify_all()
+    assert verifier.results and all(result == "PASS" for _, result in verifier.results)
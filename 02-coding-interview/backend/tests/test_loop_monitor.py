@@ -0,0 +1,74 @@
+import asyncio
+import time
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.config import settings
+from app.loop_monitor import LoopMonitor, loop_monitor
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_monitor_detects_blocking_callback():
+    monitor = LoopMonitor(interval=0.01, slow_threshold=0.05)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.05)
+
+    time.sleep(0.2)  # block the loop
+    await asyncio.sleep(0.05)
+    task.cancel()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["max_lag_seconds"] >= 0.15
+    assert snapshot["slow_callbacks"]
+    slow = snapshot["slow_callbacks"][0]
+    assert slow["blocked_seconds"] >= 0.15
+    assert any("test_monitor_detects_blocking_callback" in line for line in slow["stack"])
+
+
+@pytest.mark.asyncio
+async def test_low_priority_requests_shed_under_lag(monkeypatch):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "sheduser",
+                "email": "shed@example.com",
+                "password": "password123"
+            }
+        )
+        headers = {"Authorization": f"Bearer {signup_response.json()['access_token']}"}
+        create_response = await client.post(
+            "/api/sessions",
+            headers=headers,
+            json={"title": "Shed Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+        etag = (await client.get(f"/api/sessions/{session_id}")).headers["etag"]
+
+        monkeypatch.setattr(loop_monitor, "lag", settings.LOAD_SHED_LAG_SECONDS * 4)
+
+        listing = await client.get("/api/sessions", headers=headers)
+        assert listing.status_code == 503
+        assert listing.headers["retry-after"] == str(settings.LOAD_SHED_RETRY_AFTER_SECONDS)
+
+        participants = await client.get(f"/api/sessions/{session_id}/participants")
+        assert participants.status_code == 503
+
+        poll = await client.get(f"/api/sessions/{session_id}", headers={"X-Poll": "1", "If-None-Match": etag})
+        assert poll.status_code == 503
+
+        # Core interview traffic still goes through, including a browser
+        # revalidating a session it has cached
+        detail = await client.get(f"/api/sessions/{session_id}")
+        assert detail.status_code == 200
+        revalidated = await client.get(f"/api/sessions/{session_id}", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        execute = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            json={"code": "print(1)", "language": "python"}
+        )
+        assert execute.status_code == 200
+
+        monkeypatch.setattr(loop_monitor, "lag", 0.0)
+        listing = await client.get("/api/sessions", headers=headers)
+        assert listing.status_code == 200
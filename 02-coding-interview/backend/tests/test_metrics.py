@@ -0,0 +1,55 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.metrics import Histogram
+
+
+def test_histogram_render():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(2.0, "/a")
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 2.55' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "metricsuser",
+                "email": "metrics@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Metrics Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+        await client.get(f"/api/sessions/{session_id}")
+        await client.post(
+            f"/api/sessions/{session_id}/execute",
+            json={"code": "print(1)", "language": "python"}
+        )
+
+        response = await client.get("/api/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'route="/api/sessions/{session_id}",status="200"' in body
+        assert session_id not in body
+        assert 'http_requests_in_progress{method="GET"} 1' in body
+        assert 'code_execution_duration_seconds_count{language="python",outcome="success"}' in body
+        assert "db_users " in body
+        assert "db_sessions " in body
+        assert "db_participants " in body
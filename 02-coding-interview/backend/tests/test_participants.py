@@ -0,0 +1,49 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.database import db
+from app.participants import participant_projection
+
+
+@pytest.mark.asyncio
+async def test_participant_projection_is_cached_and_invalidated():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "projowner",
+                "email": "projowner@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        guest = db.create_user("projguest", "projguest@example.com", "password123")
+
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Projection Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        first = participant_projection.get(session_id)
+        assert participant_projection.get(session_id) is first
+
+        db.add_participant(session_id, guest["id"])
+        response = await client.get(f"/api/sessions/{session_id}/participants")
+        assert [p["username"] for p in response.json()] == ["projowner", "projguest"]
+
+        db.update_user(guest["id"], username="renamedguest")
+        response = await client.get(f"/api/sessions/{session_id}")
+        assert [p["username"] for p in response.json()["participants"]] == ["projowner", "renamedguest"]
+
+        db.remove_participant(session_id, guest["id"])
+        response = await client.get(f"/api/sessions/{session_id}/participants")
+        assert [p["username"] for p in response.json()] == ["projowner"]
+
+
+def test_get_users_skips_unknown_ids():
+    user = db.create_user("bulkuser", "bulk@example.com", "password123")
+    users = db.get_users([user["id"], "missing"])
+    assert list(users) == [user["id"]]
+    assert "password" not in users[user["id"]]
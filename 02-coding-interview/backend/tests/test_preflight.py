@@ -0,0 +1,60 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.preflight import SyntaxChecker
+from app.schemas import Language
+
+
+def test_python_syntax_error_location():
+    checker = SyntaxChecker()
+    error = checker.check("print('ok')\nprint(", Language.PYTHON)
+    assert error.startswith('  File "<string>", line 2')
+    assert error.rstrip().endswith("SyntaxError: '(' was never closed")
+    assert checker.check("print('ok')", Language.PYTHON) is None
+    assert checker.check("console.log(", Language.JAVASCRIPT) is None
+
+
+def test_results_cached_by_code_hash():
+    checker = SyntaxChecker(max_entries=2)
+    checker.check("x = (", Language.PYTHON)
+    checker.check("x = 1", Language.PYTHON)
+    assert len(checker.results) == 2
+    assert checker.check("x = (", Language.PYTHON) is not None
+    checker.check("y = 2", Language.PYTHON)
+    assert len(checker.results) == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_rejects_syntax_error_without_spawning(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("process spawned")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "preflightuser",
+                "email": "preflight@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Preflight Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        monkeypatch.setattr("app.executor.subprocess.run", fail)
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            json={"code": "def f(:\n    pass", "language": "python"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert data["return_code"] == 1
+        assert "line 1" in data["stderr"]
+        assert "SyntaxError" in data["stderr"]
+        assert data["execution_time"] < 0.1
@@ -0,0 +1,59 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.config import settings
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_profile_request_with_header(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "profileuser",
+                "email": "profile@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Profile Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        unprofiled = await client.get(f"/api/sessions/{session_id}", headers={"X-Profile": "wrong"})
+        assert "x-profile-id" not in unprofiled.headers
+
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            headers={"X-Profile": "admin-secret"},
+            json={"code": "import time; time.sleep(0.2)", "language": "python"}
+        )
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+
+        forbidden = await client.get("/api/admin/profiles", headers={"X-Admin-Token": "wrong"})
+        assert forbidden.status_code == 403
+
+        listing = await client.get("/api/admin/profiles", headers={"X-Admin-Token": "admin-secret"})
+        assert listing.status_code == 200
+        recent = listing.json()["recent"][0]
+        assert str(recent["id"]) == profile_id
+        assert recent["route"] == "/api/sessions/{session_id}/execute"
+        assert recent["samples"] > 0
+
+        folded = await client.get(f"/api/admin/profiles/{profile_id}", headers={"X-Admin-Token": "admin-secret"})
+        assert folded.status_code == 200
+        lines = folded.text.splitlines()
+        assert all(line.startswith("POST /api/sessions/{session_id}/execute") for line in lines)
+        assert any("execute_code" in line for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoints_disabled_without_token():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/admin/profiles", headers={"X-Admin-Token": ""})
+        assert response.status_code == 404
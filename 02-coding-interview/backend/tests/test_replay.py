@@ -0,0 +1,137 @@
+import json
+import random
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.documents import TextOperation
+from app.main import app
+from app.replay import ReplayLog
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def random_edit(rng, text):
+    position = rng.randint(0, len(text))
+    operation = TextOperation().retain(position)
+    if rng.random() < 0.7 or position == len(text):
+        operation.insert(rng.choice(["a", "é", "😀", "\n    ", "return x"]))
+    else:
+        operation.delete(rng.randint(1, min(3, len(text) - position)))
+    return operation.retain(len(text) - operation.base_length)
+
+
+def test_log_rebuilds_every_point_from_keyframes(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("app.replay.time", clock)
+    rng = random.Random(7)
+    log = ReplayLog("def solve():\n", keyframe_interval=16)
+    text = "def solve():\n"
+    snapshots = [text]
+    for i in range(300):
+        clock.now += 0.25
+        operation = random_edit(rng, text)
+        text = operation.apply(text)
+        log.record(operation, text, "alice" if i % 3 else "bob")
+        snapshots.append(text)
+
+    assert len(log.keyframes) == 300 // 16 + 1
+    assert all(log.text_at(event) == snapshots[event] for event in range(len(snapshots)))
+
+    replayed = snapshots[100]
+    events = list(log.events(100, 300, len(replayed)))
+    for _, _, components in events:
+        replayed = TextOperation.from_list(components).apply(replayed)
+    assert replayed == text
+    assert [event[:2] for event in events[:3]] == [(101 * 250, "alice"), (102 * 250, "alice"), (103 * 250, "bob")]
+
+    assert log.event_at(0) == 0
+    assert log.event_at(250 * 40) == 40
+    assert log.event_at(250 * 40 + 249) == 40
+
+
+def test_failed_record_leaves_log_consistent(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("app.replay.time", clock)
+    log = ReplayLog("ab")
+    log.record(TextOperation().retain(2).insert("c"), "abc")
+    with pytest.raises(UnicodeEncodeError):
+        log.record(TextOperation().retain(3).insert("\ud800"), "abc\ud800")
+    assert len(log) == 1
+
+    # Sessions open longer than the time column can hold keep the last time
+    clock.now += 60 * 24 * 3600
+    log.record(TextOperation().delete(1).retain(2), "bc")
+    assert len(log) == 2
+    assert log.times[-1] == 2 ** 32 - 1
+    assert log.text_at(2) == "bc"
+    assert [components for _, _, components in log.events(0, 2, 2)] == [[2, "c"], [-1, 2]]
+
+
+def test_log_stops_at_max_events():
+    log = ReplayLog("", max_events=2)
+    text = ""
+    for character in "abc":
+        operation = TextOperation().retain(len(text)).insert(character)
+        text = operation.apply(text)
+        log.record(operation, text)
+    assert len(log) == 2
+    assert log.truncated
+
+
+@pytest.mark.asyncio
+async def test_replay_endpoint_streams_edits():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "replayuser",
+                "email": "replay@example.com",
+                "password": "password123"
+            }
+        )
+        data = signup_response.json()
+        token, user_id = data["access_token"], data["user"]["id"]
+        headers = {"Authorization": f"Bearer {token}"}
+        create_response = await client.post(
+            "/api/sessions",
+            headers=headers,
+            json={"title": "Replay Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        code = ""
+        for revision, character in enumerate("print(1)"):
+            response = await client.post(
+                f"/api/sessions/{session_id}/code/ops",
+                headers=headers,
+                json={"revision": revision, "ops": [len(code), character] if code else [character]}
+            )
+            assert response.status_code == 200
+            code += character
+
+        response = await client.get(f"/api/sessions/{session_id}/replay")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["x-total-count"] == "8"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        snapshot, edits = lines[0], lines[1:]
+        assert (snapshot["type"], snapshot["event"], snapshot["code"]) == ("snapshot", 0, "")
+        assert len(edits) == 8
+        assert all(edit["author"] == user_id for edit in edits)
+        replayed = snapshot["code"]
+        for edit in edits:
+            replayed = TextOperation.from_list(edit["ops"]).apply(replayed)
+        assert replayed == code == "print(1)"
+
+        end = edits[-1]["t"]
+        response = await client.get(f"/api/sessions/{session_id}/replay", params={"start_ms": end})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == [{**lines[0], "code": "print(1)", "event": 8}]
+
+        response = await client.get("/api/sessions/missing/replay")
+        assert response.status_code == 404
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.search import SessionIndex
+
+
+def _session(session_id, title, language="python", status="active", minutes=0):
+    return {
+        "id": session_id,
+        "title": title,
+        "description": None,
+        "language": language,
+        "status": status,
+        "created_by": "owner",
+        "created_at": datetime(2025, 1, 1) + timedelta(minutes=minutes),
+    }
+
+
+def test_index_filters_and_orders_newest_first():
+    index = SessionIndex()
+    index.add(_session("a", "Binary search tree", minutes=1))
+    index.add(_session("b", "Graph search", language="javascript", minutes=2))
+    index.add(_session("c", "Search and sort", status="completed", minutes=3))
+
+    assert index.search(query="search") == (["c", "b", "a"], 3)
+    assert index.search(query="SEARCH tree") == (["a"], 1)
+    assert index.search(language="javascript") == (["b"], 1)
+    assert index.search(status="active", limit=1) == (["b"], 2)
+    assert index.search(created_after=datetime(2025, 1, 1, 0, 2)) == (["c", "b"], 2)
+    assert index.search(created_before=datetime(2025, 1, 1, 0, 2), offset=1) == (["a"], 2)
+
+    index.add(_session("a", "Linked list", minutes=1))
+    assert index.search(query="tree") == ([], 0)
+    index.remove("c")
+    assert index.search(query="search") == (["b"], 1)
+
+
+def test_index_uses_bitmaps_for_large_postings():
+    index = SessionIndex()
+    for i in range(4000):
+        index.add(_session(str(i), f"Session {i}", language="python" if i % 2 else "cpp", minutes=i))
+
+    page, total = index.search(language="python", limit=3, offset=1)
+    assert page == ["3997", "3995", "3993"]
+    assert total == 2000
+    page, total = index.search(
+        query="session",
+        language="cpp",
+        created_before=datetime(2025, 1, 1) + timedelta(minutes=9)
+    )
+    assert page == ["8", "6", "4", "2", "0"]
+    assert total == 5
+
+    index.remove("3997")
+    index.add(_session("3995", "Renamed", language="cpp", minutes=3995))
+    assert index.search(language="python", limit=2) == (["3999", "3993"], 1998)
+
+
+def test_index_restores_slot_order_after_out_of_order_add():
+    index = SessionIndex()
+    for i in range(4000):
+        index.add(_session(str(i), f"Session {i}", language="python" if i % 2 else "cpp", minutes=i + 10))
+    index.remove("3999")
+    # An older session, as from an import or a handoff
+    index.add(_session("old", "Imported", language="python", minutes=0))
+    assert not index.ordered
+
+    page, total = index.search(language="python", limit=2, offset=1998)
+    assert (page, total) == (["1", "old"], 2000)
+    assert index.ordered
+    assert len(index.slot_ids) == 4000
+    assert index.search(language="python", status="active", limit=2) == (["3997", "3995"], 2000)
+    assert index.search(
+        language="python", created_before=datetime(2025, 1, 1, 0, 5)
+    ) == (["old"], 1)
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "searchuser",
+                "email": "search@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.post(
+            "/api/sessions",
+            headers=headers,
+            json={"title": "Zebra puzzle", "language": "javascript", "description": "Logic quagga"}
+        )
+
+        response = await client.get(
+            "/api/sessions/search",
+            headers=headers,
+            params={"q": "quagga", "language": "javascript", "status": "active"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["sessions"][0]["title"] == "Zebra puzzle"
+
+        response = await client.get(
+            "/api/sessions/search",
+            headers=headers,
+            params={"q": "quagga", "language": "python"}
+        )
+        assert response.json()["total"] == 0
@@ -0,0 +1,177 @@
+import time
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.config import settings
+from app.database import db
+from app.security import (
+    TokenCache, TokenClaims, create_access_token, token_cache, verify_token, password_needs_rehash,
+    verify_password
+)
+from app.revocation import BloomFilter, RevocationList
+
+
+def _claims(user_id, ttl=60):
+    return TokenClaims(user_id, time.time() + ttl, f"jti-{user_id}", time.time())
+
+
+def test_token_cache_evicts_and_expires():
+    cache = TokenCache(max_size=2)
+    cache.put("a", _claims("user-a"))
+    cache.put("b", _claims("user-b"))
+    assert cache.get("a").user_id == "user-a"
+    cache.put("c", _claims("user-c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").user_id == "user-a"
+
+    cache.put("old", _claims("user-old", ttl=-1))
+    assert cache.get("old") is None
+    assert "old" not in cache.entries
+
+
+@pytest.mark.asyncio
+async def test_verify_token_uses_cache():
+    token = create_access_token({"sub": "cached-user"}, timedelta(minutes=5))
+    assert await verify_token(f"Bearer {token}") == "cached-user"
+    assert token in token_cache.entries
+
+    assert await verify_token(f"Bearer {token}") == "cached-user"
+
+    expired = create_access_token({"sub": "cached-user"}, timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        await verify_token(f"Bearer {expired}")
+    assert expired not in token_cache.entries
+
+
+@pytest.mark.asyncio
+async def test_login_with_unknown_email_still_verifies_a_password(monkeypatch):
+    verified = []
+
+    async def record(plain_password, hashed_password):
+        verified.append(hashed_password)
+        return verify_password(plain_password, hashed_password)
+
+    monkeypatch.setattr("app.routes.auth.verify_password_async", record)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "nobody@example.com", "password": "password123"}
+        )
+        assert response.status_code == 401
+    assert len(verified) == 1
+    assert verified[0].startswith("$2") and not password_needs_rehash(verified[0])
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_legacy_plaintext_hash():
+    user = db.create_user("legacyuser", "legacy@example.com", "password123")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "legacy@example.com", "password": "password123"}
+        )
+        assert response.status_code == 200
+
+        stored = db.users[user["id"]]["password"]
+        assert stored.startswith("$2")
+        assert not password_needs_rehash(stored)
+
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "legacy@example.com", "password": "password123"}
+        )
+        assert response.status_code == 200
+        assert db.users[user["id"]]["password"] == stored
+
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "legacy@example.com", "password": "wrong-password"}
+        )
+        assert response.status_code == 401
+
+
+def test_revocation_list_and_pruning():
+    revocations = RevocationList(capacity=2)
+    revocations.revoke("live", time.time() + 60)
+    revocations.revoke("dead", time.time() - 1)
+
+    assert revocations.is_revoked("live", "u", 0)
+    assert not revocations.is_revoked("other", "u", 0)
+    assert revocations.prune() == 1
+    assert not revocations.is_revoked("dead", "u", 0)
+    assert revocations.is_revoked("live", "u", 0)
+
+    for i in range(5):
+        revocations.revoke(f"extra-{i}", time.time() + 60)
+    assert revocations.capacity >= 6
+    assert all(revocations.is_revoked(f"extra-{i}", "u", 0) for i in range(5))
+
+    # Tokens without an ID can only be revoked per user
+    assert not revocations.is_revoked(None, "u", 0)
+    revocations.revoke_user("u", 60)
+    assert revocations.is_revoked(None, "u", 0)
+
+    bloom = BloomFilter(1000)
+    for i in range(1000):
+        bloom.add(str(i))
+    assert all(str(i) in bloom for i in range(1000))
+    assert sum(f"x{i}" in bloom for i in range(10000)) < 300
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_tokens():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "logoutuser",
+                "email": "logout@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+
+        assert (await client.post("/api/auth/logout", headers=headers)).status_code == 204
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+        login_response = await client.post(
+            "/api/auth/login",
+            json={"email": "logout@example.com", "password": "password123"}
+        )
+        headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+
+        assert (await client.post("/api/auth/logout-all", headers=headers)).status_code == 204
+        assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_token_without_id_survives_revocations():
+    from jose import jwt
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "legacytoken",
+                "email": "legacy-token@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        user_id = signup_response.json()["user"]["id"]
+        assert (await client.post("/api/auth/logout", headers={"Authorization": f"Bearer {token}"})).status_code == 204
+
+        # Issued before tokens carried a jti
+        legacy = jwt.encode(
+            {"sub": user_id, "exp": time.time() + 60},
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM
+        )
+        response = await client.get("/api/auth/me", headers={"Authorization": f"Bearer {legacy}"})
+        assert response.status_code == 200
@@ -0,0 +1,100 @@
+import gzip
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.static_files import IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles, _brotli, precompress
+
+
+def _static_app(directory, **kwargs):
+    static_app = FastAPI()
+    static_app.mount("/", PrecompressedStaticFiles(directory=str(directory), html=True, **kwargs), name="static")
+    return static_app
+
+
+@pytest.mark.asyncio
+async def test_static_files_compressed_and_cached(tmp_path):
+    script = "console.log('hello');\n" * 200
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-4f3a2b1c.js").write_text(script)
+    (tmp_path / "index.html").write_text("<html>" + "x" * 2000 + "</html>")
+    for name in ("apple-touch-icon.png", "logo-dark-mode.svg", "og-image-large.png"):
+        (tmp_path / name).write_bytes(b"image")
+
+    async with AsyncClient(transport=ASGITransport(app=_static_app(tmp_path)), base_url="http://test") as client:
+        response = await client.get("/assets/index-4f3a2b1c.js", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert "javascript" in response.headers["content-type"]
+        assert response.text == script
+
+        plain = await client.get("/assets/index-4f3a2b1c.js", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.text == script
+
+        # Codings are matched as tokens and q=0 refuses one
+        for accept, expected in (
+            ("gzip;q=0", None),
+            ("x-gzip, brotli", None),
+            ("br;q=0, gzip", "gzip"),
+            ("br;q=0.1, gzip;q=0.5", "gzip"),
+            ("*;q=0.5, gzip;q=0", "br" if _brotli() else None),
+            ("GZIP; Q=1", "gzip"),
+        ):
+            response = await client.get("/assets/index-4f3a2b1c.js", headers={"Accept-Encoding": accept})
+            assert response.headers.get("content-encoding") == expected, accept
+            assert response.text == script
+
+        page = await client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert page.headers["cache-control"] == "no-cache"
+
+        # Files copied from public/ are not hashed, however their names look
+        for name in ("apple-touch-icon.png", "logo-dark-mode.svg", "og-image-large.png"):
+            response = await client.get(f"/{name}")
+            assert response.headers["cache-control"] == "no-cache"
+
+        unchanged = await client.get(
+            "/",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": page.headers["etag"]}
+        )
+        assert unchanged.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_static_files_large_file_sidecar(tmp_path):
+    content = "body { color: red; }\n" * 1000
+    (tmp_path / "style.css").write_text(content)
+    assert precompress(str(tmp_path)) >= 1
+    (tmp_path / "style.css.gz").write_bytes(gzip.compress(content.encode()))
+
+    async with AsyncClient(transport=ASGITransport(app=_static_app(tmp_path, memory_limit=1024)), base_url="http://test") as client:
+        response = await client.get("/style.css", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == content
+
+
+@pytest.mark.asyncio
+async def test_api_responses_gzipped():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "gzipuser",
+                "email": "gzip@example.com",
+                "password": "password123"
+            }
+        )
+        headers = {"Authorization": f"Bearer {signup_response.json()['access_token']}"}
+        for i in range(20):
+            await client.post(
+                "/api/sessions",
+                headers=headers,
+                json={"title": f"Gzip Session {i}", "language": "python"}
+            )
+
+        response = await client.get("/api/sessions", headers={**headers, "Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["total"] == 20
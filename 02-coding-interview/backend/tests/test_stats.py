@@ -0,0 +1,46 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_sessions_and_executions():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "statsuser",
+                "email": "stats@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        session_ids = []
+        for language in ("python", "python", "javascript"):
+            response = await client.post(
+                "/api/sessions",
+                headers=headers,
+                json={"title": "Stats", "language": language}
+            )
+            session_ids.append(response.json()["id"])
+
+        await client.put(
+            f"/api/sessions/{session_ids[0]}",
+            headers=headers,
+            json={"status": "completed"}
+        )
+        await client.delete(f"/api/sessions/{session_ids[2]}", headers=headers)
+        await client.post(
+            f"/api/sessions/{session_ids[1]}/execute",
+            json={"code": "print(1)", "language": "python"}
+        )
+
+        response = await client.get("/api/sessions/stats", headers=headers)
+        assert response.status_code == 200
+        creator = response.json()["creator"]
+        assert creator["sessions"] == {"active": 1, "completed": 1, "expired": 0, "total": 2}
+        assert creator["executions"] == 1
+        assert creator["total_execution_time"] > 0
+        assert response.json()["by_language"]["python"]["sessions"]["total"] >= 2
@@ -0,0 +1,118 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.config import settings
+from app.main import app
+from app.tracing import InMemoryExporter, Tracer, current_span, traced
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def test_tracer_sampling():
+    tracer = Tracer(sample_rate=0.0, exporter=InMemoryExporter())
+    with tracer.start_trace("unsampled") as span:
+        assert span is None
+        assert current_span() is None
+
+    parent = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+    with tracer.start_trace("forced by client", parent) as span:
+        assert span is None
+
+    with tracer.start_trace("root", parent, trusted=True) as root:
+        with tracer.span("child", step=1) as child:
+            assert current_span() is child
+        assert current_span() is root
+    assert current_span() is None
+
+    spans = tracer.exporter.get(TRACE_ID)
+    assert [span.name for span in spans] == ["child", "root"]
+    assert spans[0].parent_id == root.span_id
+    assert root.parent_id == "00f067aa0ba902b7"
+
+    with tracer.start_trace("not sampled upstream", f"00-{TRACE_ID}-00f067aa0ba902b7-00", trusted=True) as span:
+        assert span is None
+
+    # Sampled locally, a request still joins the incoming trace
+    tracer.sample_rate = 1.0
+    with tracer.start_trace("joined", parent) as span:
+        assert (span.trace_id, span.parent_id) == (TRACE_ID, "00f067aa0ba902b7")
+
+
+def test_exporter_caps_spans_per_trace():
+    tracer = Tracer(exporter=InMemoryExporter(max_traces=2, max_spans=3), follow_parent=True)
+    for _ in range(5):
+        with tracer.start_trace("root", f"00-{TRACE_ID}-00f067aa0ba902b7-01"):
+            pass
+    assert len(tracer.exporter.get(TRACE_ID)) == 3
+
+
+@pytest.mark.asyncio
+async def test_traced_decorator_records_errors():
+    tracer = Tracer(sample_rate=1.0, exporter=InMemoryExporter())
+
+    @traced("failing")
+    async def failing():
+        raise ValueError("boom")
+
+    from app import tracing
+    original = tracing.tracer
+    tracing.tracer = tracer
+    try:
+        with tracer.start_trace("root") as root:
+            with pytest.raises(ValueError):
+                await failing()
+    finally:
+        tracing.tracer = original
+
+    failed = next(span for span in tracer.exporter.get(root.trace_id) if span.name == "failing")
+    assert failed.status == "error"
+
+
+@pytest.mark.asyncio
+async def test_execute_request_traced(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    admin = {"X-Admin-Token": "admin-secret"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "traceuser",
+                "email": "trace@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Trace Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"},
+            json={"code": "print(1)", "language": "python"}
+        )
+        assert response.status_code == 200
+        assert "traceparent" not in response.headers
+
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01", **admin},
+            json={"code": "print(1)", "language": "python"}
+        )
+        assert response.status_code == 200
+        assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+        listing = await client.get("/api/admin/traces", headers=admin)
+        assert any(trace["trace_id"] == TRACE_ID for trace in listing.json())
+
+        spans = (await client.get(f"/api/admin/traces/{TRACE_ID}", headers=admin)).json()
+        names = [span["name"] for span in spans]
+        assert names[0] == "POST /api/sessions/{session_id}/execute"
+        for name in ("route execute_code", "db.get_session", "executor.execute",
+                     "executor.run_process", "db.record_execution"):
+            assert name in names
+        by_id = {span["span_id"]: span for span in spans}
+        run = spans[names.index("executor.run_process")]
+        assert by_id[run["parent_id"]]["name"] == "executor.execute"
@@ -0,0 +1,107 @@
+import json
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.config import settings
+from app.database import InMemoryDatabase
+from app.main import app
+from app.transfer import Importer, export_ndjson
+
+
+async def export_lines(database, chunk_size=2):
+    return b"".join([chunk async for chunk in export_ndjson(database, chunk_size)]).decode().splitlines()
+
+
+@pytest.mark.asyncio
+async def test_export_import_round_trip():
+    source = InMemoryDatabase()
+    alice = source.create_user("alice", "alice@example.com", "hash-a")
+    bob = source.create_user("bob", "bob@example.com", "hash-b")
+    session = source.create_session("Two Sum", "Arrays", alice["id"], "python", 45)
+    source.add_participant(session["id"], bob["id"])
+    source.update_session_code(session["id"], "print('hi')\n")
+    source.create_session("Trees", None, bob["id"], "javascript", 60)
+
+    lines = await export_lines(source)
+    assert [json.loads(line)["type"] for line in lines] == ["user", "user", "session", "session"]
+
+    target = InMemoryDatabase()
+    importer = Importer(target, batch_size=1)
+    data = "\n".join(lines).encode()
+    # Chunk boundaries fall inside lines
+    for start in range(0, len(data), 7):
+        importer.feed(data[start:start + 7])
+    summary = importer.finish()
+    assert (summary.users, summary.sessions, summary.skipped, summary.errors) == (2, 2, 0, [])
+
+    assert target.get_user_by_email("bob@example.com")["password"] == "hash-b"
+    imported = target.get_session(session["id"])
+    assert imported == source.get_session(session["id"])
+    assert target.get_session_code(session["id"]) == "print('hi')\n"
+    assert target.get_participant_join_times(session["id"]) == source.get_participant_join_times(session["id"])
+    assert target.search_sessions(query="two")[1] == 1
+    assert target.stats.overall.statuses == {"active": 2}
+    assert await export_lines(target) == lines
+
+
+def test_import_skips_duplicates_and_reports_invalid_lines():
+    database = InMemoryDatabase()
+    user = database.create_user("carol", "carol@example.com", "hash")
+    importer = Importer(database)
+    importer.feed(b"\n".join([
+        json.dumps({"type": "user", "id": "other", "username": "c", "email": "carol@example.com",
+                    "password": "x", "created_at": "2025-01-01T00:00:00"}).encode(),
+        b"not json",
+        json.dumps({"type": "session", "id": "s1", "title": "T", "created_by": user["id"],
+                    "language": "cobol", "created_at": "2025-01-01T00:00:00"}).encode(),
+        json.dumps({"type": "session", "id": "s2", "title": "T", "created_by": user["id"],
+                    "language": "python", "created_at": "2025-01-01T00:00:00+02:00"}).encode(),
+    ]))
+    summary = importer.finish()
+    assert (summary.users, summary.sessions, summary.skipped) == (0, 1, 3)
+    assert [error["line"] for error in summary.errors] == [2, 3]
+    assert database.get_session("s2")["created_at"].isoformat() == "2024-12-31T22:00:00"
+    assert database.get_participants("s2") == [user["id"]]
+
+
+@pytest.mark.asyncio
+async def test_admin_export_and_import_endpoints(monkeypatch):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/api/admin/export")).status_code == 404
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+        headers = {"X-Admin-Token": "admin-secret"}
+        signup_response = await client.post(
+            "/api/auth/signup",
+            json={
+                "username": "exportuser",
+                "email": "export@example.com",
+                "password": "password123"
+            }
+        )
+        token = signup_response.json()["access_token"]
+        create_response = await client.post(
+            "/api/sessions",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Export Session", "language": "python"}
+        )
+        session_id = create_response.json()["id"]
+
+        response = await client.get("/api/admin/export", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        exported = next(record for record in records if record["id"] == session_id)
+        assert exported["title"] == "Export Session"
+
+        async def body():
+            yield json.dumps({**exported, "id": "imported-session", "title": "Imported"}).encode()
+            yield b"\n"
+            yield json.dumps(exported).encode()
+
+        response = await client.post("/api/admin/import", headers=headers, content=body())
+        assert response.status_code == 200
+        assert response.json() == {"users": 0, "sessions": 1, "skipped": 1, "errors": []}
+
+        response = await client.get("/api/sessions/imported-session")
+        assert response.status_code == 200
+        assert response.json()["title"] == "Imported"
@@ -0,0 +1,152 @@
+import os
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.workspaces import WorkspacePool, workspace_pool, write_files
+
+
+async def create_session(client, username, email):
+    signup_response = await client.post(
+        "/api/auth/signup",
+        json={"username": username, "email": email, "password": "password123"}
+    )
+    token = signup_response.json()["access_token"]
+    create_response = await client.post(
+        "/api/sessions",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": "Workspace Session", "language": "python"}
+    )
+    return create_response.json()["id"]
+
+
+def test_workspaces_reused_and_emptied(tmp_path):
+    pool = WorkspacePool(str(tmp_path), max_idle=1)
+    workspace = pool.acquire()
+    write_files(workspace, {"main.py": "print(1)", "pkg/util.py": ""})
+    pool.release(workspace)
+    assert os.listdir(workspace) == []
+    assert pool.acquire() == workspace
+
+    other = pool.acquire()
+    pool.release(workspace)
+    pool.release(other)
+    assert not os.path.exists(other)
+
+    pool.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_write_files_stays_inside_workspace(tmp_path):
+    with pytest.raises(ValueError):
+        write_files(str(tmp_path), {"../escape.py": ""})
+    assert not (tmp_path.parent / "escape.py").exists()
+
+
+@pytest.mark.asyncio
+async def test_execute_multi_file_submission():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session_id = await create_session(client, "workspaceuser", "workspace@example.com")
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            json={
+                "code": "from lib.greet import greet\nprint(greet(input()))",
+                "language": "python",
+                "stdin": "Ada",
+                "files": {
+                    "lib/__init__.py": "",
+                    "lib/greet.py": "def greet(name):\n    return f'Hello, {name}'"
+                }
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["stdout"] == "Hello, Ada\n"
+
+
+@pytest.mark.asyncio
+async def test_execute_large_submission():
+    # Far larger than a single argv string may be (MAX_ARG_STRLEN is 128 KiB)
+    code = "x = 0\n" + "x += 1\n" * 100_000 + "print(x)"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session_id = await create_session(client, "largeuser", "large@example.com")
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            json={"code": code, "language": "python"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["stdout"] == "100000\n"
+
+
+@pytest.mark.asyncio
+async def test_execute_syntax_error_names_file():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session_id = await create_session(client, "brokenfileuser", "brokenfile@example.com")
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            json={
+                "code": "import helper",
+                "language": "python",
+                "files": {"helper.py": "def f(:\n    pass"}
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert 'File "helper.py", line 1' in data["stderr"]
+
+
+@pytest.mark.asyncio
+async def test_execute_reports_unwritable_files():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session_id = await create_session(client, "unwritableuser", "unwritable@example.com")
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            headers={"Content-Type": "application/json"},
+            content=r'{"code": "print(1)", "language": "python", "files": {"notes.txt": "a\ud800"}}'
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert data["stderr"].startswith("Could not write submission files")
+        assert workspace_pool.base not in data["stderr"]
+
+
+@pytest.mark.asyncio
+async def test_execute_javascript_error_paths_are_relative():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session_id = await create_session(client, "jspathuser", "jspath@example.com")
+        response = await client.post(
+            f"/api/sessions/{session_id}/execute",
+            json={"code": "require('./lib/fail.js')", "language": "javascript", "files": {"lib/fail.js": "throw new Error('boom')"}}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert "lib/fail.js:1" in data["stderr"]
+        assert workspace_pool.base not in data["stderr"]
+        assert workspace_pool.base not in data["output"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("files,entrypoint", [
+    ({"../evil.py": ""}, None),
+    ({"/etc/passwd": ""}, None),
+    ({"a/./b.py": ""}, None),
+    ({"a\\b.py": ""}, None),
+    ({}, "../main.py"),
+    ({"main.py": ""}, "main.py"),
+    ({"main.py": ""}, None),
+    ({"lib": "x", "lib/u.py": ""}, None),
+    ({"main.py/u.py": ""}, None),
+    ({f"f{i}.py": "" for i in range(51)}, None),
+])
+async def test_execute_rejects_invalid_files(files, entrypoint):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(
+            "/api/sessions/missing/execute",
+            json={"code": "print(1)", "language": "python", "files": files, "entrypoint": entrypoint}
+        )
+        assert response.status_code == 422
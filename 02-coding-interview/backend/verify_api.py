@@ -1,22 +1,64 @@
+import argparse
 import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
 import httpx
-from typing import Optional
+from typing import Dict, List, Optional
 
 BASE_URL = "http://localhost:8000"
 
+# Relative weight of each action a virtual interviewer takes per poll tick
+DEFAULT_MIX = {"poll": 0.75, "participants": 0.15, "execute": 0.10}
+
 class APIVerifier:
-    def __init__(self, base_url: str = BASE_URL):
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: float = 10,
+        limits: Optional[httpx.Limits] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         self.base_url = base_url
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits or httpx.Limits(),
+            transport=transport
+        )
         self.token: Optional[str] = None
         self.user_id: Optional[str] = None
         self.session_id: Optional[str] = None
         self.results = []
 
+    async def send(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request; `name` identifies the endpoint to subclasses that measure it"""
+        return await self.client.request(method, url, **kwargs)
+
+    async def signup(self, username: str, email: str, password: str = "password123") -> Optional[httpx.Response]:
+        """Register a user"""
+        return await self.send(
+            "signup", "POST", "/api/auth/signup",
+            json={"username": username, "email": email, "password": password}
+        )
+
+    async def login(self, email: str, password: str = "password123") -> Optional[httpx.Response]:
+        """Log a user in"""
+        return await self.send("login", "POST", "/api/auth/login", json={"email": email, "password": password})
+
+    async def create_session(self, headers: Dict[str, str], title: str, **fields) -> Optional[httpx.Response]:
+        """Create a Python session as the user in `headers`"""
+        return await self.send(
+            "create_session", "POST", "/api/sessions", headers=headers,
+            json={"title": title, "language": "python", **fields}
+        )
+
     async def verify_all(self):
         """Run all verification tests"""
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=10) as client:
-            self.client = client
-            
+        async with self.client:
             await self.test_health()
             await self.test_auth_flow()
             await self.test_session_flow()
@@ -40,12 +82,7 @@ class APIVerifier:
         """Test authentication endpoints"""
         try:
             # Signup
-            signup_data = {
-                "username": "verifyuser",
-                "email": "verify@example.com",
-                "password": "password123"
-            }
-            response = await self.client.post("/api/auth/signup", json=signup_data)
+            response = await self.signup("verifyuser", "verify@example.com")
             if response.status_code == 201:
                 data = response.json()
                 self.token = data["access_token"]
@@ -56,11 +93,7 @@ class APIVerifier:
                 return
 
             # Login
-            login_data = {
-                "email": "verify@example.com",
-                "password": "password123"
-            }
-            response = await self.client.post("/api/auth/login", json=login_data)
+            response = await self.login("verify@example.com")
             if response.status_code == 200:
                 self.results.append(("✓ Login", "PASS"))
             else:
@@ -86,12 +119,7 @@ class APIVerifier:
             headers = {"Authorization": f"Bearer {self.token}"}
 
             # Create session
-            create_data = {
-                "title": "Verification Session",
-                "language": "python",
-                "description": "Test session"
-            }
-            response = await self.client.post("/api/sessions", json=create_data, headers=headers)
+            response = await self.create_session(headers, "Verification Session", description="Test session")
             if response.status_code == 201:
                 data = response.json()
                 self.session_id = data["id"]
@@ -182,8 +210,222 @@ class APIVerifier:
         print(f"\nTotal: {passed}/{total} tests passed")
         print("=" * 60 + "\n")
 
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class EndpointStats:
+    """Latencies and errors recorded for one endpoint"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99)
+        }
+
+
+class LoadTester(APIVerifier):
+    """Simulate concurrent interviewers against the API
+
+    Each virtual user signs up, logs in and creates a session, then polls it
+    every `poll_interval` seconds until the test ends. Every tick picks one
+    action from `mix`: fetch the session, fetch its participants or execute
+    code. Users start evenly spread over `ramp_up` seconds. Requests go
+    through the APIVerifier helpers; send() times each one and counts
+    failures and non-2xx responses as errors.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        users: int = 20,
+        duration: float = 60.0,
+        ramp_up: float = 10.0,
+        poll_interval: float = 2.0,
+        mix: Optional[Dict[str, float]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        super().__init__(
+            base_url,
+            timeout=30,
+            limits=httpx.Limits(max_connections=users, max_keepalive_connections=users),
+            transport=transport
+        )
+        self.users = users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.poll_interval = poll_interval
+        self.mix = mix or DEFAULT_MIX
+        self.run_id = uuid.uuid4().hex[:8]
+        self.stats: Dict[str, EndpointStats] = {}
+
+    async def send(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request and record its latency under an endpoint name"""
+        stats = self.stats.setdefault(name, EndpointStats())
+        start = time.perf_counter()
+        try:
+            response = await super().send(name, method, url, **kwargs)
+        except httpx.HTTPError:
+            stats.latencies.append(time.perf_counter() - start)
+            stats.errors += 1
+            return None
+        stats.latencies.append(time.perf_counter() - start)
+        if not response.is_success:
+            stats.errors += 1
+            return None
+        return response
+
+    async def virtual_user(self, index: int, deadline: float):
+        """Run one interviewer until the deadline"""
+        await asyncio.sleep(self.ramp_up * index / max(self.users, 1))
+        email = f"load-{self.run_id}-{index}@example.com"
+        if await self.signup(f"load{self.run_id}{index}", email) is None:
+            return
+        response = await self.login(email)
+        if response is None:
+            return
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = await self.create_session(headers, f"Load Session {index}")
+        if response is None:
+            return
+        session_id = response.json()["id"]
+
+        actions = list(self.mix)
+        weights = [self.mix[action] for action in actions]
+        while time.monotonic() < deadline:
+            action = random.choices(actions, weights)[0]
+            if action == "poll":
+                await self.send("get_session", "GET", f"/api/sessions/{session_id}")
+            elif action == "participants":
+                await self.send("get_participants", "GET", f"/api/sessions/{session_id}/participants")
+            elif action == "execute":
+                await self.send(
+                    "execute", "POST", f"/api/sessions/{session_id}/execute",
+                    json={"code": "print(sum(range(1000)))", "language": "python"}
+                )
+            await asyncio.sleep(self.poll_interval)
+
+    async def run(self) -> Dict[str, dict]:
+        """Run the load test and return per-endpoint statistics"""
+        async with self.client:
+            deadline = time.monotonic() + self.ramp_up + self.duration
+            await asyncio.gather(*(self.virtual_user(index, deadline) for index in range(self.users)))
+        return {name: stats.summary() for name, stats in sorted(self.stats.items())}
+
+
+def compare_to_baseline(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    latency_tolerance: float = 0.2,
+    error_tolerance: float = 0.01
+) -> List[str]:
+    """List regressions of p95/p99 latency or error rate against a baseline"""
+    regressions = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            regressions.append(f"{name}: no requests recorded")
+            continue
+        for key in ("p95", "p99"):
+            limit = expected[key] * (1 + latency_tolerance)
+            if actual[key] > limit:
+                regressions.append(f"{name}: {key} {actual[key] * 1000:.1f} ms > {limit * 1000:.1f} ms")
+        if actual["error_rate"] > expected["error_rate"] + error_tolerance:
+            regressions.append(
+                f"{name}: error rate {actual['error_rate']:.2%} > {expected['error_rate']:.2%}"
+            )
+    return regressions
+
+
+def print_load_results(results: Dict[str, dict]):
+    """Print load test results"""
+    print("\n" + "=" * 78)
+    print("LOAD TEST RESULTS")
+    print("=" * 78)
+    print(f"{'Endpoint':<20} {'Requests':>9} {'Errors':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, summary in results.items():
+        print(
+            f"{name:<20} {summary['requests']:>9} {summary['error_rate']:>8.2%} "
+            f"{summary['p50'] * 1000:>10.1f} {summary['p95'] * 1000:>10.1f} {summary['p99'] * 1000:>10.1f}"
+        )
+    print("=" * 78 + "\n")
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse a mix such as poll=0.75,participants=0.15,execute=0.1"""
+    mix = {}
+    for part in value.split(","):
+        action, _, weight = part.partition("=")
+        if action not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown action {action!r}")
+        mix[action] = float(weight)
+        if mix[action] < 0:
+            raise argparse.ArgumentTypeError(f"negative weight for {action!r}")
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("weights must add up to more than zero")
+    return mix
+
+
+async def run_load_test(args) -> int:
+    tester = LoadTester(
+        base_url=args.base_url,
+        users=args.users,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        poll_interval=args.poll_interval,
+        mix=args.mix
+    )
+    results = await tester.run()
+    print_load_results(results)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.latency_tolerance, args.error_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
 async def main():
-    verifier = APIVerifier()
+    parser = argparse.ArgumentParser(description="Verify the API, or load test it with --load")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--load", action="store_true", help="run the load test instead of the functional pass")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual interviewers")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="seconds over which users start")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="seconds between user actions")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. poll=0.75,participants=0.15,execute=0.1")
+    parser.add_argument("--baseline", help="fail if results regress against this JSON file")
+    parser.add_argument("--save-baseline", help="write results to this JSON file")
+    parser.add_argument("--latency-tolerance", type=float, default=0.2, help="allowed p95/p99 increase (0.2 = 20%%)")
+    parser.add_argument("--error-tolerance", type=float, default=0.01, help="allowed error rate increase")
+    args = parser.parse_args()
+
+    if args.load:
+        sys.exit(await run_load_test(args))
+    verifier = APIVerifier(args.base_url)
     await verifier.verify_all()
 
 if __name__ == "__main__":
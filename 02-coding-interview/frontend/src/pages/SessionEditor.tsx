@@ -33,14 +33,14 @@ const getMonacoLanguage = (language: string): string => {
   useEffect(() => {
     loadSession()
     // Poll for updates every 2 seconds
-    const interval = setInterval(loadSession, 2000)
+    const interval = setInterval(() => loadSession(true), 2000)
     return () => clearInterval(interval)
   }, [sessionId])
 
-  const loadSession = async () => {
+  const loadSession = async (poll = false) => {
     if (!sessionId) return
     try {
-      const data = await sessionService.getSessionDetail(sessionId)
+      const data = await sessionService.getSessionDetail(sessionId, poll)
       setSession(data)
       setCode(data.code || '')
     } catch (err) {
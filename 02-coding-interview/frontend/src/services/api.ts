@@ -74,8 +74,11 @@ export const sessionService = {
     return response.data
   },
 
-  async getSessionDetail(sessionId: string): Promise<SessionDetail> {
-    const response = await api.get(`/api/sessions/${sessionId}`)
+  async getSessionDetail(sessionId: string, poll = false): Promise<SessionDetail> {
+    // X-Poll lets an overloaded server skip periodic refreshes, never the first load
+    const response = await api.get(`/api/sessions/${sessionId}`, {
+      headers: poll ? { 'X-Poll': '1' } : undefined
+    })
     return response.data
   },
 